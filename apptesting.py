@@ -1,5 +1,49 @@
+import asyncio
+import copy
+import gzip
+import io
 import json
+import subprocess
+import sys
 from dataclasses import asdict
+from pathlib import Path
+
+import pytest
+
+from benchmarks.conversion_suite import find_regressions
+from benchmarks.synthetic import synthetic_profiles, write_synthetic_export
+from benchmarks.transcoders import raw_source_profiles
+from constants import canada_provinces, us_states
+from constants.countries_map import COUNTRY_NAME_TO_CODE_MAP, resolve_country, resolve_region
+from helpers.card_utils import classify_many, determine_card_type
+from helpers.compression import (
+    COMPRESSION_NAMES,
+    compressed_path,
+    decompress_bytes,
+    detect_compression,
+    open_text_input,
+    open_text_output
+)
+from helpers.conversion_stats import NULL_STATS, ConversionStats
+from helpers.json_codec import DEFAULT_CODEC, JSONCodec, available_codecs
+from helpers.json_split import iter_export_ranges, read_export_range
+from helpers.json_stream import READ_CHUNK_SIZE, SNIFF_SIZE, iter_document_profiles
+from helpers.profile_cache import ProfileCache
+from helpers.quarantine import Quarantine
+from registries.bot_registry import CANONICAL, CANONICAL_FORMATS, EMITTERS, PARSERS, SNAPSHOT, TRANSCODERS
+from services.batch_service import convert_batch, detect_export_bot
+from services.conversion_service import (
+    OUTPUT_BYTES,
+    OUTPUT_TEXT,
+    convert_async,
+    convert_export,
+    convert_file,
+    convert_text,
+    iter_converted_chunks,
+    iter_export_batches
+)
+from services.server_service import conversion_request
+from services.watch_service import sync_outputs
 
 from parsers.valor_parser import map_valor_to_canonical
 from emitters.stellar_emitter import canonical_profiles_to_stellar
@@ -111,6 +155,811 @@ def test_cyber_to_canonical():
 
     print("\nWrote canonical output to cyber_canonical.json")
 
+class _CountingReader:
+    """
+    Text file object that counts the characters read from it.
+    """
+
+    def __init__(self, text: str):
+        self._fp  = io.StringIO(text)
+        self.read_chars = 0
+
+    def read(self, size: int = -1) -> str:
+        chunk = self._fp.read(size)
+        self.read_chars += len(chunk)
+        return chunk
+
+    def readline(self, size: int = -1) -> str:
+        line = self._fp.readline(size)
+        self.read_chars += len(line)
+        return line
+
+    def seek(self, offset: int) -> int:
+        return self._fp.seek(offset)
+
+def synthetic_export(bot: str, count: int, seed: int = 1) -> str:
+    """
+    A synthetic export of count profiles, written by the bot's own writer.
+    """
+    emitter_cfg = EMITTERS[bot]
+    fp          = io.StringIO()
+
+    emitter_cfg["writer"](fp, map(emitter_cfg["profile_emitter"], synthetic_profiles(count, seed)))
+
+    return fp.getvalue()
+
+def test_stream_reader_fails_fast_on_early_fault():
+    """
+    Invalid JSON early in a large export is reported as soon as its chunk is
+    read, at the same position json.loads reports, instead of buffering the
+    rest of the export.
+    """
+    export = synthetic_export("valor", 3000)
+    fault  = export.index('"billingSameAsShipping"', len(export) // 20)
+    broken = export[:fault] + export[fault + 1:]
+
+    with pytest.raises(json.JSONDecodeError) as expected:
+        json.loads(broken)
+
+    reader = _CountingReader(broken)
+
+    with pytest.raises(json.JSONDecodeError) as raised:
+        list(PARSERS["valor"]["reader"](reader))
+
+    assert str(raised.value) == str(expected.value)
+    assert raised.value.lineno > 1000
+    assert reader.read_chars <= fault + READ_CHUNK_SIZE
+
+@pytest.mark.parametrize("direct", [True, False])
+@pytest.mark.parametrize("to_bot", ["valor", "cybersole"])
+def test_converted_profiles_do_not_share_addresses(to_bot, direct):
+    """
+    Profiles with the same address get their own address dicts, so editing
+    one converted profile changes neither the other profiles nor later
+    conversions, although the address is only converted once.
+    """
+    export = json.loads(synthetic_export("stellar", 1)) * 2
+
+    def converted_profiles():
+        (converted,), _ = convert_export("stellar", to_bot, export, direct=direct)
+        return list(converted.values()) if to_bot == "valor" else converted[0]["profiles"]
+
+    first, second = converted_profiles()
+    addresses     = [key for key, value in first.items() if isinstance(value, dict) and "city" in value]
+
+    assert all(first[key] == second[key] for key in addresses)
+
+    for key in addresses:
+        first[key]["city"] = "Edited"
+
+    assert all(second[key]["city"] != "Edited" for key in addresses)
+    assert all(p[key]["city"] != "Edited" for p in converted_profiles() for key in addresses)
+
+@pytest.mark.parametrize("query", [
+    "to=stellar&input=/etc/passwd",
+    "to=stellar&input=../outside.json",
+    "to=stellar&input=exports/valorprofiles.json&output=exports/../../outside.json",
+])
+def test_server_refuses_paths_outside_its_root(query, tmp_path):
+    """
+    Conversion server input and output paths must stay inside the root.
+    """
+    root = tmp_path.resolve() / "root"
+
+    with pytest.raises(PermissionError):
+        conversion_request(query, b"", root)
+
+    request = conversion_request("to=stellar&input=exports/valorprofiles.json&output=out.json", b"", root)
+
+    assert request["input"] == str(root / "exports" / "valorprofiles.json")
+    assert request["output"] == [str(root / "out.json")]
+
+# keys holding minted ids, which differ between any two conversions
+MINTED_ID_KEYS = {"id"}
+
+# values a faulty field is replaced with
+FAULT_VALUES = ["Zz", None]
+
+def without_minted_ids(value):
+    if isinstance(value, dict):
+        return {key: None if key in MINTED_ID_KEYS else without_minted_ids(item) for key, item in value.items()}
+
+    if isinstance(value, list):
+        return [without_minted_ids(item) for item in value]
+
+    return value
+
+def outcome(convert, raw_profile):
+    """
+    What converting raw_profile gives: the output, or the error raised.
+    """
+    try:
+        return without_minted_ids(convert(raw_profile))
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+
+def faulty_profiles(raw_profile: dict, path: tuple = ()):
+    """
+    Yield (description, copy of raw_profile with one field broken): a key
+    deleted, or its value replaced with a bad string or null.
+    """
+    record = raw_profile
+
+    for key in path:
+        record = record[key]
+
+    for key, value in record.items():
+        for fault in ["deleted"] + FAULT_VALUES:
+            broken = copy.deepcopy(raw_profile)
+            target = broken
+
+            for step in path:
+                target = target[step]
+
+            if fault == "deleted":
+                del target[key]
+            else:
+                target[key] = fault
+
+            yield f"{'.'.join(path + (key,))} {fault}", broken
+
+        if isinstance(value, dict):
+            yield from faulty_profiles(raw_profile, path + (key,))
+
+@pytest.mark.parametrize("from_bot, to_bot", [
+    (from_bot, to_bot) for from_bot, transcoders in TRANSCODERS.items() for to_bot in transcoders
+])
+def test_transcoder_matches_canonical_route(from_bot, to_bot):
+    """
+    A direct transcoder gives the canonical route's output (minted ids
+    aside) for every profile, and its error for every single-field fault.
+    A profile with several faults may report another one of its errors
+    first (see compile_transcoder), so it is only checked to fail on both.
+    """
+    profile_parser  = PARSERS[from_bot]["profile_parser"]
+    profile_emitter = EMITTERS[to_bot]["profile_emitter"]
+    transcoder      = TRANSCODERS[from_bot][to_bot]
+    raw_profiles    = raw_source_profiles(from_bot, 300)
+
+    def canonical(raw_profile):
+        return profile_emitter(profile_parser(raw_profile))
+
+    for raw_profile in raw_profiles:
+        assert outcome(transcoder, raw_profile) == outcome(canonical, raw_profile)
+
+    for raw_profile in raw_profiles[:3]:
+        single_fault = not isinstance(outcome(canonical, raw_profile), str)
+
+        for fault, broken in faulty_profiles(raw_profile):
+            expected, actual = outcome(canonical, broken), outcome(transcoder, broken)
+
+            if single_fault:
+                assert actual == expected, fault
+            else:
+                assert isinstance(actual, str) and isinstance(expected, str), fault
+
+# JSON text a naive profile splitter would cut inside: brackets, with and
+# without escaped quotes and backslashes around, and non-ASCII characters
+TRICKY_TEXTS = ['J\u00f6rg ]} {[ \u2603', '{"x": [1]} \\ \u00e9']
+
+def tricky_profiles(count: int) -> list:
+    """
+    Synthetic canonical profiles, some with one of TRICKY_TEXTS in their email.
+    """
+    profiles = list(synthetic_profiles(count))
+
+    for index, profile in enumerate(profiles):
+        if index % 5 < len(TRICKY_TEXTS):
+            profile.email = TRICKY_TEXTS[index % 5] + profile.email
+
+    return profiles
+
+@pytest.mark.parametrize("bot", ["stellar", "valor", "cybersole"])
+def test_stream_reader_and_writer_match_json_load_and_dump(bot):
+    """
+    With the default codec the streamed writer writes, and the streamed
+    reader reads, the same bytes the original json.dump(..., indent=2) /
+    json.load did, whether the profiles are written as dicts or already
+    encoded. Ids minted for the export envelope aside, the document is the
+    one json.dump was given.
+    """
+    emitter_cfg = EMITTERS[bot]
+    profiles    = [emitter_cfg["profile_emitter"](profile) for profile in tricky_profiles(60)]
+    document    = without_minted_ids(emitter_cfg["export"](profiles))
+
+    for items in (profiles, [emitter_cfg["encoder"](profile, DEFAULT_CODEC) for profile in profiles]):
+        fp = io.StringIO()
+        emitter_cfg["writer"](fp, items, DEFAULT_CODEC)
+        written = fp.getvalue()
+
+        assert written == json.dumps(json.loads(written), indent=2)
+        assert without_minted_ids(json.loads(written)) == document
+
+    read = list(PARSERS[bot]["reader"](_CountingReader(written), DEFAULT_CODEC))
+
+    assert read == list(iter_document_profiles(json.loads(written), PARSERS[bot]["shape"]))
+
+@pytest.mark.parametrize("name", available_codecs())
+@pytest.mark.parametrize("compact", [False, True])
+def test_codecs_agree_on_values(name, compact):
+    """
+    Every installed codec, in both layouts, writes and reads the same JSON
+    values as the stdlib; the default indents exactly as json.dumps does.
+    """
+    document = [asdict(profile) for profile in tricky_profiles(10)]
+    codec    = JSONCodec(name, compact)
+    written  = codec.dumps(document)
+
+    assert json.loads(written) == codec.loads(json.dumps(document)) == document
+    assert JSONCodec().dumps(document) == json.dumps(document, indent=2)
+    assert JSONCodec(compact=compact).loads(written) == document
+
+def test_compact_mode_writes_no_whitespace(tmp_path):
+    """
+    --compact output holds no whitespace outside strings and converts the
+    same profiles as indented output; as_compact() always gives a compact
+    codec (the one JSON lines are written with).
+    """
+    source = tmp_path / "stellarprofiles.json"
+    write_synthetic_export("stellar", source, 40)
+
+    outputs = {}
+
+    for compact in (False, True):
+        output = tmp_path / f"valor_{compact}.json"
+        convert_file("stellar", ["valor"], source, [output], codec=JSONCodec(compact=compact))
+        outputs[compact] = output.read_text(encoding="utf-8")
+
+    assert outputs[False] == json.dumps(json.loads(outputs[False]), indent=2)
+    assert outputs[True] == json.dumps(json.loads(outputs[True]), separators=(",", ":"), ensure_ascii=False)
+    # Valor keys its profiles by freshly minted ids
+    profiles = {compact: without_minted_ids(list(json.loads(text).values())) for compact, text in outputs.items()}
+    assert profiles[True] == profiles[False]
+    assert JSONCodec().as_compact().compact and JSONCodec(compact=True).as_compact().compact
+
+@pytest.mark.parametrize("direct", [True, False])
+def test_on_error_reports_input_indices(direct):
+    """
+    A failing profile is reported by its index in the input, also past the
+    first chunk: in the error that aborts the conversion, and in every
+    quarantined failure.
+    """
+    export = json.loads(synthetic_export("stellar", 1200))
+    broken = [5, 640, 1111]
+
+    for index in broken:
+        del export[index]["email"]
+
+    with pytest.raises(ValueError, match="^Profile at index 5 could not be converted"):
+        convert_export("stellar", "valor", export, direct=direct)
+
+    quarantine   = Quarantine("collect")
+    (result,), n = convert_export("stellar", "valor", export, quarantine=quarantine, direct=direct)
+
+    assert n == len(result) == len(export) - len(broken)
+    assert sorted(failure["index"] for failure in quarantine.failures) == broken
+    assert all(failure["profile"] == export[failure["index"]] for failure in quarantine.failures)
+
+@pytest.mark.parametrize("bot", ["stellar", "valor", "cybersole", CANONICAL])
+def test_export_ranges_match_stream_reader(bot, tmp_path):
+    """
+    Decoding an export range by range (as --jobs workers do) yields the
+    profiles the streamed reader yields, however small the ranges are.
+    """
+    emitter_cfg = EMITTERS[bot]
+    export      = tmp_path / emitter_cfg["file"]
+
+    with export.open("w", encoding="utf-8") as fp:
+        emitter_cfg["writer"](fp, map(emitter_cfg["profile_emitter"], tricky_profiles(300)))
+
+    with export.open(encoding="utf-8") as fp:
+        expected = list(PARSERS[bot]["reader"](fp))
+
+    for range_size in (1, 4096, 1024 * 1024):
+        ranges = list(iter_export_ranges(export, PARSERS[bot]["shape"], range_size))
+
+        assert [profile for r in ranges for profile in read_export_range(r)] == expected
+        assert range_size > 1 or len(ranges) == len(expected)
+
+@pytest.mark.parametrize("persisted", CANONICAL_FORMATS)
+def test_canonical_formats_round_trip(persisted, tmp_path):
+    """
+    An export converted to the canonical NDJSON (or the binary snapshot) and
+    back gives the export it started from.
+    """
+    source = tmp_path / "stellar.json"
+    stored = tmp_path / EMITTERS[persisted]["file"]
+    back   = tmp_path / "stellar_output.json"
+
+    source.write_text(synthetic_export("stellar", 200))
+
+    assert convert_file("stellar", [persisted], source, [stored]) == 200
+    assert convert_file(persisted, ["stellar"], stored, [back]) == 200
+
+    assert json.loads(back.read_text()) == json.loads(source.read_text())
+
+def test_jobs_keep_the_input_order():
+    """
+    With --jobs the chunks are converted in worker processes, and come back
+    (pre-encoded) in input order, matching a single-process run.
+    """
+    export    = json.loads(synthetic_export("valor", 400))
+    raw       = list(export.values())
+    expected  = [profile for (chunk,) in iter_converted_chunks(raw, "valor", ["stellar"], chunk_size=37)
+                 for profile in chunk]
+    converted = [json.loads(profile) for (chunk,) in iter_converted_chunks(raw, "valor", ["stellar"], 3, 37)
+                 for profile in chunk]
+
+    assert converted == expected
+    assert [profile["profileName"] for profile in converted] == [profile["name"] for profile in raw]
+
+def test_several_targets_parse_each_profile_once():
+    """
+    Converting to several targets parses every profile once and emits it
+    for each target, giving what converting to each target alone gives.
+    """
+    export = json.loads(synthetic_export("valor", 120))
+    stats  = ConversionStats()
+
+    results, count = convert_export("valor", ["stellar", "cybersole"], export, stats=stats)
+
+    assert count == 120
+    assert stats.stages["parse"][1] == 120
+    assert stats.stages["emit"][1] == 240
+
+    for to_bot, result in zip(["stellar", "cybersole"], results):
+        (alone,), _ = convert_export("valor", to_bot, export)
+        assert without_minted_ids(result) == without_minted_ids(alone)
+
+def test_bot_detection_reads_a_bounded_prefix():
+    """
+    Detecting the bot of an export only reads up to its first profile (at
+    most SNIFF_SIZE per candidate bot), however large the export is, even
+    for Cybersole's single group holding every profile.
+    """
+    export = synthetic_export("cybersole", 3000)
+    reader = _CountingReader(export)
+
+    assert detect_export_bot(reader) == "cybersole"
+    assert reader.read_chars <= len(PARSERS) * SNIFF_SIZE < len(export)
+
+    for bot in ["stellar", "valor", CANONICAL]:
+        assert detect_export_bot(_CountingReader(synthetic_export(bot, 5))) == bot
+
+    assert detect_export_bot(_CountingReader('{"not": "an export"}')) is None
+
+def test_batch_converts_every_detected_export(tmp_path):
+    """
+    Batch mode detects the bot of every file in a directory and writes one
+    output per file, and a report with the profiles of each.
+    """
+    exports = tmp_path / "exports"
+    exports.mkdir()
+
+    for bot, count in [("stellar", 3), ("valor", 4), ("cybersole", 5)]:
+        (exports / f"{bot}_export.json").write_text(synthetic_export(bot, count))
+
+    report = convert_batch(str(exports), CANONICAL, tmp_path / "out")
+    files  = {Path(result["input"]).name: result for result in report["files"]}
+
+    assert report["succeeded"] == 3 and report["total_profiles"] == 12
+    assert {name: result["source"] for name, result in files.items()} == {
+        "stellar_export.json": "stellar", "valor_export.json": "valor", "cybersole_export.json": "cybersole"
+    }
+    assert all(Path(result["outputs"][0]).is_file() for result in files.values())
+
+def test_geography_index_matches_the_lookup_tables():
+    """
+    Every country and province/state resolves, by name or by code, to what
+    the per-country lookups give, also when spelled with other case,
+    spacing or accents; anything else is still rejected.
+    """
+    for name, code in COUNTRY_NAME_TO_CODE_MAP.items():
+        for spelling in (name, code, f"  {name.upper()} ", code.lower()):
+            assert resolve_country(spelling) == (code, name)
+
+    lookups = {
+        "CA": (canada_provinces.find_code_from_province, canada_provinces.find_province_from_code),
+        "US": (us_states.find_code_from_state, us_states.find_state_from_code),
+    }
+    tables  = {"CA": canada_provinces.CANADA_PROVINCE_NAME_TO_CODE_MAP, "US": us_states.US_STATE_NAME_TO_CODE_MAP}
+
+    for country_code, (find_code, find_name) in lookups.items():
+        for name, code in tables[country_code].items():
+            expected = (find_code(name), find_name(code))
+
+            for spelling in (name, code, name.lower(), f" {name}  ", code.lower()):
+                assert resolve_region(country_code, spelling) == expected
+
+    assert resolve_region("CA", "Qu\u00e9bec") == ("QC", "Quebec")
+
+    with pytest.raises(ValueError, match="Unsupported country: Atlantis"):
+        resolve_country("Atlantis")
+    with pytest.raises(ValueError, match="Country 'FR' is not supported yet"):
+        resolve_region("FR", "Paris")
+    with pytest.raises(ValueError, match="Unsupported state name: Ontario"):
+        resolve_region("US", "Ontario")
+
+def if_chain_card_type(number: str) -> str:
+    """
+    The card type as the if-chain the classifier table replaced found it.
+    """
+    if number.startswith("4"):
+        return "visa"
+    if number.startswith(("34", "37")):
+        return "amex"
+    if number[:2] in {str(i) for i in range(51, 56)}:
+        return "mastercard"
+    if 2221 <= int(number[:4]) <= 2720:
+        return "mastercard"
+    if number.startswith(("6011", "65")) or 644 <= int(number[:3]) <= 649:
+        return "discover"
+    if 3528 <= int(number[:4]) <= 3589:
+        return "jcb"
+
+    raise ValueError(f"Unable to infer card type from card number: {number}")
+
+def test_card_classifier_matches_the_if_chain():
+    """
+    For every 4-digit prefix the classifier table gives the if-chain's card
+    type or error, one number at a time and in a batch.
+    """
+    numbers  = [f"{prefix:04d}" + "1" * 12 for prefix in range(10_000)]
+    expected = [outcome(if_chain_card_type, number) for number in numbers]
+
+    assert [outcome(determine_card_type, number) for number in numbers] == expected
+    assert classify_many(numbers, strict=False) == [
+        None if card_type.startswith("ValueError") else card_type for card_type in expected
+    ]
+    assert classify_many(["4111 1111 1111 1111", "3714 496353 98431"]) == ["visa", "amex"]
+
+    with pytest.raises(ValueError, match="Unable to infer card type from card number: 9999"):
+        classify_many(["4111111111111111", "9999111111111111"])
+
+@pytest.mark.parametrize("from_bot, to_bot", [
+    (from_bot, to_bot) for from_bot in PARSERS for to_bot in EMITTERS if from_bot != to_bot
+])
+def test_synthetic_exports_convert_to_every_target(from_bot, to_bot, tmp_path):
+    """
+    The synthetic export of every bot converts to every other target, so the
+    benchmark suite measures every pair.
+    """
+    export = tmp_path / PARSERS[from_bot]["file"]
+
+    write_synthetic_export(from_bot, export, 40)
+
+    assert convert_file(from_bot, [to_bot], export, [tmp_path / EMITTERS[to_bot]["file"]]) == 40
+
+def test_benchmark_suite_fails_on_failing_pairs():
+    """
+    A pair that fails is reported even when it already failed in the
+    baseline, and a slower pair only beyond the tolerance.
+    """
+    def report(*results):
+        return {"runs": [{"size": 1000, "results": [
+            {"source": source, "target": "valor", "error": error, "profiles_per_sec": speed}
+            for source, error, speed in results
+        ]}]}
+
+    baseline = report(("stellar", None, 1000), ("cybersole", "ValueError: bad", None), ("canonical", None, 1000))
+    current  = report(("stellar", None, 900), ("cybersole", "ValueError: bad", None), ("canonical", None, 800))
+
+    assert find_regressions(current, baseline, 0.15) == [
+        "cybersole -> valor (1000 profiles) fails: ValueError: bad",
+        "canonical -> valor (1000 profiles): 800 profiles/sec, baseline 1000",
+    ]
+
+def test_stats_count_stages_and_caches():
+    """
+    Stats count the profiles and chunks converted, one call per profile in
+    each per-profile stage, and one address cache lookup per address parsed.
+    """
+    export    = synthetic_export("stellar", 1200)
+    addresses = sum(1 if profile["billingAsShipping"] else 2 for profile in json.loads(export))
+
+    stats = ConversionStats()
+    convert_export("stellar", "valor", export, output="text", stats=stats, direct=False)
+    report = stats.as_dict()
+
+    assert report["counters"] == {"chunks": 3, "profiles": 1200}
+    assert {stage: report["stages"][stage]["calls"] for stage in ("decode", "parse", "emit", "write")} == {
+        "decode": 1201, "parse": 1200, "emit": 1200, "write": 1
+    }
+    assert report["caches"]["stellar_parser"]["hits"] + report["caches"]["stellar_parser"]["misses"] == addresses
+    assert report["seconds"] > 0
+
+    stats = ConversionStats()
+    convert_export("stellar", "valor", export, stats=stats)
+
+    assert stats.stages["transcode"][1] == 1200
+    assert "parse" not in stats.stages and "emit" not in stats.stages
+
+def test_disabled_stats_wrap_nothing():
+    """
+    With stats off the pipeline calls the parsers and emitters themselves.
+    """
+    profile_parser = PARSERS["stellar"]["profile_parser"]
+    export         = [1, 2, 3]
+
+    assert NULL_STATS.timed("parse", profile_parser) is profile_parser
+    assert NULL_STATS.timed_iter("decode", export) is export
+
+def test_profile_cache_reuses_profiles_with_fresh_ids(tmp_path):
+    """
+    A second run restores every profile from the cache under newly minted
+    ids; an edited profile, or other converter code, is converted again.
+    """
+    export = json.loads(synthetic_export("stellar", 50))
+    path   = tmp_path / "cache.sqlite"
+
+    def convert(raw_profiles, cache):
+        stats       = ConversionStats()
+        (text,), _  = convert_export("stellar", "cybersole", raw_profiles, output="text", stats=stats, cache=cache)
+        (group,)    = json.loads(text)
+        return group["profiles"], stats.counters.get("cached", 0)
+
+    first, cached = convert(export, ProfileCache(path))
+    assert cached == 0
+
+    second, cached = convert(export, ProfileCache(path))
+    assert cached == 50
+    assert without_minted_ids(second) == without_minted_ids(first)
+    assert len({profile["id"] for profile in first + second}) == 100
+
+    export[7]["email"] = "edited@example.com"
+    edited, cached = convert(export, ProfileCache(path))
+    assert cached == 49
+    assert edited[7]["email"] == "edited@example.com"
+
+    _, cached = convert(export, ProfileCache(path, version="other converter code"))
+    assert cached == 0
+
+def test_watch_sync_keeps_ids_and_counts_changes(tmp_path):
+    """
+    A later sync reports the added, changed, removed and unchanged profiles,
+    and keeps the minted ids of every profile it already converted.
+    """
+    export = json.loads(synthetic_export("stellar", 7))
+    added  = export.pop()
+    source = tmp_path / "stellarprofiles.json"
+    output = tmp_path / "cybersole_output.json"
+    state  = tmp_path / ".watch_stellar.json"
+
+    def sync():
+        source.write_text(json.dumps(export))
+        counts   = sync_outputs("stellar", ["cybersole"], source, [output], state)
+        (group,) = json.loads(output.read_text())
+        return counts, {profile["name"]: profile for profile in group["profiles"]}
+
+    counts, first = sync()
+    assert counts["added"] == counts["profiles"] == 6
+
+    export[0]["email"] = "edited@example.com"
+    del export[1]
+    export.append(added)
+
+    counts, second = sync()
+    assert {key: counts[key] for key in ("added", "changed", "removed", "unchanged", "profiles")} == {
+        "added": 1, "changed": 1, "removed": 1, "unchanged": 4, "profiles": 6
+    }
+
+    edited = export[0]["profileName"]
+
+    assert all(second[profile["profileName"]] == first[profile["profileName"]] for profile in export[1:5])
+    assert second[edited]["id"] == first[edited]["id"]
+    assert second[edited]["email"] == "edited@example.com"
+    assert added["profileName"] not in first
+    assert len({profile["id"] for profile in second.values()}) == 6
+
+    counts, third = sync()
+    assert counts["unchanged"] == 6 and third == second
+
+def test_registry_imports_bot_modules_on_first_use():
+    """
+    Importing the CLI loads no bot package and none of the mode-specific
+    services; looking a parser up imports just its module, once.
+    """
+    script = (
+        "import sys, convert\n"
+        "from benchmarks.startup import LAZY_PACKAGES\n"
+        "from registries.bot_registry import PARSERS\n"
+        "loaded = lambda: sorted(m for m in sys.modules if m.split('.')[0] in LAZY_PACKAGES)\n"
+        "eager  = [m for m in ('services.server_service', 'services.watch_service', "
+        "'services.batch_service', 'helpers.profile_cache', 'http.server', 'sqlite3') if m in sys.modules]\n"
+        "before = loaded()\n"
+        "entry  = PARSERS['stellar']\n"
+        "reader = entry['reader']\n"
+        "print(json.dumps([eager, before, 'parsers.stellar_parser' in loaded(), entry['reader'] is reader, "
+        "'parsers.valor_parser' in sys.modules]))\n"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", "import json\n" + script],
+        cwd=Path(__file__).resolve().parent, capture_output=True, text=True, check=True
+    )
+
+    assert json.loads(completed.stdout) == [[], [], True, True, False]
+
+@pytest.mark.parametrize("compression", COMPRESSION_NAMES)
+def test_compressed_exports_round_trip(compression, tmp_path):
+    """
+    A compressed export is recognized by its magic bytes whatever it is
+    named and converts like the plain one; outputs are compressed by their
+    extension, and corrupt or truncated data is a ValueError.
+    """
+    plain = tmp_path / "stellarprofiles.json"
+    write_synthetic_export("stellar", plain, 30)
+
+    packed = tmp_path / "export.json"
+    with open_text_output(packed, compression) as f:
+        f.write(plain.read_text(encoding="utf-8"))
+
+    assert detect_compression(plain) is None
+    assert detect_compression(packed) == compression
+
+    outputs = [tmp_path / "plain_cybersole.json", compressed_path(tmp_path / "cybersole.json", compression)]
+
+    for input_file, output_file in zip((plain, packed), outputs):
+        assert convert_file("stellar", ["cybersole"], input_file, [output_file]) == 30
+
+    assert outputs[1].name.endswith(".json" + outputs[1].suffix) and detect_compression(outputs[1]) == compression
+
+    with open_text_input(outputs[1]) as f:
+        unpacked = f.read()
+
+    assert without_minted_ids(json.loads(unpacked)) == without_minted_ids(json.loads(outputs[0].read_text()))
+
+    data = outputs[1].read_bytes()
+    assert decompress_bytes(data) == unpacked.encode("utf-8")
+    assert decompress_bytes(unpacked.encode("utf-8")) == unpacked.encode("utf-8")
+
+    with pytest.raises(ValueError, match=f"not valid {compression} data"):
+        decompress_bytes(data[:len(data) // 2])
+
+    packed.write_bytes(data[:len(data) // 2])
+    with pytest.raises(ValueError):
+        convert_file("stellar", ["cybersole"], packed, [tmp_path / "truncated.json"])
+
+def test_jobs_report_errors_like_a_single_process(tmp_path):
+    """
+    With --jobs the export is split into byte ranges decoded by the
+    workers; a failing profile in a later range is still reported by its
+    index in the input, and invalid JSON by its line and column, exactly as
+    a single process reports them.
+    """
+    export = json.loads(synthetic_export("stellar", 1500))
+    source = tmp_path / "stellarprofiles.json"
+    output = tmp_path / "valor.json"
+
+    del export[1400]["email"]
+    source.write_text(json.dumps(export, indent=2))
+
+    for jobs in (1, 2):
+        with pytest.raises(ValueError, match="^Profile at index 1400 could not be converted"):
+            convert_file("stellar", ["valor"], source, [output], jobs=jobs)
+
+    text = source.read_text()
+    cut  = text.rindex('"email"', 0, len(text) - 1000)
+    source.write_text(text[:cut] + '"email" x' + text[cut + len('"email"'):])
+
+    messages = []
+
+    for jobs in (1, 2):
+        with pytest.raises(ValueError, match="contains invalid JSON: Expecting ':' delimiter: line") as error:
+            convert_file("stellar", ["valor"], source, [output], jobs=jobs)
+        messages.append(str(error.value))
+
+    assert messages[0] == messages[1]
+
+async def _async_pieces(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+def test_convert_async_reports_progress(tmp_path):
+    """
+    convert_async reads a compressed upload piece by piece and reports
+    progress after every chunk, ending with done=True once the output is
+    the one convert_file writes.
+    """
+    source = tmp_path / "stellarprofiles.json"
+    write_synthetic_export("stellar", source, 500)
+    upload = gzip.compress(source.read_bytes())
+
+    async def run():
+        return [
+            progress async for progress in convert_async(
+                "stellar", ["cybersole"], _async_pieces(upload, 4096), [tmp_path / "async.json"], chunk_size=64
+            )
+        ]
+
+    reports = asyncio.run(run())
+
+    assert [report.done for report in reports] == [False] * 8 + [True]
+    assert [report.profiles for report in reports] == [64 * n for n in range(1, 8)] + [500, 500]
+    assert reports[-1].bytes_read == len(upload) and reports[-1].failed == 0
+
+    convert_file("stellar", ["cybersole"], source, [tmp_path / "file.json"])
+    converted = [json.loads((tmp_path / name).read_text()) for name in ("async.json", "file.json")]
+    assert without_minted_ids(converted[0]) == without_minted_ids(converted[1])
+
+def test_cancelled_convert_async_leaves_no_output(tmp_path):
+    """
+    Cancelling a convert_async task halfway stops it without writing the
+    output or leaving a temporary file behind.
+    """
+    source = tmp_path / "stellarprofiles.json"
+    output = tmp_path / "valor.json"
+    write_synthetic_export("stellar", source, 500)
+
+    async def run():
+        reports = []
+
+        async def consume():
+            async for progress in convert_async("stellar", ["valor"], source, [output], chunk_size=50):
+                reports.append(progress)
+                await asyncio.sleep(3600)
+
+        task = asyncio.create_task(consume())
+
+        while not reports:
+            await asyncio.sleep(0.01)
+
+        task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        return reports
+
+    assert [report.profiles for report in asyncio.run(run())] == [50]
+    assert sorted(path.name for path in tmp_path.iterdir()) == [source.name]
+
+def test_in_memory_api_matches_convert_file(tmp_path):
+    """
+    convert_export, convert_text and iter_export_batches convert an export
+    held as text, bytes (compressed or not), a loaded document or a
+    generator of raw profiles into what convert_file writes for the file.
+    """
+    source  = tmp_path / "stellarprofiles.json"
+    outputs = [tmp_path / "cybersole.json", tmp_path / "canonical.ndjson"]
+    write_synthetic_export("stellar", source, 120)
+    convert_file("stellar", ["cybersole", CANONICAL], source, outputs)
+
+    text     = source.read_text(encoding="utf-8")
+    expected = [output.read_text(encoding="utf-8") for output in outputs]
+
+    (cybersole,), _ = convert_export("stellar", "cybersole", text)
+    assert without_minted_ids(cybersole) == without_minted_ids(json.loads(expected[0]))
+
+    exports = [text, text.encode("utf-8"), gzip.compress(text.encode("utf-8")), json.loads(text),
+               iter(json.loads(text))]
+
+    for export in exports:
+        texts, count = convert_text("stellar", ["cybersole", CANONICAL], export)
+
+        assert count == 120
+        assert [without_minted_ids(json.loads(texts[0])), texts[1]] == \
+               [without_minted_ids(json.loads(expected[0])), expected[1]]
+
+    (data,), _ = convert_export("stellar", CANONICAL, (profile for profile in json.loads(text)), OUTPUT_BYTES)
+    assert data == expected[1].encode("utf-8")
+
+    batches = list(iter_export_batches("stellar", "cybersole", (profile for profile in json.loads(text)), 50))
+    assert [len(profiles) for (profiles,) in batches] == [50, 50, 20]
+    assert without_minted_ids([profile for (profiles,) in batches for profile in profiles]) == \
+           without_minted_ids([profile for group in cybersole for profile in group["profiles"]])
+
+    with pytest.raises(ValueError, match="Supported outputs"):
+        convert_export("stellar", "valor", text, "xml")
+
+    with pytest.raises(ValueError, match="Binary targets"):
+        convert_export("stellar", SNAPSHOT, text, OUTPUT_TEXT)
+
+    with pytest.raises(ValueError, match="^Input contains invalid JSON"):
+        convert_export("stellar", "valor", text[:-10])
+
+    with pytest.raises(TypeError):
+        convert_export("stellar", "valor", 42)
+
 if __name__ == "__main__":
     # test_valor_to_canonical_to_stellar()
     # test_stellar_to_canonical_to_valor()
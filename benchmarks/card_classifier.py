@@ -0,0 +1,92 @@
+"""
+Micro-benchmark for card type detection.
+
+Compares the original determine_card_type (a chain of startswith/int checks
+that rebuilt the Mastercard prefix set on every call) against the interval
+table in helpers/card_utils, one number at a time and through classify_many.
+
+Usage:
+    python -m benchmarks.card_classifier --numbers 1000000
+"""
+
+import argparse
+import json
+import random
+import time
+
+from helpers.card_utils import classify_many, determine_card_type
+
+
+def legacy_determine_card_type(card_number: str) -> str:
+    """
+    The original determine_card_type.
+    """
+    number = card_number.replace(" ", "")
+
+    if number.startswith("4"):
+        return "visa"
+
+    if number.startswith(("34", "37")):
+        return "amex"
+
+    if number[:2] in {str(i) for i in range(51, 56)}:
+        return "mastercard"
+
+    if 2221 <= int(number[:4]) <= 2720:
+        return "mastercard"
+
+    if number.startswith(("6011", "65")) or 644 <= int(number[:3]) <= 649:
+        return "discover"
+
+    if 3528 <= int(number[:4]) <= 3589:
+        return "jcb"
+
+    raise ValueError(f"Unable to infer card type from card number: {card_number}")
+
+# one representative prefix per branch of the legacy chain, so the legacy
+# function is measured across all of its paths and not just the Visa fast path
+SAMPLE_PREFIXES = ["4", "34", "37", "51", "55", "2221", "2720", "6011", "65", "644", "3528"]
+
+def random_card_numbers(count: int, seed: int = 1) -> list:
+    rng = random.Random(seed)
+    numbers = []
+
+    for _ in range(count):
+        prefix = rng.choice(SAMPLE_PREFIXES)
+        digits = "".join(rng.choices("0123456789", k=16 - len(prefix)))
+        numbers.append(prefix + digits)
+
+    return numbers
+
+def numbers_per_second(classify, numbers: list) -> float:
+    started = time.perf_counter()
+
+    for number in numbers:
+        classify(number)
+
+    return len(numbers) / (time.perf_counter() - started)
+
+def main():
+    parser = argparse.ArgumentParser(description="Card classifier micro-benchmark")
+    parser.add_argument("--numbers", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    numbers = random_card_numbers(args.numbers)
+
+    if [legacy_determine_card_type(n) for n in numbers[:10_000]] != classify_many(numbers[:10_000]):
+        raise SystemExit("Classifier disagrees with the legacy implementation")
+
+    started = time.perf_counter()
+    classify_many(numbers)
+    batch_per_sec = len(numbers) / (time.perf_counter() - started)
+
+    print(json.dumps({
+        "numbers": args.numbers,
+        "legacy_per_sec": round(numbers_per_second(legacy_determine_card_type, numbers)),
+        "table_per_sec": round(numbers_per_second(determine_card_type, numbers)),
+        "classify_many_per_sec": round(batch_per_sec),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Throughput of compressed exports and outputs.
+
+Writes a seeded synthetic export (see benchmarks/synthetic.py) uncompressed
+and with every compression in helpers.compression, then measures for each:
+
+    ratio          compressed size / uncompressed size
+    write_mb/s     writing the export through open_output (encoding and
+                   compressing), in uncompressed MB per second
+    read_mb/s      reading the export back through open_text_input
+                   (decompressing only), in uncompressed MB per second
+    convert_s      convert_file from the export to the target bot, with the
+                   output compressed the same way
+
+Timings are the best of --repeats runs.
+
+Usage:
+    python -m benchmarks.compression --bot valor --to stellar --profiles 20000
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic import synthetic_profiles
+from helpers.compression import COMPRESSION_NAMES, compressed_path, open_text_input
+from registries.bot_registry import EMITTERS, PARSERS
+from services.conversion_service import convert_file, open_output
+
+MEGABYTE = 1024 * 1024
+
+
+def best_seconds(call, repeats: int) -> float:
+    best = None
+
+    for _ in range(repeats):
+        started = time.perf_counter()
+        call()
+        elapsed = time.perf_counter() - started
+        best    = elapsed if best is None else min(best, elapsed)
+
+    return best
+
+def read_all(path: Path):
+    with open_text_input(path) as f:
+        while f.read(1024 * 1024):
+            pass
+
+def main():
+    parser = argparse.ArgumentParser(description="Compressed input and output benchmark")
+    parser.add_argument("--bot", choices=[bot for bot in PARSERS if not PARSERS[bot]["binary"]], default="valor")
+    parser.add_argument("--to", choices=[bot for bot in EMITTERS if not EMITTERS[bot]["binary"]], default="stellar")
+    parser.add_argument("--profiles", type=int, default=20_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    emitter_cfg = EMITTERS[args.bot]
+    emitted     = [emitter_cfg["profile_emitter"](profile) for profile in synthetic_profiles(args.profiles, args.seed)]
+    results     = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+
+        def write_export(path: Path):
+            with open_output(path) as f:
+                emitter_cfg["writer"](f, emitted)
+
+        plain_file = tmp / "export.json"
+        write_export(plain_file)
+        plain_mb = plain_file.stat().st_size / MEGABYTE
+
+        for compression in [None] + COMPRESSION_NAMES:
+            export_file = compressed_path(plain_file, compression)
+            output_file = compressed_path(tmp / "output.json", compression)
+
+            write_seconds = best_seconds(lambda: write_export(export_file), args.repeats)
+
+            results[compression or "none"] = {
+                "mb": round(export_file.stat().st_size / MEGABYTE, 2),
+                "ratio": round(export_file.stat().st_size / plain_file.stat().st_size, 3),
+                "write_mb_per_sec": round(plain_mb / write_seconds, 1),
+                "read_mb_per_sec": round(plain_mb / best_seconds(lambda: read_all(export_file), args.repeats), 1),
+                "convert_s": round(best_seconds(
+                    lambda: convert_file(args.bot, [args.to], export_file, [output_file]), args.repeats
+                ), 3),
+            }
+
+    print(json.dumps({
+        "pair": f"{args.bot}->{args.to}",
+        "profiles": args.profiles,
+        "uncompressed_mb": round(plain_mb, 2),
+        "compressions": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+End-to-end conversion benchmark suite.
+
+Generates a seeded synthetic export for every source bot (see
+benchmarks/synthetic.py) and times every source -> target pair in
+PARSERS x EMITTERS. Each pair runs in its own subprocess so peak RSS is
+measured per conversion. Results are printed (or written with --output) as
+JSON, and can be compared against an earlier run with --baseline to catch
+throughput regressions. Exits with status 1 if any pair fails to convert
+(or regressed).
+
+Per pair the report holds:
+    profiles_per_sec  end-to-end throughput of convert_file()
+    peak_rss_kb       peak resident set size of the converting process
+    stages            seconds spent reading, decoding, parsing, emitting and
+                      writing (measured in a second pass with ConversionStats)
+
+Usage:
+    python -m benchmarks.conversion_suite --sizes 1k 100k --output bench.json
+    python -m benchmarks.conversion_suite --sizes 100k --baseline bench.json
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic import parse_size, write_synthetic_export
+from helpers.conversion_stats import ConversionStats
+from registries.bot_registry import EMITTERS, PARSERS
+from services.conversion_service import BASE_DIR, convert_file
+
+# a pair counts as a regression when it is this much slower than the baseline
+DEFAULT_REGRESSION_TOLERANCE = 0.15
+
+
+def peak_rss_kb() -> int | None:
+    """
+    Peak RSS of the current process in KiB, or None where the resource
+    module is unavailable (Windows).
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # reported in bytes on macOS and KiB on Linux
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+def time_stages(from_bot: str, to_bot: str, input_file: Path, output_file: Path) -> dict:
+    """
+    Run one single-process conversion with stats enabled and return the
+    self time of every pipeline stage.
+    """
+    stats = ConversionStats()
+    convert_file(from_bot, [to_bot], input_file, [output_file], stats=stats)
+
+    return {stage: stage_stats["seconds"] for stage, stage_stats in stats.as_dict()["stages"].items()}
+
+def run_pair(from_bot: str, to_bot: str, input_file: Path, output_dir: Path, jobs: int) -> dict:
+    """
+    Benchmark one conversion in the current process (the subprocess side).
+    """
+    output_file = output_dir / f"{from_bot}_to_{to_bot}.json"
+    result      = {"source": from_bot, "target": to_bot, "error": None}
+
+    try:
+        started  = time.perf_counter()
+        profiles = convert_file(from_bot, [to_bot], input_file, [output_file], jobs)
+        seconds  = time.perf_counter() - started
+
+        result["profiles"]         = profiles
+        result["seconds"]          = round(seconds, 4)
+        result["profiles_per_sec"] = round(profiles / seconds)
+        result["peak_rss_kb"]      = peak_rss_kb()
+        result["stages"]           = time_stages(from_bot, to_bot, input_file, output_file)
+
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+
+    finally:
+        output_file.unlink(missing_ok=True)
+
+    return result
+
+def run_pair_subprocess(from_bot: str, to_bot: str, input_file: Path, output_dir: Path, jobs: int) -> dict:
+    completed = subprocess.run(
+        [
+            sys.executable, "-m", "benchmarks.conversion_suite",
+            "--run-pair", from_bot, to_bot, str(input_file), str(output_dir),
+            "--jobs", str(jobs),
+        ],
+        cwd=BASE_DIR,
+        capture_output=True,
+        text=True,
+    )
+
+    if completed.returncode != 0:
+        return {"source": from_bot, "target": to_bot, "error": completed.stderr.strip()[-500:]}
+
+    return json.loads(completed.stdout)
+
+def run_suite(sizes: list[str], seed: int = 1, jobs: int = 1, corpus_dir: Path | None = None) -> dict:
+    """
+    Benchmark every source -> target pair at every corpus size.
+    """
+    pairs = [(source, target) for source in PARSERS for target in EMITTERS if source != target]
+    runs  = []
+
+    with tempfile.TemporaryDirectory(prefix="profiletransformer-bench-") as temp_dir:
+        work_dir = Path(corpus_dir or temp_dir)
+        work_dir.mkdir(parents=True, exist_ok=True)
+
+        for size in sizes:
+            count   = parse_size(size)
+            results = []
+
+            for source in PARSERS:
+                input_file = work_dir / f"synthetic_{source}_{count}_{seed}.json"
+
+                if not input_file.exists():
+                    write_synthetic_export(source, input_file, count, seed)
+
+            for source, target in pairs:
+                input_file = work_dir / f"synthetic_{source}_{count}_{seed}.json"
+                results.append(run_pair_subprocess(source, target, input_file, Path(temp_dir), jobs))
+
+            runs.append({"size": count, "results": results})
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "jobs": jobs,
+        "runs": runs,
+    }
+
+def failed_pairs(report: dict) -> list[str]:
+    """
+    One message per pair that failed to convert at some size.
+    """
+    return [
+        f"{result['source']} -> {result['target']} ({run['size']} profiles) fails: {result['error']}"
+        for run in report["runs"]
+        for result in run["results"]
+        if result["error"]
+    ]
+
+def find_regressions(report: dict, baseline: dict, tolerance: float = DEFAULT_REGRESSION_TOLERANCE) -> list[str]:
+    """
+    Compare throughput against a baseline report of the same suite.
+
+    Returns:
+        One message per pair that fails, or that is more than `tolerance`
+        slower than at the same size in the baseline.
+    """
+    previous = {
+        (run["size"], result["source"], result["target"]): result
+        for run in baseline["runs"]
+        for result in run["results"]
+    }
+
+    regressions = failed_pairs(report)
+
+    for run in report["runs"]:
+        for result in run["results"]:
+            key = (run["size"], result["source"], result["target"])
+            old = previous.get(key)
+            pair = f"{result['source']} -> {result['target']} ({run['size']} profiles)"
+
+            if result["error"] or old is None or old["error"]:
+                continue
+
+            if result["profiles_per_sec"] < old["profiles_per_sec"] * (1 - tolerance):
+                regressions.append(
+                    f"{pair}: {result['profiles_per_sec']} profiles/sec, "
+                    f"baseline {old['profiles_per_sec']}"
+                )
+
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Conversion benchmark suite")
+    parser.add_argument("--sizes", nargs="+", default=["1k"], help="1k, 100k, 1m or profile counts")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--corpus-dir", help="Keep (and reuse) the generated exports in this directory")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    parser.add_argument("--baseline", help="Earlier report to check for throughput regressions")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_REGRESSION_TOLERANCE)
+    parser.add_argument("--run-pair", nargs=4, metavar=("FROM", "TO", "INPUT", "OUTPUT_DIR"),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_pair:
+        from_bot, to_bot, input_file, output_dir = args.run_pair
+        print(json.dumps(run_pair(from_bot, to_bot, Path(input_file), Path(output_dir), args.jobs)))
+        return
+
+    report = run_suite(args.sizes, args.seed, args.jobs, Path(args.corpus_dir) if args.corpus_dir else None)
+
+    report["errors"] = failed_pairs(report)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            report["regressions"] = find_regressions(report, json.load(f), args.tolerance)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if report["errors"] or report.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Throughput and correctness of the export byte-range splitter.
+
+Writes a seeded synthetic export (see benchmarks/synthetic.py) for every bot,
+once as generated and once with profile names full of brackets, quotes and
+escapes (which the splitter has to scan string by string), and measures in
+MB/s of export:
+
+    scan      iter_export_ranges, the part of a --jobs run that stays in
+              the main process
+    decode    the bot's streaming reader, which a --jobs run without the
+              splitter does in the main process
+
+It also checks that decoding every range with read_export_range yields
+exactly the profiles the streaming reader yields. Timings are the best of
+--repeats runs. Exits with status 1 if any export decodes differently.
+
+Usage:
+    python -m benchmarks.export_split --profiles 20000 --range-size 1048576
+"""
+
+import argparse
+import dataclasses
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic import synthetic_profiles
+from helpers.json_split import SPLIT_RANGE_SIZE, iter_export_ranges, read_export_range
+from registries.bot_registry import EMITTERS, PARSERS
+
+MEGABYTE = 1024 * 1024
+
+# appended to every profile name of the adversarial exports
+ADVERSARIAL_NAME = ' {"profiles": [1]}, \\"quoted\\" [\\\\] } ,'
+
+
+def best_seconds(call, repeats: int) -> float:
+    best = None
+
+    for _ in range(repeats):
+        started = time.perf_counter()
+        call()
+        elapsed = time.perf_counter() - started
+        best    = elapsed if best is None else min(best, elapsed)
+
+    return best
+
+def write_export(bot: str, path: Path, profiles: list):
+    emitter_cfg = EMITTERS[bot]
+
+    with path.open("w", encoding="utf-8") as f:
+        emitter_cfg["writer"](f, map(emitter_cfg["profile_emitter"], profiles))
+
+def stream_profiles(bot: str, path: Path) -> list:
+    with path.open("r", encoding="utf-8") as f:
+        return list(PARSERS[bot]["reader"](f))
+
+def run_export(bot: str, path: Path, range_size: int, repeats: int) -> dict:
+    shape  = PARSERS[bot]["shape"]
+    mb     = path.stat().st_size / MEGABYTE
+    ranges = list(iter_export_ranges(path, shape, range_size))
+    split  = [profile for export_range in ranges for profile in read_export_range(export_range)]
+
+    return {
+        "mb": round(mb, 2),
+        "ranges": len(ranges),
+        "scan_mb_per_sec": round(mb / best_seconds(lambda: list(iter_export_ranges(path, shape, range_size)), repeats), 1),
+        "decode_mb_per_sec": round(mb / best_seconds(lambda: stream_profiles(bot, path), repeats), 1),
+        "matches": split == stream_profiles(bot, path),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Export byte-range splitter benchmark")
+    parser.add_argument("--profiles", type=int, default=20_000)
+    parser.add_argument("--range-size", type=int, default=SPLIT_RANGE_SIZE)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    profiles    = list(synthetic_profiles(args.profiles, args.seed))
+    adversarial = [
+        dataclasses.replace(profile, profile_name=profile.profile_name + ADVERSARIAL_NAME)
+        for profile in profiles
+    ]
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # binary exports have no JSON to split
+        for bot in (bot for bot in EMITTERS if not PARSERS[bot]["binary"]):
+            for variant, corpus in (("plain", profiles), ("adversarial", adversarial)):
+                path = Path(tmp) / f"{bot}_{variant}.json"
+                write_export(bot, path, corpus)
+
+                results[f"{bot} {variant}"] = run_export(bot, path, args.range_size, args.repeats)
+
+    print(json.dumps({
+        "profiles": args.profiles,
+        "range_size": args.range_size,
+        "exports": results,
+    }, indent=2))
+
+    if not all(result["matches"] for result in results.values()):
+        raise SystemExit("Split exports decode differently from the streaming reader")
+
+
+if __name__ == "__main__":
+    main()
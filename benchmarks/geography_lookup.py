@@ -0,0 +1,65 @@
+"""
+Micro-benchmark for province/state lookups.
+
+Compares the original per-country if/elif chain (set membership check
+followed by a dict lookup in canada_provinces/us_states) against the flat
+geography index in constants/countries_map, for exact and messy input.
+
+Usage:
+    python -m benchmarks.geography_lookup --lookups 1000000
+"""
+
+import argparse
+import json
+import random
+import time
+
+import constants.canada_provinces as provinces_helper
+import constants.us_states as states_helper
+from constants.countries_map import REGION_NAME_TO_CODE_MAPS, resolve_region
+
+
+def legacy_code_finder(country_code: str, name: str) -> str:
+    """
+    The original province_or_state_code_finder.
+    """
+    if country_code == "CA":
+        return provinces_helper.find_code_from_province(name)
+    elif country_code == "US":
+        return states_helper.find_code_from_state(name)
+    else:
+        raise ValueError(f"Country '{country_code}' is not supported yet")
+
+def messy(name: str, rng: random.Random) -> str:
+    return rng.choice([name.upper(), name.lower(), f"  {name} ", name.replace(" ", "  ")])
+
+def lookups_per_second(finder, queries: list) -> float:
+    started = time.perf_counter()
+
+    for country_code, name in queries:
+        finder(country_code, name)
+
+    return len(queries) / (time.perf_counter() - started)
+
+def main():
+    parser = argparse.ArgumentParser(description="Geography lookup micro-benchmark")
+    parser.add_argument("--lookups", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rng   = random.Random(1)
+    names = [(country, name) for country, table in REGION_NAME_TO_CODE_MAPS.items() for name in table]
+
+    exact = [rng.choice(names) for _ in range(args.lookups)]
+    noisy = [(country, messy(name, rng)) for country, name in exact]
+
+    print(json.dumps({
+        "lookups": args.lookups,
+        "legacy_exact_per_sec": round(lookups_per_second(legacy_code_finder, exact)),
+        "index_exact_per_sec": round(lookups_per_second(resolve_region, exact)),
+        # the legacy finders reject anything but the exact spelling
+        "index_normalized_per_sec": round(lookups_per_second(resolve_region, noisy)),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
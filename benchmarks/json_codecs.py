@@ -0,0 +1,131 @@
+"""
+Throughput of the JSON codecs, with a semantic equality check.
+
+For every installed codec (see helpers.json_codec) and both output layouts,
+writes a seeded synthetic corpus (see benchmarks/synthetic.py) through every
+bot's writer and measures, in MB/s of JSON:
+
+    encode    the bot's writer, envelope included
+    decode    loading the whole written export at once
+
+and, in profiles per second, convert_text from the bot's export to the next
+bot's, end to end (streaming read, transcode, write). It also checks that
+the output decodes to exactly what the stdlib codec's indented output
+decodes to, minted ids aside. The streaming export reader always uses the
+stdlib scanner, so its throughput is reported once per bot.
+
+Timings are the best of --repeats runs. Exits with status 1 if any codec's
+output differs.
+
+Usage:
+    python -m benchmarks.json_codecs --profiles 20000 --repeats 5
+"""
+
+import argparse
+import io
+import json
+import time
+
+from benchmarks.synthetic import synthetic_profiles
+from helpers.json_codec import CODEC_STDLIB, JSONCodec, available_codecs
+from registries.bot_registry import EMITTERS, PARSERS
+from services.conversion_service import convert_text
+
+MEGABYTE = 1024 * 1024
+
+# keys holding ids minted per write (the Cybersole profile group's)
+MINTED_ID_KEYS = {"id"}
+
+
+def best_seconds(call, repeats: int) -> float:
+    best = None
+
+    for _ in range(repeats):
+        started = time.perf_counter()
+        call()
+        elapsed = time.perf_counter() - started
+        best    = elapsed if best is None else min(best, elapsed)
+
+    return best
+
+def without_minted_ids(value):
+    if isinstance(value, dict):
+        return {key: None if key in MINTED_ID_KEYS else without_minted_ids(item) for key, item in value.items()}
+
+    if isinstance(value, list):
+        return [without_minted_ids(item) for item in value]
+
+    return value
+
+def write_export(bot: str, emitted: list, codec: JSONCodec) -> str:
+    fp = io.StringIO()
+    EMITTERS[bot]["writer"](fp, emitted, codec)
+
+    return fp.getvalue()
+
+def mb_per_second(text: str, seconds: float) -> float:
+    return round(len(text.encode("utf-8")) / MEGABYTE / seconds, 1)
+
+def run_bot(bot: str, to_bot: str, profiles: list, repeats: int) -> dict:
+    emitted   = [EMITTERS[bot]["profile_emitter"](profile) for profile in profiles]
+    reference = write_export(bot, emitted, JSONCodec(CODEC_STDLIB))
+    expected  = without_minted_ids(json.loads(reference))
+
+    def stream():
+        for _ in PARSERS[bot]["reader"](io.StringIO(reference)):
+            pass
+
+    result = {
+        "reference_mb": round(len(reference.encode("utf-8")) / MEGABYTE, 2),
+        "stream_mb_per_sec": mb_per_second(reference, best_seconds(stream, repeats)),
+        "codecs": {},
+        "mismatches": [],
+    }
+
+    for name in available_codecs():
+        for compact in (False, True):
+            codec = JSONCodec(name, compact)
+            text  = write_export(bot, emitted, codec)
+
+            if without_minted_ids(json.loads(text)) != expected:
+                result["mismatches"].append(f"{name} {codec.layout}")
+
+            convert_seconds = best_seconds(lambda: convert_text(bot, [to_bot], text, codec=codec), repeats)
+
+            result["codecs"][f"{name} {codec.layout}"] = {
+                "mb": round(len(text.encode("utf-8")) / MEGABYTE, 2),
+                "encode_mb_per_sec": mb_per_second(text, best_seconds(lambda: write_export(bot, emitted, codec), repeats)),
+                "decode_mb_per_sec": mb_per_second(text, best_seconds(lambda: codec.loads(text), repeats)),
+                "convert_per_sec": round(len(profiles) / convert_seconds),
+            }
+
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON codec throughput benchmark")
+    parser.add_argument("--profiles", type=int, default=20_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    profiles = list(synthetic_profiles(args.profiles, args.seed))
+    bots     = [bot for bot in EMITTERS if not EMITTERS[bot]["binary"]]
+    results  = {}
+
+    for i, bot in enumerate(bots):
+        # convert each export into the next bot's format
+        to_bot       = bots[(i + 1) % len(bots)]
+        results[bot] = run_bot(bot, to_bot, profiles, args.repeats)
+
+    print(json.dumps({
+        "profiles": args.profiles,
+        "codecs": available_codecs(),
+        "bots": results,
+    }, indent=2))
+
+    if any(result["mismatches"] for result in results.values()):
+        raise SystemExit("JSON codecs disagree with the standard library")
+
+
+if __name__ == "__main__":
+    main()
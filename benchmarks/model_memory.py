@@ -0,0 +1,174 @@
+"""
+Memory benchmark for the canonical models.
+
+Compares bytes per canonical profile for the slotted, interned models in
+models/canonical.py against the original plain @dataclass models (with a
+per-instance __dict__ and no interning), parsing the same raw Stellar
+profiles both ways.
+
+Usage:
+    python -m benchmarks.model_memory --profiles 100000
+"""
+
+import argparse
+import json
+import random
+import tracemalloc
+from dataclasses import dataclass
+
+from constants.canada_provinces import CANADA_PROVINCE_NAME_TO_CODE_MAP
+from constants.us_states import US_STATE_NAME_TO_CODE_MAP
+import constants.countries_map as countries_helper
+from helpers.address_cache import clear_address_caches
+from parsers.stellar_parser import stellar_profile_to_canonical
+
+
+# The canonical models as they were before slots/interning
+
+@dataclass
+class LegacyAddress:
+    first_name: str
+    last_name: str
+    address_line_1: str
+    address_line_2: str
+    country_name: str
+    country_code: str
+    state_name: str
+    state_code: str
+    city: str
+    zip_code: str
+
+@dataclass
+class LegacyCard:
+    holder: str
+    card_type: str
+    number: str
+    exp_month: str
+    exp_year: str
+    cvv: str
+
+@dataclass
+class LegacyProfile:
+    profile_name: str
+    email: str
+    phone_number: str
+    shipping_address: LegacyAddress
+    billing_address: LegacyAddress
+    billing_same_as_ship: bool
+    card: LegacyCard
+    one_checkout: bool = False
+
+def legacy_stellar_address(raw: dict) -> LegacyAddress:
+    return LegacyAddress(
+        first_name     = raw["firstName"],
+        last_name      = raw["lastName"],
+        address_line_1 = raw["address"],
+        address_line_2 = raw.get("address2", ""),
+        country_name   = countries_helper.find_country_from_code(raw["country"]),
+        country_code   = raw["country"],
+        state_name     = countries_helper.province_or_state_name_finder(raw["country"], raw["state"]),
+        state_code     = raw["state"],
+        city           = raw["city"],
+        zip_code       = raw["zipcode"],
+    )
+
+def legacy_stellar_profile(raw: dict) -> LegacyProfile:
+    """
+    Mirrors the original Stellar parser, building the legacy models.
+    """
+    shipping = legacy_stellar_address(raw["shipping"])
+    payment  = raw["payment"]
+
+    return LegacyProfile(
+        profile_name         = raw["profileName"],
+        email                = raw["email"],
+        phone_number         = raw["phone"],
+        shipping_address     = shipping,
+        billing_address      = shipping if raw["billingAsShipping"] else legacy_stellar_address(raw["billing"]),
+        billing_same_as_ship = raw["billingAsShipping"],
+        card                 = LegacyCard(
+            holder    = payment["cardName"],
+            card_type = payment["cardType"].strip().lower(),
+            number    = payment["cardNumber"],
+            exp_month = payment["cardMonth"],
+            exp_year  = payment["cardYear"],
+            cvv       = payment["cardCvv"],
+        ),
+        one_checkout         = raw.get("oneCheckoutPerProfile", False),
+    )
+
+def raw_stellar_export(count: int, seed: int = 1) -> str:
+    """
+    Serialized Stellar export, so decoding gives every profile its own
+    string objects just like a real file would.
+    """
+    rng = random.Random(seed)
+    regions = (
+        [("CA", code) for code in CANADA_PROVINCE_NAME_TO_CODE_MAP.values()]
+        + [("US", code) for code in US_STATE_NAME_TO_CODE_MAP.values()]
+    )
+
+    def address(i):
+        country, state = rng.choice(regions)
+        return {
+            "firstName": f"First{i}", "lastName": f"Last{i}",
+            "country": country, "address": f"{i} Main Street", "address2": "",
+            "state": state, "city": f"City{i % 500}", "zipcode": f"{i:06d}",
+        }
+
+    profiles = []
+    for i in range(count):
+        same = rng.random() < 0.7
+        shipping = address(i)
+        profiles.append({
+            "profileName": f"Profile {i}", "email": f"user{i}@example.com", "phone": f"{6040000000 + i}",
+            "shipping": shipping, "billingAsShipping": same, "billing": shipping if same else address(i),
+            "payment": {
+                "cardName": f"First{i} Last{i}", "cardType": rng.choice(["Visa", "MasterCard", "Amex"]),
+                "cardNumber": f"{4000000000000000 + i}", "cardMonth": "01", "cardYear": "30", "cardCvv": "123",
+            },
+            "oneCheckoutPerProfile": False,
+        })
+
+    return json.dumps(profiles)
+
+def measure(builder, export_text: str) -> float:
+    """
+    Bytes retained per profile by the objects builder creates.
+    """
+    raw_profiles = json.loads(export_text)
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+
+    built = [builder(raw) for raw in raw_profiles]
+    # drop the raw input and the (bounded) address caches so only what the
+    # models themselves keep alive is counted
+    raw_profiles.clear()
+    clear_address_caches()
+
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+
+    return retained / len(built)
+
+def main():
+    parser = argparse.ArgumentParser(description="Canonical model memory benchmark")
+    parser.add_argument("--profiles", type=int, default=100_000)
+    args = parser.parse_args()
+
+    export_text = raw_stellar_export(args.profiles)
+
+    before = measure(legacy_stellar_profile, export_text)
+    after  = measure(stellar_profile_to_canonical, export_text)
+
+    print(json.dumps({
+        "profiles": args.profiles,
+        "bytes_per_profile_before": round(before, 1),
+        "bytes_per_profile_after": round(after, 1),
+        "reduction_percent": round(100 * (1 - after / before), 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
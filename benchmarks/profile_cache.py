@@ -0,0 +1,113 @@
+"""
+Benchmark for the on-disk profile cache on a daily re-export.
+
+Writes a synthetic export (see benchmarks/synthetic.py) and a "next day"
+copy of it with a share of the profiles edited, then times:
+
+    uncached     converting the next-day export without a cache
+    first_run    converting the original export into an empty cache
+    rerun        converting the next-day export with the warm cache
+    decode_only  reading and decoding the next-day export, the I/O floor
+
+A rerun should cost about the edited share of `uncached` on top of I/O.
+
+Usage:
+    python -m benchmarks.profile_cache --bot valor --to stellar --profiles 100000 --changed 0.05
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic import write_synthetic_export
+from helpers.profile_cache import ProfileCache
+from registries.bot_registry import EMITTERS, PARSERS
+from services.conversion_service import convert_file
+
+
+def export_profiles(bot: str, export) -> list[dict]:
+    """
+    The profile dicts inside a loaded export, in order.
+    """
+    if bot == "valor":
+        return list(export.values())
+
+    if bot == "cybersole":
+        return [profile for group in export for profile in group["profiles"]]
+
+    return export
+
+def write_next_day_export(bot: str, input_file: Path, output_file: Path, changed: float, seed: int = 1) -> int:
+    """
+    Copy an export with the email of a share of its profiles edited; the
+    rest, profile ids included, stay as they were.
+
+    Returns:
+        int: number of edited profiles
+    """
+    rng    = random.Random(seed)
+    export = json.loads(input_file.read_text(encoding="utf-8"))
+    count  = 0
+
+    for position, profile in enumerate(export_profiles(bot, export)):
+        if rng.random() < changed:
+            profile["email"] = f"edited.{position}@example.com"
+            count += 1
+
+    output_file.write_text(json.dumps(export, indent=2), encoding="utf-8")
+
+    return count
+
+def seconds(func, *args, **kwargs) -> float:
+    started = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - started
+
+def decode(bot: str, input_file: Path):
+    with input_file.open("r", encoding="utf-8") as f:
+        for _ in PARSERS[bot]["reader"](f):
+            pass
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile cache re-run benchmark")
+    parser.add_argument("--bot", choices=[bot for bot in PARSERS if not PARSERS[bot]["binary"]], default="valor")
+    parser.add_argument("--to", choices=list(EMITTERS), default="stellar")
+    parser.add_argument("--profiles", type=int, default=100_000)
+    parser.add_argument("--changed", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp         = Path(tmp)
+        today       = tmp / "today.json"
+        next_day    = tmp / "next_day.json"
+        output_file = tmp / "output.json"
+
+        write_synthetic_export(args.bot, today, args.profiles, args.seed)
+        edited = write_next_day_export(args.bot, today, next_day, args.changed, args.seed)
+
+        cache = ProfileCache(tmp / "cache.sqlite")
+
+        results = {
+            "uncached": seconds(convert_file, args.bot, [args.to], next_day, [output_file]),
+            "first_run": seconds(convert_file, args.bot, [args.to], today, [output_file], cache=cache),
+            "rerun": seconds(convert_file, args.bot, [args.to], next_day, [output_file], cache=cache),
+            "decode_only": seconds(decode, args.bot, next_day),
+        }
+
+        cache.close()
+
+    print(json.dumps({
+        "pair": f"{args.bot}->{args.to}",
+        "profiles": args.profiles,
+        "edited": edited,
+        "seconds": {stage: round(value, 3) for stage, value in results.items()},
+        "rerun_vs_uncached": round(results["rerun"] / results["uncached"], 3),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
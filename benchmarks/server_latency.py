@@ -0,0 +1,152 @@
+"""
+Request latency of the conversion server against one process per call.
+
+Writes a small synthetic export (see benchmarks/synthetic.py), starts
+`convert.py --serve` and times the same conversion, one request at a time,
+three ways:
+
+    subprocess  a fresh Python process per call with convert.py's imports,
+                the way automation shelling out to convert.py pays for it
+    client      a fresh convert_client.py process per call, sending the
+                export to the running server
+    http        an HTTP request to the running server from this process
+
+Reports the median and 95th percentile latency of each route in
+milliseconds. The server runs without the profile cache, so every request
+converts the export again.
+
+Usage:
+    python -m benchmarks.server_latency --bot valor --to stellar --profiles 5 --requests 50
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic import write_synthetic_export
+from convert_client import request_conversion
+from registries.bot_registry import EMITTERS, PARSERS
+from services.conversion_service import BASE_DIR
+
+# what `python convert.py` imports and runs, with files of our choosing
+SUBPROCESS_CONVERSION = (
+    "import sys, convert\n"
+    "from pathlib import Path\n"
+    "from services.conversion_service import convert_file\n"
+    "convert_file(sys.argv[1], [sys.argv[2]], Path(sys.argv[3]), [Path(sys.argv[4])])\n"
+)
+
+SERVER_START_TIMEOUT = 60
+
+
+def latencies(call, requests: int) -> list[float]:
+    """
+    Seconds taken by each of `requests` sequential calls, after one warm-up
+    call.
+    """
+    call()
+    timings = []
+
+    for _ in range(requests):
+        started = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - started)
+
+    return timings
+
+def summary(timings: list[float]) -> dict:
+    ordered = sorted(timings)
+
+    return {
+        "median_ms": round(statistics.median(ordered) * 1000, 2),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 2),
+    }
+
+def start_server(workers: int) -> tuple[subprocess.Popen, int]:
+    """
+    Start convert.py --serve on a free port.
+
+    Returns:
+        The server process and its port.
+    """
+    server = subprocess.Popen(
+        [sys.executable, "convert.py", "--serve", "--port", "0", "--workers", str(workers)],
+        cwd=BASE_DIR,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+
+    # "Serving conversions on http://127.0.0.1:PORT with ..."
+    line = server.stdout.readline()
+
+    if "http://" not in line:
+        server.kill()
+        raise RuntimeError(f"Server failed to start: {line.strip()}")
+
+    return server, int(line.split("http://", 1)[1].split(" ", 1)[0].rsplit(":", 1)[1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Conversion server latency benchmark")
+    parser.add_argument("--bot", choices=[bot for bot in PARSERS if not PARSERS[bot]["binary"]], default="valor")
+    parser.add_argument("--to", choices=[bot for bot in EMITTERS if not EMITTERS[bot]["binary"]], default="stellar")
+    parser.add_argument("--profiles", type=int, default=5)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp         = Path(tmp)
+        input_file  = tmp / "export.json"
+        output_file = tmp / "output.json"
+
+        write_synthetic_export(args.bot, input_file, args.profiles, args.seed)
+
+        payload = input_file.read_bytes()
+        query   = {"from": args.bot, "to": [args.to]}
+
+        server, port = start_server(args.workers)
+
+        try:
+            routes = {
+                "subprocess": lambda: subprocess.run(
+                    [sys.executable, "-c", SUBPROCESS_CONVERSION, args.bot, args.to, str(input_file), str(output_file)],
+                    cwd=BASE_DIR, check=True
+                ),
+                "client": lambda: subprocess.run(
+                    [
+                        sys.executable, "convert_client.py", "--port", str(port), "--from", args.bot,
+                        "--to", args.to, "--send", str(input_file), "--output", str(output_file)
+                    ],
+                    cwd=BASE_DIR, check=True, stderr=subprocess.DEVNULL
+                ),
+                "http": lambda: request_conversion(query, payload, port=port),
+            }
+
+            results = {route: summary(latencies(call, args.requests)) for route, call in routes.items()}
+
+        finally:
+            server.terminate()
+            server.wait()
+
+    baseline = results["subprocess"]["median_ms"]
+
+    for result in results.values():
+        result["speedup"] = round(baseline / result["median_ms"], 1)
+
+    print(json.dumps({
+        "pair": f"{args.bot}->{args.to}",
+        "profiles": args.profiles,
+        "requests": args.requests,
+        "workers": args.workers,
+        "routes": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Canonical snapshot versus canonical NDJSON.
+
+Writes a seeded synthetic corpus (see benchmarks/synthetic.py) as canonical
+NDJSON and as a snapshot, then measures:
+
+    write_s        writing every profile in the format
+    mb             file size
+    open_ms        from the path to a readable file: the snapshot is
+                   memory-mapped (see parsers/snapshot_parser.py), NDJSON
+                   has its header line read and checked
+    slice_ms       building --slice Profiles from the middle of the corpus;
+                   NDJSON has to decode every line before them
+    load_s         building every Profile
+
+It also checks that both formats load back the profiles written. Timings
+are the best of --repeats runs. Exits with status 1 if either format loads
+different profiles.
+
+Usage:
+    python -m benchmarks.snapshot --profiles 100000 --slice 1000
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from itertools import islice
+from pathlib import Path
+
+from benchmarks.synthetic import synthetic_profiles
+from parsers.canonical_parser import decode_canonical_profile, iter_canonical_profiles
+from parsers.snapshot_parser import open_snapshot
+from registries.bot_registry import CANONICAL, EMITTERS, SNAPSHOT
+from services.conversion_service import open_output
+
+MEGABYTE = 1024 * 1024
+
+
+def best_seconds(call, repeats: int) -> float:
+    best = None
+
+    for _ in range(repeats):
+        started = time.perf_counter()
+        call()
+        elapsed = time.perf_counter() - started
+        best    = elapsed if best is None else min(best, elapsed)
+
+    return best
+
+def write_file(target: str, path: Path, profiles: list):
+    emitter_cfg = EMITTERS[target]
+
+    with open_output(path, emitter_cfg["binary"]) as f:
+        emitter_cfg["writer"](f, profiles)
+
+def ndjson_profiles(path: Path, start: int = 0, stop: int | None = None) -> list:
+    with path.open("r", encoding="utf-8") as f:
+        return list(map(decode_canonical_profile, islice(iter_canonical_profiles(f), start, stop)))
+
+def ndjson_open(path: Path):
+    with path.open("r", encoding="utf-8") as f:
+        # a generator only checks the header once it is started
+        next(iter_canonical_profiles(f), None)
+
+def snapshot_profiles(path: Path, start: int = 0, stop: int | None = None) -> list:
+    with open_snapshot(path) as snapshot:
+        return snapshot[start:stop]
+
+def snapshot_open(path: Path):
+    open_snapshot(path).close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Canonical snapshot benchmark")
+    parser.add_argument("--profiles", type=int, default=100_000)
+    parser.add_argument("--slice", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    profiles = list(synthetic_profiles(args.profiles, args.seed))
+    start    = max(0, (len(profiles) - args.slice) // 2)
+    stop     = start + args.slice
+    formats  = {
+        CANONICAL: (ndjson_open, ndjson_profiles),
+        SNAPSHOT: (snapshot_open, snapshot_profiles),
+    }
+    results  = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for target, (open_file, load) in formats.items():
+            path = Path(tmp) / EMITTERS[target]["file"]
+
+            results[target] = {
+                "write_s": round(best_seconds(lambda: write_file(target, path, profiles), args.repeats), 3),
+                "mb": round(path.stat().st_size / MEGABYTE, 2),
+                "open_ms": round(best_seconds(lambda: open_file(path), args.repeats) * 1000, 3),
+                "slice_ms": round(best_seconds(lambda: load(path, start, stop), args.repeats) * 1000, 1),
+                "load_s": round(best_seconds(lambda: load(path), args.repeats), 3),
+                "matches": load(path) == profiles,
+            }
+
+    print(json.dumps({
+        "profiles": args.profiles,
+        "slice": [start, stop],
+        "formats": results,
+    }, indent=2))
+
+    if not all(result["matches"] for result in results.values()):
+        raise SystemExit("A canonical format loads different profiles than were written")
+
+
+if __name__ == "__main__":
+    main()
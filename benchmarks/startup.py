@@ -0,0 +1,137 @@
+"""
+Start-up import time benchmark, with budgets.
+
+Imports each start-up module in a fresh interpreter under `python -X importtime`
+and checks two things:
+
+- its cumulative import time (best of --repeats runs) stays within its
+  budget, and
+- it imports nothing from the bot packages the registry loads lazily
+  (parsers, emitters, transcoders, constants, models); those should only be
+  imported once a conversion looks them up.
+
+Prints a JSON report with the heaviest imports of every module and exits
+with status 1 if a budget is exceeded or a bot module is imported eagerly.
+
+Usage:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --budget convert=120 --repeats 10
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+
+from services.conversion_service import BASE_DIR
+
+# milliseconds; the interpreter's own start-up is not included
+DEFAULT_BUDGETS_MS = {
+    "registries.bot_registry": 16,
+    "services.conversion_service": 75,
+    "convert": 80,
+}
+
+# packages registries.bot_registry imports from only on first use
+LAZY_PACKAGES = ["parsers", "emitters", "transcoders", "constants", "models"]
+
+# number of imports listed per module, by their own (self) time
+HEAVIEST_IMPORTS = 5
+
+
+def import_times(module: str) -> list[tuple[str, int, int]]:
+    """
+    Import module in a fresh interpreter.
+
+    Returns:
+        (module name, self microseconds, cumulative microseconds) of every
+        module imported, in the order -X importtime reports them.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BASE_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    times = []
+
+    # "import time:       641 |     153849 |   services.server_service"
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+
+        if self_us.strip().isdigit():
+            times.append((name.strip(), int(self_us), int(cumulative_us)))
+
+    return times
+
+def measure(module: str, repeats: int) -> dict:
+    """
+    Best cumulative import time of module over `repeats` runs, its heaviest
+    imports and any bot modules it imported.
+    """
+    best = None
+
+    for _ in range(repeats):
+        times = import_times(module)
+        total = next(cumulative for name, _, cumulative in times if name == module)
+
+        if best is None or total < best[0]:
+            best = (total, times)
+
+    total, times = best
+    heaviest     = sorted(times, key=lambda item: item[1], reverse=True)[:HEAVIEST_IMPORTS]
+
+    return {
+        "ms": round(total / 1000, 2),
+        "heaviest": {name: round(self_us / 1000, 2) for name, self_us, _ in heaviest},
+        "lazy_imports": sorted(name for name, _, _ in times if name.split(".")[0] in LAZY_PACKAGES),
+    }
+
+def parse_budget(budget: str) -> tuple[str, float]:
+    module, _, ms = budget.partition("=")
+
+    try:
+        return module, float(ms)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Budgets look like module=milliseconds, got '{budget}'")
+
+def main():
+    parser = argparse.ArgumentParser(description="Start-up import time benchmark")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--budget", type=parse_budget, action="append", default=[],
+                        metavar="MODULE=MS", help="Override or add a module's budget")
+    args = parser.parse_args()
+
+    budgets = {**DEFAULT_BUDGETS_MS, **dict(args.budget)}
+    modules = {}
+
+    for module, budget_ms in budgets.items():
+        result = measure(module, args.repeats)
+
+        result["budget_ms"]     = budget_ms
+        result["within_budget"] = result["ms"] <= budget_ms
+        modules[module]         = result
+
+    print(json.dumps({
+        "python": platform.python_version(),
+        "repeats": args.repeats,
+        "modules": modules,
+    }, indent=2))
+
+    failures = [
+        module for module, result in modules.items()
+        if not result["within_budget"] or result["lazy_imports"]
+    ]
+
+    if failures:
+        raise SystemExit(f"Start-up budget exceeded by: {', '.join(failures)}")
+
+
+if __name__ == "__main__":
+    main()
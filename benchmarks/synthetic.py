@@ -0,0 +1,165 @@
+"""
+Seeded synthetic profile corpus.
+
+Generates canonical profiles that mix countries, provinces/states, card
+networks and billing-different profiles, and writes them out as a bot export
+through that bot's own emitter and writer, so every generated file is a valid
+export of the format the converters read. The same seed always produces the
+same profiles.
+
+Usage:
+    python -m benchmarks.synthetic --bot valor --size 100k --output valorprofiles.json
+"""
+
+import argparse
+import random
+from pathlib import Path
+from typing import Iterator
+
+from constants.countries_map import COUNTRY_CODE_TO_NAME_MAP, REGION_NAME_TO_CODE_MAPS
+from models.canonical import Address, Card, Profile
+from registries.bot_registry import EMITTERS
+
+SYNTHETIC_SIZES = {
+    "1k": 1_000,
+    "100k": 100_000,
+    "1m": 1_000_000,
+}
+
+# share of profiles with a separate billing address
+BILLING_DIFFERENT_RATE = 0.3
+
+# number of distinct addresses, so addresses repeat across profiles the way
+# they do in real exports
+ADDRESS_POOL_SIZE = 5_000
+
+# (card type, number prefix, number length, cvv length)
+CARD_NETWORKS = [
+    ("visa", "4", 16, 3),
+    ("mastercard", "51", 16, 3),
+    ("mastercard", "2221", 16, 3),
+    ("amex", "34", 15, 4),
+    ("amex", "37", 15, 4),
+    ("discover", "6011", 16, 3),
+    ("discover", "65", 16, 3),
+    ("jcb", "3528", 16, 3),
+]
+
+FIRST_NAMES = ["John", "Jane", "Alex", "Sam", "Taylor", "Jordan", "Chris", "Morgan", "Casey", "Riley"]
+LAST_NAMES  = ["Doe", "Smith", "Lee", "Brown", "Wilson", "Martin", "Tremblay", "Garcia", "Nguyen", "Clark"]
+STREETS     = ["Main St", "Oak Ave", "Maple Dr", "King St", "Queen St", "Park Rd", "Hill Cres", "Lake Blvd"]
+
+def synthetic_regions() -> list:
+    """
+    Every supported region grouped by country, as one list of
+    (country code, country name, region code, region name) per country.
+    Countries are picked first, so each is equally represented.
+    """
+    return [
+        [
+            (country_code, COUNTRY_CODE_TO_NAME_MAP[country_code], region_code, region_name)
+            for region_name, region_code in regions.items()
+        ]
+        for country_code, regions in REGION_NAME_TO_CODE_MAPS.items()
+    ]
+
+def synthetic_profiles(count: int, seed: int = 1) -> Iterator[Profile]:
+    """
+    Lazily generate count canonical profiles from a seed.
+    """
+    rng     = random.Random(seed)
+    regions = synthetic_regions()
+
+    def address(street: int) -> Address:
+        country_code, country_name, region_code, region_name = rng.choice(rng.choice(regions))
+
+        return Address(
+            first_name     = rng.choice(FIRST_NAMES),
+            last_name      = rng.choice(LAST_NAMES),
+            address_line_1 = f"{street + 1} {STREETS[street % len(STREETS)]}",
+            address_line_2 = rng.choice(["", "", "", f"Unit {street % 40 + 1}"]),
+            country_name   = country_name,
+            country_code   = country_code,
+            state_name     = region_name,
+            state_code     = region_code,
+            city           = f"City {street % 300}",
+            zip_code       = f"{street:05d}",
+        )
+
+    def card(holder: str) -> Card:
+        card_type, prefix, length, cvv_length = rng.choice(CARD_NETWORKS)
+
+        return Card(
+            holder    = holder,
+            card_type = card_type,
+            number    = prefix + "".join(rng.choices("0123456789", k=length - len(prefix))),
+            exp_month = f"{rng.randint(1, 12):02d}",
+            exp_year  = f"{rng.randint(26, 35)}",
+            cvv       = "".join(rng.choices("0123456789", k=cvv_length)),
+        )
+
+    addresses = [address(street) for street in range(ADDRESS_POOL_SIZE)]
+
+    for i in range(count):
+        shipping   = rng.choice(addresses)
+        same       = rng.random() >= BILLING_DIFFERENT_RATE
+        first_name = shipping.first_name
+        last_name  = shipping.last_name
+
+        yield Profile(
+            profile_name         = f"Profile {i}",
+            email                = f"{first_name.lower()}.{last_name.lower()}{i}@example.com",
+            phone_number         = f"{rng.randint(2000000000, 9999999999)}",
+            shipping_address     = shipping,
+            billing_address      = shipping if same else rng.choice(addresses),
+            billing_same_as_ship = same,
+            card                 = card(f"{first_name} {last_name}"),
+            one_checkout         = rng.random() < 0.1,
+        )
+
+def parse_size(size: str) -> int:
+    """
+    Accept a named size ("1k", "100k", "1m") or a plain profile count.
+    """
+    if size.lower() in SYNTHETIC_SIZES:
+        return SYNTHETIC_SIZES[size.lower()]
+
+    if not size.isdigit() or int(size) < 1:
+        raise ValueError(f"Invalid corpus size: {size}. Supported sizes: {list(SYNTHETIC_SIZES)}")
+
+    return int(size)
+
+def write_synthetic_export(bot: str, output_file: Path, count: int, seed: int = 1) -> int:
+    """
+    Write a synthetic export for bot to output_file.
+
+    Returns:
+        int: number of profiles written
+    """
+    if bot not in EMITTERS:
+        raise ValueError(f"Unsupported bot: {bot}")
+
+    emitter_cfg = EMITTERS[bot]
+    profiles    = synthetic_profiles(count, seed)
+
+    if emitter_cfg["binary"]:
+        with Path(output_file).open("wb") as f:
+            return emitter_cfg["writer"](f, map(emitter_cfg["profile_emitter"], profiles))
+
+    with Path(output_file).open("w", encoding="utf-8") as f:
+        return emitter_cfg["writer"](f, map(emitter_cfg["profile_emitter"], profiles))
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic bot export generator")
+    parser.add_argument("--bot", choices=list(EMITTERS), required=True)
+    parser.add_argument("--size", default="1k", help="1k, 100k, 1m or a profile count")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", required=True)
+    args = parser.parse_args()
+
+    count = write_synthetic_export(args.bot, Path(args.output), parse_size(args.size), args.seed)
+    print(f"Wrote {count} synthetic {args.bot} profiles to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
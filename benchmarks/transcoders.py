@@ -0,0 +1,89 @@
+"""
+Benchmark for the direct transcoders.
+
+For every pair in TRANSCODERS, times converting a seeded synthetic corpus of
+raw source profiles (see benchmarks/synthetic.py) through the canonical
+models (profile_parser, then profile_emitter) and through the direct
+transcoder. That both routes give the same output and errors is checked by
+apptesting.py.
+
+Usage:
+    python -m benchmarks.transcoders --profiles 20000 --repeats 5
+"""
+
+import argparse
+import json
+import time
+
+from benchmarks.synthetic import synthetic_profiles
+from helpers.address_cache import clear_address_caches
+from registries.bot_registry import EMITTERS, PARSERS, TRANSCODERS
+
+
+def raw_source_profiles(from_bot: str, count: int, seed: int = 1) -> list[dict]:
+    """
+    Synthetic raw profiles as the source bot's reader yields them.
+    """
+    emit = EMITTERS[from_bot]["profile_emitter"]
+
+    # a JSON round trip, so no dicts are shared between profiles
+    return json.loads(json.dumps([emit(profile) for profile in synthetic_profiles(count, seed)]))
+
+def profiles_per_second(convert, raw_profiles: list[dict], repeats: int) -> float:
+    """
+    Best of `repeats` runs over the corpus, each starting from cold caches.
+    Profiles that fail to convert are timed too.
+    """
+    best = None
+
+    for _ in range(repeats):
+        clear_address_caches()
+        started = time.perf_counter()
+
+        for raw_profile in raw_profiles:
+            try:
+                convert(raw_profile)
+            except ValueError:
+                pass
+
+        elapsed = time.perf_counter() - started
+        best    = elapsed if best is None else min(best, elapsed)
+
+    return len(raw_profiles) / best
+
+def run_pair(from_bot: str, to_bot: str, raw_profiles: list[dict], repeats: int) -> dict:
+    profile_parser  = PARSERS[from_bot]["profile_parser"]
+    profile_emitter = EMITTERS[to_bot]["profile_emitter"]
+
+    def canonical(raw_profile):
+        return profile_emitter(profile_parser(raw_profile))
+
+    canonical_per_sec = profiles_per_second(canonical, raw_profiles, repeats)
+    direct_per_sec    = profiles_per_second(TRANSCODERS[from_bot][to_bot], raw_profiles, repeats)
+
+    return {
+        "canonical_per_sec": round(canonical_per_sec),
+        "direct_per_sec": round(direct_per_sec),
+        "speedup": round(direct_per_sec / canonical_per_sec, 2),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Direct transcoder benchmark")
+    parser.add_argument("--profiles", type=int, default=20_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    pairs = {}
+
+    for from_bot, transcoders in TRANSCODERS.items():
+        raw_profiles = raw_source_profiles(from_bot, args.profiles, args.seed)
+
+        for to_bot in transcoders:
+            pairs[f"{from_bot}->{to_bot}"] = run_pair(from_bot, to_bot, raw_profiles, args.repeats)
+
+    print(json.dumps({"profiles": args.profiles, "pairs": pairs}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -16,8 +16,10 @@ Usage:
 
 Assumptions:
 - Bot profile exports use controlled dropdown values, so input
-  province names are assumed to be valid and consistently formatted.
-- Strict validation is preferred over normalization.
+  province names are expected to be valid.
+- Parsers resolve names through the geography index in
+  countries_map, which also accepts case, spacing and accent
+  variations (e.g. "québec"); anything else is rejected.
 """
 
 CANADA_PROVINCE_NAME_TO_CODE_MAP = {
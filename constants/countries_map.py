@@ -9,6 +9,9 @@ Bots may require:
 - Or full country name
 """
 
+import unicodedata
+from functools import lru_cache
+
 import constants.canada_provinces as provinces_helper
 import constants.us_states as states_helper
 
@@ -73,20 +76,121 @@ def find_code_from_country(country_name: str) -> str:
     raise ValueError(f"Unsupported country name: {country_name}")
 
 
+################ Geography index ################
+
+# Subdivision tables for every supported country (name -> code).
+# Supporting a new country only needs its table added here.
+REGION_NAME_TO_CODE_MAPS = {
+    "CA": provinces_helper.CANADA_PROVINCE_NAME_TO_CODE_MAP,
+    "US": states_helper.US_STATE_NAME_TO_CODE_MAP,
+}
+
+# What a subdivision is called per country, for error messages
+REGION_LABELS = {
+    "CA": "province",
+    "US": "state",
+}
+
+@lru_cache(maxsize=4096)
+def normalize_geo_key(value: str) -> str:
+    """
+    Normalize a country/region name or code for lookups: accents removed,
+    whitespace collapsed and case folded.
+
+    Exports repeat the same few spellings, so results are memoized.
+
+    E.g: "  québec " -> "quebec", "british  COLUMBIA" -> "british columbia"
+    """
+    decomposed = unicodedata.normalize("NFKD", value)
+    stripped   = "".join(c for c in decomposed if not unicodedata.combining(c))
+
+    return " ".join(stripped.split()).casefold()
+
+def _build_country_index() -> dict:
+    index = {}
+
+    for name, code in COUNTRY_NAME_TO_CODE_MAP.items():
+        for key in (name, code):
+            index[key] = index[normalize_geo_key(key)] = (code, name)
+
+    return index
+
+def _build_region_index() -> dict:
+    index = {}
+
+    for country_code, name_to_code in REGION_NAME_TO_CODE_MAPS.items():
+        for name, code in name_to_code.items():
+            for key in (name, code):
+                index[(country_code, key)] = (code, name)
+                index[(country_code, normalize_geo_key(key))] = (code, name)
+
+    return index
+
+# Flat indexes built once at import and shared by every parser.
+# Both hold the exact spellings as well as their normalized forms, so
+# well-formed input resolves in a single probe.
+COUNTRY_INDEX = _build_country_index()   # name or code        -> (code, name)
+REGION_INDEX  = _build_region_index()    # (country, name/code) -> (code, name)
+
+def resolve_country(country: str) -> tuple[str, str]:
+    """
+    Resolve a country name or ISO alpha-2 code, in any case/spacing/accents,
+    to its canonical (code, name).
+
+    Raises:
+        ValueError: if the country is unsupported.
+    """
+    try:
+        return COUNTRY_INDEX[country]
+    except (KeyError, TypeError):
+        pass
+
+    if isinstance(country, str):
+        try:
+            return COUNTRY_INDEX[normalize_geo_key(country)]
+        except KeyError:
+            pass
+
+    raise ValueError(f"Unsupported country: {country}")
+
+def resolve_region(country_code: str, region: str, kind: str = "name") -> tuple[str, str]:
+    """
+    Resolve a province/state name or code, in any case/spacing/accents,
+    to its canonical (code, name) within a country.
+
+    kind ("name" or "code") only describes the expected input for error
+    messages; both are accepted.
+
+    E.g: ("CA", "british columbia") -> ("BC", "British Columbia")
+
+    Raises:
+        ValueError: if the country or the province/state is unsupported.
+    """
+    try:
+        return REGION_INDEX[(country_code, region)]
+    except (KeyError, TypeError):
+        pass
+
+    if isinstance(region, str):
+        try:
+            return REGION_INDEX[(country_code, normalize_geo_key(region))]
+        except (KeyError, TypeError):
+            pass
+
+    if country_code not in REGION_LABELS:
+        raise ValueError(
+            f"Country '{country_code}' is not supported yet"
+        )
+
+    raise ValueError(f"Unsupported {REGION_LABELS[country_code]} {kind}: {region}")
+
 def province_or_state_code_finder(country_code: str, state_or_province_name: str) -> str:
       """
       Returns the province or state code given province name or state name.
 
       E.g: "BC" for British Columbia or "TX" for Texas
       """
-      if country_code == "CA":
-            return provinces_helper.find_code_from_province(state_or_province_name)
-      elif country_code == "US":
-            return states_helper.find_code_from_state(state_or_province_name)
-      else:
-            raise ValueError(
-                  f"Country '{country_code}' is not supported yet"
-            )
+      return resolve_region(country_code, state_or_province_name, "name")[0]
 
 def province_or_state_name_finder(country_code: str, state_or_province_code: str) -> str:
       """
@@ -94,11 +198,4 @@ def province_or_state_name_finder(country_code: str, state_or_province_code: str
 
       E.g: "British Columbia" for "BC" or "Texas" for "TX"
       """
-      if country_code == "CA":
-            return provinces_helper.find_province_from_code(state_or_province_code)
-      elif country_code == "US":
-            return states_helper.find_state_from_code(state_or_province_code)
-      else:
-            raise ValueError(
-                  f"Country '{country_code}' is not supported yet"
-            )
+      return resolve_region(country_code, state_or_province_code, "code")[1]
@@ -1,10 +1,38 @@
 import argparse
-from services.conversion_service import convert, resolve_source_target
+import os
+import signal
+from services.conversion_service import (
+    BASE_DIR,
+    BATCH_OUTPUT_DIR,
+    convert,
+    resolve_source_target,
+    resolve_target,
+    resolve_targets
+)
+from helpers.compression import COMPRESSION_NAMES
+from helpers.conversion_stats import NULL_STATS, ConversionStats
+from helpers.json_codec import CODEC_AUTO, CODEC_NAMES, JSONCodec
+from helpers.quarantine import (
+    ON_ERROR_COLLECT,
+    ON_ERROR_FAIL,
+    ON_ERROR_MODES,
+    QUARANTINE_FILE,
+    Quarantine
+)
 from registries.bot_registry import (
     SUPPORTED_SOURCE_BOTS,
     SUPPORTED_TARGET_BOTS
 )
 
+# the batch, watch and server services (and the profile cache) are imported
+# by the mode that uses them, so a plain conversion does not pay for
+# http.server, sqlite3 and friends at start-up; their defaults are repeated
+# here for the same reason (see services.server_service and watch_service)
+DEFAULT_SERVER_HOST    = "127.0.0.1"
+DEFAULT_SERVER_PORT    = 8765
+DEFAULT_SERVER_WORKERS = os.cpu_count() or 1
+DEFAULT_POLL_INTERVAL  = 1.0
+
 
 def main():
     parser = argparse.ArgumentParser(
@@ -22,23 +50,334 @@ def main():
     parser.add_argument(
         "--to",
         dest="target",
-        choices=SUPPORTED_TARGET_BOTS,
+        nargs="+",
+        choices=SUPPORTED_TARGET_BOTS + ["all"],
         required=False,
-        help="Target bot type"
+        help="Target bot type(s), or 'all' for every other supported bot; "
+             "'canonical' (or the binary 'snapshot') saves the parsed profiles for a "
+             "later --from canonical (or --from snapshot)"
+    )
+
+    parser.add_argument(
+        "--jobs",
+        dest="jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes to convert with (default: 1)"
+    )
+
+    parser.add_argument(
+        "--batch",
+        dest="batch",
+        required=False,
+        help="Convert every export in a directory (or matching a glob); "
+             "the source bot is detected per file unless --from is given"
+    )
+
+    parser.add_argument(
+        "--output-dir",
+        dest="output_dir",
+        default=str(BATCH_OUTPUT_DIR),
+        help="Directory batch outputs and the batch report are written to"
+    )
+
+    parser.add_argument(
+        "--stats",
+        dest="stats",
+        nargs="?",
+        const="-",
+        metavar="PATH",
+        help="Print per-stage timings and counters after converting, "
+             "or write them to PATH as JSON"
+    )
+
+    parser.add_argument(
+        "--on-error",
+        dest="on_error",
+        choices=ON_ERROR_MODES,
+        default=ON_ERROR_FAIL,
+        help="What to do with a profile that cannot be converted: abort the run "
+             "(fail, default), leave it out (skip), or leave it out and write it "
+             "to the quarantine file (collect)"
+    )
+
+    parser.add_argument(
+        "--quarantine",
+        dest="quarantine",
+        default=str(BASE_DIR / QUARANTINE_FILE),
+        metavar="PATH",
+        help="Where --on-error=collect writes the failing profiles"
+    )
+
+    parser.add_argument(
+        "--no-direct",
+        dest="direct",
+        action="store_false",
+        help="Always convert through the canonical profile models instead of "
+             "a direct bot-to-bot transcoder (same output, slower)"
+    )
+
+    parser.add_argument(
+        "--cache",
+        dest="cache",
+        action="store_true",
+        help="Reuse the profiles converted by earlier runs, keeping every "
+             "converted profile (card details included) in .profile_cache.sqlite"
+    )
+
+    parser.add_argument(
+        "--compact",
+        dest="compact",
+        action="store_true",
+        help="Write compact JSON (no indentation or spaces) instead of indented JSON; "
+             "smaller and faster to write, the same profiles"
+    )
+
+    parser.add_argument(
+        "--codec",
+        dest="codec",
+        choices=[CODEC_AUTO] + CODEC_NAMES,
+        default=CODEC_AUTO,
+        help="JSON library to read and write with (default: auto, the fastest "
+             "installed one, except that indented output is written by the standard "
+             "library, byte for byte as json.dump does)"
+    )
+
+    parser.add_argument(
+        "--compress",
+        dest="compress",
+        choices=COMPRESSION_NAMES,
+        help="Compress the output file(s), adding .gz, .bz2 or .xz to their names. "
+             "Compressed exports are always detected and read without this option"
+    )
+
+    parser.add_argument(
+        "--watch",
+        dest="watch",
+        action="store_true",
+        help="Keep running and update the output whenever the export changes, "
+             "converting only the profiles added or edited since the last update"
+    )
+
+    parser.add_argument(
+        "--interval",
+        dest="interval",
+        type=float,
+        default=DEFAULT_POLL_INTERVAL,
+        metavar="SECONDS",
+        help=f"How often --watch checks the export for changes (default: {DEFAULT_POLL_INTERVAL})"
+    )
+
+    parser.add_argument(
+        "--serve",
+        dest="serve",
+        action="store_true",
+        help="Run a conversion server on localhost instead of converting once "
+             "(see convert_client.py)"
+    )
+
+    parser.add_argument(
+        "--host",
+        dest="host",
+        default=DEFAULT_SERVER_HOST,
+        help=f"Address --serve listens on (default: {DEFAULT_SERVER_HOST})"
+    )
+
+    parser.add_argument(
+        "--port",
+        dest="port",
+        type=int,
+        default=DEFAULT_SERVER_PORT,
+        help=f"Port --serve listens on, 0 for any free port (default: {DEFAULT_SERVER_PORT})"
+    )
+
+    parser.add_argument(
+        "--workers",
+        dest="workers",
+        type=int,
+        default=DEFAULT_SERVER_WORKERS,
+        help=f"Number of worker processes --serve converts with (default: {DEFAULT_SERVER_WORKERS})"
+    )
+
+    parser.add_argument(
+        "--root",
+        dest="root",
+        default=str(BASE_DIR),
+        help="Directory --serve may read exports from and write outputs to; "
+             "requests for paths outside it are refused (default: the project directory)"
     )
 
     args = parser.parse_args()
 
+    if args.serve:
+        run_server(args)
+        return
+
+    if args.batch:
+        run_batch(args)
+        return
+
+    if args.watch:
+        run_watch(args)
+        return
+
     try:
         source, target = resolve_source_target(args.source, args.target)
 
-        count = convert(source, target)
-        print(f"Successfully converted {count} profiles")
+        targets = resolve_targets(source, target)
+
+        stats = ConversionStats() if args.stats else NULL_STATS
+
+        quarantine = None if args.on_error == ON_ERROR_FAIL else Quarantine(args.on_error)
+
+        cache = open_profile_cache() if args.cache else None
+
+        codec = JSONCodec(args.codec, args.compact)
+
+        count = convert(
+            source, targets, jobs=args.jobs, stats=stats, quarantine=quarantine, direct=args.direct, cache=cache,
+            codec=codec, compression=args.compress
+        )
+        print(f"Successfully converted {count} profiles to {', '.join(targets)}")
+
+        if quarantine is not None and quarantine.failed:
+            print(quarantine.summary())
+
+            if args.on_error == ON_ERROR_COLLECT:
+                quarantine.write_json(args.quarantine, source)
+                print(f"Failing profiles written to {args.quarantine}")
+
+        if args.stats == "-":
+            print(stats.summary())
+        elif args.stats:
+            stats.write_json(args.stats)
+            print(f"Stats written to {args.stats}")
 
     except Exception as e:
         print(f"Conversion failed: {e}")
         input("\nPress Enter to exit...")  # helpful for double-click users
 
 
+def open_profile_cache():
+    from helpers.profile_cache import PROFILE_CACHE_FILE, ProfileCache
+
+    return ProfileCache(BASE_DIR / PROFILE_CACHE_FILE)
+
+
+def run_batch(args):
+    from services.batch_service import BATCH_REPORT_FILE, convert_batch
+
+    try:
+        target = resolve_target(args.target)
+
+        codec = JSONCodec(args.codec, args.compact)
+
+        report = convert_batch(
+            args.batch, target, args.output_dir, args.source, args.jobs, args.on_error, codec, args.compress
+        )
+
+    except Exception as e:
+        print(f"Batch conversion failed: {e}")
+        return
+
+    print(
+        f"Converted {report['succeeded']} of {report['total_files']} files "
+        f"({report['total_profiles']} profiles) in {report['seconds']}s"
+    )
+
+    for result in report["files"]:
+        if result["error"]:
+            print(f"  Failed {result['input']}: {result['error']}")
+        elif result.get("failed"):
+            print(f"  Skipped {result['failed']} profiles in {result['input']}")
+
+    print(f"Report written to {args.output_dir}/{BATCH_REPORT_FILE}")
+
+
+def run_watch(args):
+    from services.watch_service import watch
+
+    try:
+        source, target = resolve_source_target(args.source, args.target)
+
+        targets = resolve_targets(source, target)
+
+        codec = JSONCodec(args.codec, args.compact)
+
+    except Exception as e:
+        print(f"Watch failed: {e}")
+        return
+
+    def on_sync(counts, quarantine):
+        print(
+            f"Updated {', '.join(targets)}: {counts['profiles']} profiles "
+            f"(+{counts['added']} ~{counts['changed']} -{counts['removed']})"
+        )
+
+        if quarantine is not None and quarantine.failed:
+            print(quarantine.summary())
+
+            if args.on_error == ON_ERROR_COLLECT:
+                quarantine.write_json(args.quarantine, source)
+                print(f"Failing profiles written to {args.quarantine}")
+
+    def on_error(e):
+        print(f"Update failed, previous output kept: {e}")
+
+    quarantine_mode = None if args.on_error == ON_ERROR_FAIL else args.on_error
+
+    print(f"Watching {source} export every {args.interval}s, press Ctrl+C to stop")
+
+    try:
+        watch(
+            source, targets, args.interval,
+            on_sync=on_sync, on_error=on_error, quarantine_mode=quarantine_mode, codec=codec,
+            compression=args.compress
+        )
+    except KeyboardInterrupt:
+        print("Stopped watching")
+
+
+def run_server(args):
+    from services.server_service import ConversionServer, write_server_token
+
+    cache = open_profile_cache() if args.cache else None
+
+    try:
+        # --compact is chosen per request (compact=1), not per server
+        server = ConversionServer(
+            (args.host, args.port), args.workers, cache=cache, codec_name=args.codec, root=args.root
+        )
+
+    except Exception as e:
+        print(f"Server failed to start: {e}")
+        return
+
+    try:
+        # convert_client.py reads the token from here
+        token_file = write_server_token(server.server_address[1], server.token)
+
+    except OSError as e:
+        print(f"Server failed to start: {e}")
+        server.server_close()
+        return
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt()
+
+    # service managers stop daemons with SIGTERM; shut the worker pool down too
+    signal.signal(signal.SIGTERM, stop)
+
+    print(f"Serving conversions on {server.url} with {args.workers} workers, press Ctrl+C to stop", flush=True)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Server stopped")
+    finally:
+        server.server_close()
+        token_file.unlink(missing_ok=True)
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,202 @@
+"""
+Thin client for the conversion server (python convert.py --serve).
+
+Only uses the standard library and none of the converter's own modules, so
+it starts in a fraction of the time convert.py does.
+
+Requests carry the server's token, read from the .server_<port>.token file
+the server writes next to this script (or given with --token). Paths given
+with --input and --output must be inside the server's root directory, the
+project directory unless the server was started with --root.
+
+Examples:
+    python convert_client.py --to stellar --input /exports/valorprofiles.json
+    python convert_client.py --from valor --to stellar --send valorprofiles.json > stellar.json
+    python convert_client.py --to all --send valorprofiles.json --output stellar.json cybersole.json
+    python convert_client.py --to stellar --send valorprofiles.json.gz --output stellar.json.gz
+"""
+
+import argparse
+import http.client
+import importlib
+import json
+import sys
+from pathlib import Path
+from urllib.parse import urlencode
+
+DEFAULT_SERVER_HOST = "127.0.0.1"
+DEFAULT_SERVER_PORT = 8765
+
+DEFAULT_TIMEOUT = 300.0
+
+# written by convert.py --serve (see services/server_service.py)
+SERVER_TOKEN_FILE = ".server_{port}.token"
+
+QUARANTINE_FILE = "quarantine.json"
+
+# output extension -> stdlib codec module (the server sniffs compressed
+# exports by their magic bytes, so those are sent as they are)
+OUTPUT_COMPRESSIONS = {".gz": "gzip", ".bz2": "bz2", ".xz": "lzma"}
+
+
+def read_server_token(port: int = DEFAULT_SERVER_PORT) -> str | None:
+    """
+    The token of the server running on port, or None if there is none.
+    """
+    token_file = Path(__file__).resolve().parent / SERVER_TOKEN_FILE.format(port=port)
+
+    try:
+        return token_file.read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        return None
+
+def request_conversion(query: dict, payload: bytes = b"", host: str = DEFAULT_SERVER_HOST,
+                       port: int = DEFAULT_SERVER_PORT, timeout: float = DEFAULT_TIMEOUT,
+                       token: str | None = None) -> dict:
+    """
+    Send one /convert request (see services/server_service.py), with the
+    token of the server on port unless another is given.
+
+    Raises:
+        RuntimeError: with the server's message if the conversion failed.
+    """
+    token = token or read_server_token(port)
+
+    if token is None:
+        raise RuntimeError(
+            f"No token for the server on port {port}; is it running (python convert.py --serve)?"
+        )
+
+    connection = http.client.HTTPConnection(host, port, timeout=timeout)
+
+    try:
+        connection.request(
+            "POST", "/convert?" + urlencode(query, doseq=True), payload,
+            {"Content-Type": "application/json", "Authorization": f"Bearer {token}"}
+        )
+        response = connection.getresponse()
+        body     = json.loads(response.read())
+
+    finally:
+        connection.close()
+
+    if response.status != 200:
+        raise RuntimeError(body.get("error", f"HTTP {response.status}"))
+
+    return body
+
+def write_output(path: Path, text: str):
+    """
+    Write an output file, compressed if its extension asks for it.
+    """
+    module = OUTPUT_COMPRESSIONS.get(path.suffix.lower())
+
+    if module is None:
+        path.write_text(text, encoding="utf-8")
+        return
+
+    with importlib.import_module(module).open(path, "wt", encoding="utf-8") as f:
+        f.write(text)
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert bot profiles on a running conversion server")
+    parser.add_argument("--from", dest="source", help="Source bot type (detected when left out)")
+    parser.add_argument("--to", dest="target", nargs="+", required=True, help="Target bot type(s), or 'all'")
+
+    payload = parser.add_mutually_exclusive_group(required=True)
+    payload.add_argument("--input", help="Export file for the server to read; outputs are written "
+                                         "next to it unless --output is given")
+    payload.add_argument("--send", help="Export file (or - for stdin) to send to the server; the "
+                                        "output is printed unless --output is given")
+
+    parser.add_argument("--output", nargs="+", default=[],
+                        help="Output file per target, compressed when named *.gz, *.bz2 or *.xz")
+    parser.add_argument("--compress", choices=["gzip", "bz2", "xz"],
+                        help="Compress the outputs --input writes next to the export")
+    parser.add_argument("--on-error", dest="on_error", default="fail", choices=["fail", "skip", "collect"])
+    parser.add_argument("--quarantine", default=QUARANTINE_FILE,
+                        help="Where --on-error=collect writes the failing profiles")
+    parser.add_argument("--no-direct", dest="direct", action="store_false")
+    parser.add_argument("--compact", action="store_true", help="Write compact instead of indented JSON")
+    parser.add_argument("--host", default=DEFAULT_SERVER_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_SERVER_PORT)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    parser.add_argument("--token", help="Server token (default: read from the server's token file)")
+    args = parser.parse_args()
+
+    query = {"to": args.target, "on_error": args.on_error}
+
+    if args.source:
+        query["from"] = args.source
+
+    if not args.direct:
+        query["direct"] = "0"
+
+    if args.compact:
+        query["compact"] = "1"
+
+    if args.compress:
+        query["compress"] = args.compress
+
+    layout = {"separators": (",", ":")} if args.compact else {"indent": 2}
+
+    if args.send and not args.output and len(args.target) > 1:
+        parser.error("--output needs one path per target when sending to several targets")
+
+    try:
+        if args.input:
+            query["input"]  = str(Path(args.input).resolve())
+            query["output"] = [str(Path(output).resolve()) for output in args.output]
+            body = b""
+        elif args.send == "-":
+            body = sys.stdin.buffer.read()
+        else:
+            body = Path(args.send).read_bytes()
+
+        response = request_conversion(query, body, args.host, args.port, args.timeout, args.token)
+
+    except (OSError, RuntimeError, ValueError) as e:
+        print(f"Conversion failed: {e}", file=sys.stderr)
+        raise SystemExit(1)
+
+    # canonical JSON lines come back as a string, written as they are
+    outputs = {
+        target: output if isinstance(output, str) else json.dumps(output, **layout)
+        for target, output in response["outputs"].items()
+    }
+
+    if args.send:
+        if args.output:
+            for target, output_file in zip(response["targets"], args.output):
+                write_output(Path(output_file), outputs[target])
+        else:
+            sys.stdout.write(outputs[response["targets"][0]])
+
+    print(
+        f"Converted {response['profiles']} {response['source']} profiles to {', '.join(response['targets'])}",
+        file=sys.stderr
+    )
+
+    if response.get("failed"):
+        print(f"{response['failed']} profiles could not be converted:", file=sys.stderr)
+
+        for category, count in response["errors"].items():
+            print(f"  {count:>8}  {category}", file=sys.stderr)
+
+    if response.get("quarantine"):
+        quarantine = {
+            "source": response["source"],
+            "failed": response["failed"],
+            "errors": response["errors"],
+            "profiles": response["quarantine"],
+        }
+        Path(args.quarantine).write_text(json.dumps(quarantine, indent=2), encoding="utf-8")
+        print(f"Failing profiles written to {args.quarantine}", file=sys.stderr)
+
+    if args.input:
+        for target in response["targets"]:
+            print(f"  {target}: {outputs[target]}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
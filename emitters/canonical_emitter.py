@@ -0,0 +1,56 @@
+"""
+Expected canonical output (see specs/canonical.py), one JSON value per line:
+
+{"canonical_profiles":{"format_version":1,"profile":[...],"address":[...],"card":[...]}}
+["John Doe","email@email.com","6041230123",["John","Doe",...],null,true,["John Doe","visa",...],false]
+...
+
+-> Canonical profiles are emitted as themselves; they are only turned into
+   lines (Profile.to_tuple) when encoded or written.
+"""
+
+from typing import Iterable
+
+from models.canonical import Profile
+from helpers.json_codec import DEFAULT_CODEC, JSONCodec
+from helpers.json_utils import EncodedJSON
+from specs.canonical import CANONICAL_HEADER
+
+def emit_canonical_profile(profile: Profile) -> Profile:
+
+    return profile
+
+def emit_canonical_profiles(profiles: list[Profile]) -> list[Profile]:
+
+    return list(profiles)
+
+def canonical_export(profiles: Iterable[Profile]) -> list[Profile]:
+    """
+    The canonical "export" of emitted profiles: the Profile objects.
+    """
+
+    return list(profiles)
+
+def encode_canonical_profile(profile: Profile, codec: JSONCodec = DEFAULT_CODEC) -> EncodedJSON:
+    """
+    Serialize a profile as its canonical line (without the newline) ahead
+    of time. Lines are compact whatever the codec's layout.
+    """
+
+    return EncodedJSON(codec.as_compact().dumps(profile.to_tuple()))
+
+def write_canonical_profiles(fp, profiles: Iterable, codec: JSONCodec = DEFAULT_CODEC) -> int:
+    """
+    Stream canonical profiles (or their encoded lines) to fp as a canonical
+    file, header line first. Returns the number of profiles written.
+    """
+    dumps = codec.as_compact().dumps
+    count = 0
+
+    fp.write(dumps(CANONICAL_HEADER) + "\n")
+
+    for profile in profiles:
+        fp.write((profile if isinstance(profile, EncodedJSON) else dumps(profile.to_tuple())) + "\n")
+        count += 1
+
+    return count
@@ -49,63 +49,78 @@ Expected cybersole output:
 -> List of dictionaries
 """
 
-from models.canonical import Profile, Address, Card
-import helpers.card_utils as card_helper
-import uuid
+from typing import Iterable
 
-def emit_cybersole_card(card: Card) -> dict:
+from models.canonical import Profile, Address
+from helpers.field_spec import compile_emitter
+from helpers.json_codec import DEFAULT_CODEC, JSONCodec
+from helpers.json_utils import write_json_array
+from helpers.address_cache import AddressCache
+from specs.cybersole import CYBERSOLE_ADDRESS_SPEC, CYBERSOLE_CARD_SPEC, CYBERSOLE_PROFILE_SPEC
+import uuid
 
-	card_number      = card_helper.formatted_card_number(card.number, card.card_type)
-	card_year_expiry = card_helper.CARD_EXPIRY_YEAR_PREFIX + card.exp_year
-	
-	return {
-		"number": card_number,
-		"expMonth": card.exp_month,
-		"expYear": card_year_expiry,
-        "cvv": card.cvv
-	}
+CYBERSOLE_GROUP_NAME = "ProfileTransformer Import"
 
-def emit_cybersole_shipping(address: Address) -> dict:
-	
-	return {
-		"firstName": address.first_name,
-		"lastName": address.last_name,
-		"address1": address.address_line_1,
-		"address2": address.address_line_2 or None, # cybersole expects None not empty strings
-		"city": address.city,
-		"zip": address.zip_code,
-		"country": address.country_name,
-		"state": address.state_name
-	}
+# emitted address dicts are built once per unique Address, and copied for
+# every profile so no two outputs share one
+_SHIPPING_CACHE = AddressCache("cybersole_emitter", copy=True)
 
-def canonical_profile_to_cybersole(profile: Profile) -> dict:
+# field mappings live in specs/cybersole.py and are compiled once, here
 
-	same_billing     = profile.billing_same_as_ship
+emit_cybersole_card = compile_emitter(CYBERSOLE_CARD_SPEC, "emit_cybersole_card", __name__)
 
-	card             = emit_cybersole_card(profile.card)
-	shipping_address = emit_cybersole_shipping(profile.shipping_address)
-	billing_address  = shipping_address if same_billing else emit_cybersole_shipping(profile.billing_address)
+build_cybersole_shipping = compile_emitter(CYBERSOLE_ADDRESS_SPEC, "build_cybersole_shipping", __name__)
 
-	return {
-		"id": str(uuid.uuid4()),
-		"name": profile.profile_name,
-		"email": profile.email,
-		"phone": profile.phone_number,
-		"billingDifferent": not same_billing,
+def emit_cybersole_shipping(address: Address) -> dict:
 
-		"card": card,
-		"delivery": shipping_address,
-		"billing": billing_address,
+	return _SHIPPING_CACHE.get_or_create(address, build_cybersole_shipping, address)
 
-		"properties": {}
-	}
+canonical_profile_to_cybersole = compile_emitter(
+	CYBERSOLE_PROFILE_SPEC, "canonical_profile_to_cybersole", __name__,
+	nested = {"address": emit_cybersole_shipping, "card": emit_cybersole_card},
+)
 
 
 def canonical_profiles_to_cybersole(profiles: list[Profile]) -> list[dict]:
+	return cybersole_export([canonical_profile_to_cybersole(p) for p in profiles])
+
+def cybersole_export(cybersole_profiles: Iterable[dict]) -> list[dict]:
+	"""
+	Wrap emitted Cybersole profiles in a single import group, the document
+	write_cybersole_profiles writes.
+	"""
+
 	return [
 		{
 			"id": str(uuid.uuid4()),
-			"name": "ProfileTransformer Import",
-			"profiles": [canonical_profile_to_cybersole(p) for p in profiles]
+			"name": CYBERSOLE_GROUP_NAME,
+			"profiles": list(cybersole_profiles)
 		}
-	]
\ No newline at end of file
+	]
+
+def write_cybersole_profiles(fp, cybersole_profiles: Iterable[dict], codec: JSONCodec = DEFAULT_CODEC) -> int:
+	"""
+	Stream already emitted Cybersole profiles to fp inside a single import
+	group envelope. Returns the number of profiles written.
+	"""
+
+	group_id   = codec.dumps(str(uuid.uuid4()))
+	group_name = codec.dumps(CYBERSOLE_GROUP_NAME)
+
+	if codec.compact:
+		fp.write(f'[{{"id":{group_id},"name":{group_name},"profiles":')
+		count = write_json_array(fp, cybersole_profiles, level=2, codec=codec)
+		fp.write('}]')
+
+		return count
+
+	fp.write(
+		'[\n  {\n'
+		f'    "id": {group_id},\n'
+		f'    "name": {group_name},\n'
+		'    "profiles": '
+	)
+	count = write_json_array(fp, cybersole_profiles, level=2, codec=codec)
+	fp.write('\n  }\n]')
+
+	return count
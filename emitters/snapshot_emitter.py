@@ -0,0 +1,136 @@
+"""
+Expected snapshot output: a binary canonical snapshot (see specs/snapshot.py).
+
+-> Canonical profiles are emitted as themselves, like the canonical NDJSON
+   format, and only laid out in columns when written. Profiles pre-encoded
+   for the writer (by worker processes or the profile cache) are canonical
+   NDJSON lines.
+"""
+
+import struct
+import sys
+from array import array
+from itertools import accumulate
+from typing import Iterable
+
+from helpers.json_codec import DEFAULT_CODEC, JSONCodec
+from helpers.json_utils import EncodedJSON
+from specs.snapshot import (
+    COLUMN_FLAG,
+    COLUMN_TEXT,
+    SNAPSHOT_BLOCK_SIZE,
+    SNAPSHOT_COLUMNS,
+    SNAPSHOT_FORMAT_VERSION,
+    SNAPSHOT_MAGIC,
+    profile_to_row
+)
+
+_HEADER  = struct.Struct("<II")
+_TRAILER = struct.Struct("<QQ")
+
+def _packed(typecode: str, values) -> bytes:
+    """
+    Unsigned integers as little-endian bytes, "B" for u8, "I" for u32 and
+    "Q" for u64.
+    """
+    packed = array(typecode, values)
+
+    if sys.byteorder == "big":
+        packed.byteswap()
+
+    return packed.tobytes()
+
+def _packed_text(values: list) -> bytes:
+    """
+    Character offsets of every string, then the strings as UTF-8.
+    """
+    return _packed("I", accumulate(map(len, values), initial=0)) + "".join(values).encode("utf-8", "surrogatepass")
+
+
+class _StringTable:
+    """
+    The distinct values of COLUMN_TABLE columns, numbered as first seen.
+    Index 0 is None.
+    """
+
+    def __init__(self):
+        self.values = [None]
+        self.index  = {None: 0}
+
+    def _add(self, value: str) -> int:
+        self.index[value] = len(self.values)
+        self.values.append(value)
+
+        return self.index[value]
+
+    def indices(self, values) -> bytes:
+        index = self.index
+
+        return _packed("I", [index[value] if value in index else self._add(value) for value in values])
+
+    def encode(self) -> bytes:
+        return _packed("I", [len(self.values)]) + _packed_text(["", *self.values[1:]])
+
+
+def _encode_column(kind: str, values: tuple, table: _StringTable) -> bytes:
+    if kind == COLUMN_FLAG:
+        return bytes(values)
+
+    if kind != COLUMN_TEXT:
+        return table.indices(values)
+
+    nulls = [row for row, value in enumerate(values) if value is None]
+
+    if nulls:
+        values = ["" if value is None else value for value in values]
+
+    lengths = list(map(len, values))
+    width   = "B" if max(lengths) < 256 else "I"
+
+    return (
+        bytes([array(width).itemsize]) + _packed(width, lengths) + _packed("I", [len(nulls), *nulls])
+        + "".join(values).encode("utf-8", "surrogatepass")
+    )
+
+def _encode_block(rows: list, table: _StringTable) -> bytes:
+    """
+    One block of rows of SNAPSHOT_COLUMNS values, laid out in columns.
+    """
+    columns = [
+        _encode_column(kind, values, table)
+        for (_, kind), values in zip(SNAPSHOT_COLUMNS, zip(*rows))
+    ]
+
+    return _packed("I", [len(rows), *accumulate(map(len, columns), initial=0)]) + b"".join(columns)
+
+def write_snapshot_profiles(fp, profiles: Iterable, codec: JSONCodec = DEFAULT_CODEC) -> int:
+    """
+    Stream canonical profiles (or their encoded NDJSON lines) to a binary
+    file object as a snapshot, a block at a time. Returns the number of
+    profiles written.
+    """
+    loads  = codec.loads
+    table  = _StringTable()
+    blocks = []
+    rows   = []
+    count  = 0
+    offset = fp.write(SNAPSHOT_MAGIC + _HEADER.pack(SNAPSHOT_FORMAT_VERSION, SNAPSHOT_BLOCK_SIZE))
+
+    for profile in profiles:
+        rows.append(profile_to_row(loads(str(profile)) if isinstance(profile, EncodedJSON) else profile.to_tuple()))
+
+        if len(rows) == SNAPSHOT_BLOCK_SIZE:
+            blocks.append(offset)
+            offset += fp.write(_encode_block(rows, table))
+            count  += len(rows)
+            rows    = []
+
+    if rows:
+        blocks.append(offset)
+        offset += fp.write(_encode_block(rows, table))
+        count  += len(rows)
+
+    fp.write(table.encode() + _packed("I", [len(blocks)]) + _packed("Q", blocks))
+    fp.write(_TRAILER.pack(offset, count) + SNAPSHOT_MAGIC)
+
+    return count
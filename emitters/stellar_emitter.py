@@ -34,67 +34,49 @@ Expected stellar output:
 -> List of dictionaries
 """
 
-from models.canonical import Profile, Address, Card
+from typing import Iterable
 
-def emit_stellar_card(card: Card) -> dict:
+from models.canonical import Profile, Address
+from helpers.field_spec import compile_emitter
+from helpers.json_codec import DEFAULT_CODEC, JSONCodec
+from helpers.json_utils import write_json_array
+from helpers.address_cache import AddressCache
+from specs.stellar import STELLAR_ADDRESS_SPEC, STELLAR_CARD_SPEC, STELLAR_PROFILE_SPEC, STELLAR_CARD_TYPE_MAP
 
-    if card.card_type in STELLAR_CARD_TYPE_MAP:
-        stellar_card_type = STELLAR_CARD_TYPE_MAP[card.card_type]
-    else:
-        raise ValueError(
-            f"Unsupported Stellar card type: '{card.card_type}'. "
-            f"Supported types: {list(STELLAR_CARD_TYPE_MAP.values())}"
-        )
+# emitted address dicts are built once per unique Address, and copied for
+# every profile so no two outputs share one
+_SHIPPING_CACHE = AddressCache("stellar_emitter", copy=True)
 
-    return {
-        "cardName": card.holder,
-        "cardType": stellar_card_type,
-        "cardNumber": card.number,
-        "cardMonth": card.exp_month,
-        "cardYear": card.exp_year,
-        "cardCvv": card.cvv
-    }
+# field mappings live in specs/stellar.py and are compiled once, here
 
-def emit_stellar_shipping(address: Address) -> dict:
+emit_stellar_card = compile_emitter(STELLAR_CARD_SPEC, "emit_stellar_card", __name__)
 
-    return {
-        "firstName": address.first_name,
-        "lastName": address.last_name,
-        "country": address.country_code,
-        "address": address.address_line_1,
-        "address2": address.address_line_2,
-        "state": address.state_code,
-        "city": address.city,
-        "zipcode": address.zip_code,
-    }
+build_stellar_shipping = compile_emitter(STELLAR_ADDRESS_SPEC, "build_stellar_shipping", __name__)
 
-def canonical_profile_to_stellar(profile: Profile) -> dict:
+def emit_stellar_shipping(address: Address) -> dict:
 
-    stellar_shipping = emit_stellar_shipping(profile.shipping_address)
-    stellar_billing  = stellar_shipping if profile.billing_same_as_ship else emit_stellar_shipping(profile.billing_address)
-    stellar_card     = emit_stellar_card(profile.card)
+    return _SHIPPING_CACHE.get_or_create(address, build_stellar_shipping, address)
 
-    return {
-        "profileName": profile.profile_name,
-        "email": profile.email,
-        "phone": profile.phone_number,
-        "shipping": stellar_shipping,
-        "billingAsShipping": profile.billing_same_as_ship,
-        "billing": stellar_billing,
-        "payment": stellar_card,
-        "oneCheckoutPerProfile": profile.one_checkout
-    }
+canonical_profile_to_stellar = compile_emitter(
+    STELLAR_PROFILE_SPEC, "canonical_profile_to_stellar", __name__,
+    nested = {"address": emit_stellar_shipping, "card": emit_stellar_card},
+)
 
 def canonical_profiles_to_stellar(profiles: list[Profile]) -> list[dict]:
     
     return [canonical_profile_to_stellar(p) for p in profiles]
 
-################ Helpers ################
+def stellar_export(stellar_profiles: Iterable[dict]) -> list[dict]:
+    """
+    The Stellar export document of emitted profiles: the profile list.
+    """
+
+    return list(stellar_profiles)
+
+def write_stellar_profiles(fp, stellar_profiles: Iterable[dict], codec: JSONCodec = DEFAULT_CODEC) -> int:
+    """
+    Stream already emitted Stellar profiles to fp as the top-level list.
+    Returns the number of profiles written.
+    """
 
-STELLAR_CARD_TYPE_MAP = {
-    "visa": "Visa",
-    "discover": "Discover",
-    "mastercard": "MasterCard",
-    "amex": "Amex",
-    "jcb": "JCB"
-}
\ No newline at end of file
+    return write_json_array(fp, stellar_profiles, codec=codec)
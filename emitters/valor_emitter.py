@@ -54,68 +54,85 @@ Expected valor output:
 -> Excepts a single dictionary object, with keys being unique IDs
 """
 import uuid
-import helpers.card_utils as card_helper
+from typing import Iterable
 
-from models.canonical import Profile, Address, Card
+from models.canonical import Profile, Address
+from helpers.field_spec import compile_emitter
+from helpers.json_codec import DEFAULT_CODEC, JSONCodec
+from helpers.json_utils import EncodedJSON, encode_json_member, write_json_object
+from helpers.address_cache import AddressCache
+from specs.valor import VALOR_ADDRESS_SPEC, VALOR_CARD_SPEC, VALOR_PROFILE_SPEC
 
-def emit_valor_card(card: Card) -> dict:
-    
-    return {
-        "holder": card.holder,
-        "number": card_helper.formatted_card_number(card.number, card.card_type),
-        "expiration": card_helper.formatted_card_expiry_date(card.exp_month, card.exp_year),
-        "cvv": card.cvv,
-        "googlePayToken":"",
-        "type": card.card_type
-    }
+# emitted address dicts are built once per unique Address, and copied for
+# every profile so no two outputs share one
+_SHIPPING_CACHE = AddressCache("valor_emitter", copy=True)
+
+# field mappings live in specs/valor.py and are compiled once, here
+
+emit_valor_card = compile_emitter(VALOR_CARD_SPEC, "emit_valor_card", __name__)
+
+build_valor_shipping = compile_emitter(VALOR_ADDRESS_SPEC, "build_valor_shipping", __name__)
 
 def emit_valor_shipping(shipping_address: Address) -> dict:
-    
-    return {
-        "firstName": shipping_address.first_name,
-        "lastName": shipping_address.last_name,
-        "addressLine1": shipping_address.address_line_1,
-        "addressLine2": shipping_address.address_line_2,
-        "city": shipping_address.city,
-        "countryName": shipping_address.country_name,
-        "countryCode": shipping_address.country_code,
-        "state": shipping_address.state_name,
-        "zipCode": shipping_address.zip_code
-    }
-
-def canonical_profile_to_valor(profile: Profile, profile_id: str) -> dict:
-
-    valor_card = emit_valor_card(profile.card)
-    valor_shipping = emit_valor_shipping(profile.shipping_address)
-    valor_billing = valor_shipping if profile.billing_same_as_ship else emit_valor_shipping(profile.billing_address)
-
-    return {
-        "name": profile.profile_name,
-        "email": profile.email,
-        "phoneNumber": profile.phone_number,
-
-        "personalCustomsCode":"",
-		"pinCode":"",
-		"idNumber":"",
-		"birthday":"",
-
-        "billingSameAsShipping": profile.billing_same_as_ship,
-        "oneCheckout": profile.one_checkout,
-        "quickTask": False,
-        
-        "card": valor_card,
-        "shipping": valor_shipping,
-        "billing": valor_billing,
-
-        "id": profile_id,
-        "totalSpent": "0"
-    }
-
-def canonical_profiles_to_valor(profiles: list[Profile]) -> dict:
+
+    return _SHIPPING_CACHE.get_or_create(shipping_address, build_valor_shipping, shipping_address)
+
+# canonical_profile_to_valor(profile, profile_id)
+canonical_profile_to_valor = compile_emitter(
+    VALOR_PROFILE_SPEC, "canonical_profile_to_valor", __name__,
+    nested = {"address": emit_valor_shipping, "card": emit_valor_card},
+)
+
+def emit_valor_profile(profile: Profile, profile_id: str | None = None) -> dict:
+    """
+    Emit a canonical profile under profile_id, or a freshly minted Valor
+    profile id.
+    """
+
+    return canonical_profile_to_valor(profile, profile_id or str(uuid.uuid4()))
+
+def canonical_profiles_to_valor(profiles: list[Profile], profile_ids: list | None = None) -> dict:
+    """
+    Emit canonical profiles as Valor's {profile_id: profile} map.
+
+    profile_ids gives the Valor id of each profile (None mints one), so a
+    re-export can keep the ids Valor already knows.
+    """
     valor_profiles = {}
 
-    for profile in profiles:
-        profile_id = str(uuid.uuid4())
-        valor_profiles[profile_id] = canonical_profile_to_valor(profile, profile_id)
+    if profile_ids is not None and len(profile_ids) != len(profiles):
+        raise ValueError(
+            f"Got {len(profile_ids)} Valor profile ids for {len(profiles)} profiles"
+        )
+
+    for profile, profile_id in zip(profiles, profile_ids or [None] * len(profiles)):
+        valor_profile = emit_valor_profile(profile, profile_id)
+        valor_profiles[valor_profile["id"]] = valor_profile
+
+    return valor_profiles
+
+def valor_export(valor_profiles: Iterable[dict]) -> dict:
+    """
+    The Valor export document of emitted profiles: the {profile_id: profile}
+    map.
+    """
+
+    return {valor_profile["id"]: valor_profile for valor_profile in valor_profiles}
+
+def encode_valor_profile(valor_profile: dict, codec: JSONCodec = DEFAULT_CODEC) -> EncodedJSON:
+    """
+    Pre-serialize an emitted Valor profile as its `"id": {...}` member.
+    """
+
+    return encode_json_member(valor_profile["id"], valor_profile, codec)
+
+def write_valor_profiles(fp, valor_profiles: Iterable[dict], codec: JSONCodec = DEFAULT_CODEC) -> int:
+    """
+    Stream already emitted (or pre-encoded) Valor profiles to fp, wrapped in
+    the top-level {profile_id: profile} object.
+    Returns the number of profiles written.
+    """
 
-    return valor_profiles
\ No newline at end of file
+    return write_json_object(fp, (
+        p if isinstance(p, EncodedJSON) else (p["id"], p) for p in valor_profiles
+    ), codec=codec)
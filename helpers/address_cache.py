@@ -0,0 +1,112 @@
+"""
+Content-keyed address cache.
+
+Large exports often repeat the same shipping address across thousands of
+profiles. Parsers use an AddressCache keyed by the raw address dict so that
+identical raw addresses resolve (including the country/state lookups) to one
+shared, immutable Address instance. Emitters use one keyed by the Address
+itself so the emitted address dict is built once per unique address; emitted
+dicts are mutable and end up in the caller's output, so those caches are
+created with copy=True and hand out a fresh shallow copy of the cached dict
+(a few key/value pairs, far cheaper than building it again).
+
+The direct transcoders do not cache addresses: they go from raw dict to raw
+dict, and building the target address (a couple of dict lookups for the
+country and state) costs less than keying a cache by the raw address.
+
+Caches are bounded: once full, the least recently used entry is evicted.
+"""
+
+from collections import OrderedDict
+
+DEFAULT_ADDRESS_CACHE_SIZE = 65536
+
+# every cache created, by name, so stats can be reported in one place
+_CACHES = {}
+
+
+class AddressCache:
+    """
+    Bounded LRU cache that maps a hashable key to a shared value, or with
+    copy=True to a shallow copy of it (for mutable values such as dicts).
+    """
+
+    def __init__(self, name: str, maxsize: int = DEFAULT_ADDRESS_CACHE_SIZE, copy: bool = False):
+        if maxsize < 1:
+            raise ValueError("Address cache size must be at least 1")
+
+        self.name    = name
+        self.maxsize = maxsize
+        self.copy    = copy
+        self.hits    = 0
+        self.misses  = 0
+        self._entries = OrderedDict()
+
+        _CACHES[name] = self
+
+    def get_or_create(self, key, factory, *args):
+        """
+        Return the cached value for key, or build it with factory(*args).
+
+        Values that fail to build are not cached, so errors surface exactly
+        as they would without the cache.
+        """
+        entries = self._entries
+
+        try:
+            value = entries[key]
+        except KeyError:
+            pass
+        except TypeError:
+            # unhashable key, bypass the cache
+            return factory(*args)
+        else:
+            entries.move_to_end(key)
+            self.hits += 1
+            return value.copy() if self.copy else value
+
+        value = factory(*args)
+        self.misses += 1
+
+        entries[key] = value
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+
+        return value.copy() if self.copy else value
+
+    def get_or_create_from_dict(self, raw: dict, factory):
+        """
+        Cache factory(raw) by the contents of a raw (flat) JSON dict.
+        Anything that is not a dict of hashable values bypasses the cache.
+        """
+        if not isinstance(raw, dict):
+            return factory(raw)
+
+        return self.get_or_create(tuple(raw.items()), factory, raw)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits   = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def address_cache_stats() -> dict:
+    """
+    Hit/miss stats for every address cache, keyed by cache name.
+    """
+    return {name: cache.stats() for name, cache in _CACHES.items()}
+
+def clear_address_caches():
+    for cache in _CACHES.values():
+        cache.clear()
@@ -1,3 +1,6 @@
+from bisect import bisect_right
+from sys import intern
+
 CARD_EXPIRY_YEAR_PREFIX = "20"
 
 def normalize_card_number(card_number: str) -> str:
@@ -6,35 +9,150 @@ def normalize_card_number(card_number: str) -> str:
     """
     return card_number.replace(" ", "")
 
+def normalize_card_type(card_type: str) -> str:
+    """
+    Canonical (lower case, interned) card type, e.g. " Visa" -> "visa".
+    """
+    return intern(card_type.strip().lower())
+
+################ Card network table ################
+
+# Card networks by IIN/BIN prefix range: (first prefix, last prefix, card type).
+# Both ends are inclusive and must have the same number of digits; a single
+# prefix is a range of one. New networks (e.g. UnionPay "62", Maestro "6759")
+# can be added with register_card_network().
+CARD_NETWORK_RANGES = [
+    ("4", "4", "visa"),
+    ("34", "34", "amex"),
+    ("37", "37", "amex"),
+    ("51", "55", "mastercard"),
+    ("2221", "2720", "mastercard"),
+    ("6011", "6011", "discover"),
+    ("644", "649", "discover"),
+    ("65", "65", "discover"),
+    ("3528", "3589", "jcb"),
+]
+
+def _compile_card_ranges(ranges: list) -> tuple:
+    """
+    Compile prefix ranges into a sorted interval list.
+
+    Every range is padded to the longest prefix width so one string
+    comparison against the number's leading digits places it, e.g. with
+    width 4 the range "51"-"55" becomes "5100"-"5599".
+
+    Returns:
+        (width, lows, intervals) where lows is sorted for bisect and
+        intervals[i] is (high, prefix length, card type) for lows[i].
+    """
+    width     = max(len(first) for first, _, _ in ranges)
+    intervals = []
+
+    for first, last, card_type in ranges:
+        if len(first) != len(last) or not (first + last).isdigit() or first > last:
+            raise ValueError(f"Invalid card prefix range: {first}-{last}")
+
+        low  = first.ljust(width, "0")
+        high = last.ljust(width, "9")
+        intervals.append((low, high, len(first), card_type))
+
+    intervals.sort()
+
+    for previous, current in zip(intervals, intervals[1:]):
+        if current[0] <= previous[1]:
+            raise ValueError(
+                f"Card prefix ranges overlap: {previous[3]} and {current[3]}"
+            )
+
+    lows = [low for low, _, _, _ in intervals]
+
+    return width, lows, [(high, length, card_type) for _, high, length, card_type in intervals]
+
+_CARD_PREFIX_WIDTH, _CARD_RANGE_LOWS, _CARD_RANGES = _compile_card_ranges(CARD_NETWORK_RANGES)
+
+def register_card_network(card_type: str, *prefix_ranges):
+    """
+    Add a card network to the classifier.
+
+    Each prefix range is either a single prefix ("62") or an inclusive
+    (first, last) pair of equal-length prefixes (("622126", "622925")).
+
+    Raises:
+        ValueError: if a range is malformed or overlaps an existing network.
+    """
+    global _CARD_PREFIX_WIDTH, _CARD_RANGE_LOWS, _CARD_RANGES
+
+    new_ranges = [
+        (r, r, card_type) if isinstance(r, str) else (r[0], r[1], card_type)
+        for r in prefix_ranges
+    ]
+
+    compiled = _compile_card_ranges(CARD_NETWORK_RANGES + new_ranges)
+
+    CARD_NETWORK_RANGES.extend(new_ranges)
+    _CARD_PREFIX_WIDTH, _CARD_RANGE_LOWS, _CARD_RANGES = compiled
+
+def classify_card_number(number: str) -> str | None:
+    """
+    Classify a contiguous card number by its prefix in a single bisect over
+    the interval table. Returns None if no network matches.
+    """
+    width = _CARD_PREFIX_WIDTH
+    key   = number[:width]
+
+    if len(key) < width:
+        key = key.ljust(width, "0")
+
+    index = bisect_right(_CARD_RANGE_LOWS, key) - 1
+
+    if index < 0:
+        return None
+
+    high, length, card_type = _CARD_RANGES[index]
+
+    # the number must contain the whole prefix, e.g. "35" is not a JCB "3528"
+    if key <= high and len(number) >= length:
+        return card_type
+
+    return None
+
 def determine_card_type(card_number: str) -> str:
     """
     Determine card type (e.g: Amex, Visa) given card number
 
     Returns:
         One of: 'visa', 'mastercard', 'amex', 'discover', 'jcb'
+        (or any network added with register_card_network)
     """
 
-    number = normalize_card_number(card_number)
+    card_type = classify_card_number(normalize_card_number(card_number))
 
-    if number.startswith("4"):
-        return "visa"
-    
-    if number.startswith(("34", "37")):
-        return "amex"
-    
-    if number[:2] in {str(i) for i in range(51,56)}:
-        return "mastercard"
-    
-    if 2221 <= int(number[:4]) <= 2720:
-        return "mastercard"
-    
-    if number.startswith(("6011", "65")) or 644 <= int(number[:3]) <= 649:
-        return "discover"
+    if card_type is None:
+        raise ValueError(f"Unable to infer card type from card number: {card_number}")
 
-    if 3528 <= int(number[:4]) <= 3589:
-        return "jcb"
-    
-    raise ValueError(f"Unable to infer card type from card number: {card_number}")
+    return card_type
+
+def classify_many(card_numbers, strict: bool = True) -> list:
+    """
+    Determine the card type of many card numbers at once.
+
+    Args:
+        card_numbers: iterable of card numbers (spaces allowed).
+        strict: raise on an unrecognized number (default), otherwise
+            return None for it.
+
+    Raises:
+        ValueError: if strict and a card number matches no network.
+    """
+    card_numbers = list(card_numbers)
+    classify     = classify_card_number
+    card_types   = [classify(card_number.replace(" ", "")) for card_number in card_numbers]
+
+    if strict and None in card_types:
+        card_number = card_numbers[card_types.index(None)]
+        raise ValueError(f"Unable to infer card type from card number: {card_number}")
+
+    return card_types
 
 def formatted_card_number(card_number: str, card_type: str) -> str:
     """
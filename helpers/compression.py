@@ -0,0 +1,281 @@
+"""
+Compressed exports and outputs (gzip, bz2, xz).
+
+Exports are often archived compressed. Inputs are sniffed by their magic
+bytes, whatever they are named, and outputs are compressed according to
+their extension:
+
+    gzip   1f 8b           .gz
+    bz2    "BZh"           .bz2
+    xz     fd "7zXZ" 00    .xz
+
+Both go through the stdlib's streaming codecs, so a compressed export is
+decompressed as it is parsed and never lands on disk uncompressed. The
+codec modules are imported the first time a file of their kind is opened.
+"""
+
+import importlib
+from pathlib import Path
+
+COMPRESSION_GZIP = "gzip"
+COMPRESSION_BZ2  = "bz2"
+COMPRESSION_XZ   = "xz"
+
+# "module" is the stdlib codec, "error" the exception it raises on corrupt
+# data besides OSError and EOFError, and "options" what outputs are written
+# with: the gzip and bzip2 tools' default levels, but xz preset 1 rather
+# than 6, which compresses about 8x faster for a slightly larger file.
+# "stream" is the (module, class, options, error) of the incremental
+# decompressor for input that arrives as bytes rather than as a file
+COMPRESSIONS = {
+    COMPRESSION_GZIP: {
+        "magic": b"\x1f\x8b",
+        "extension": ".gz",
+        "module": "gzip",
+        "error": None,
+        "options": {"compresslevel": 6},
+        "stream": ("zlib", "decompressobj", {"wbits": 31}, "error"),
+    },
+    COMPRESSION_BZ2: {
+        "magic": b"BZh",
+        "extension": ".bz2",
+        "module": "bz2",
+        "error": None,
+        "options": {"compresslevel": 9},
+        "stream": ("bz2", "BZ2Decompressor", {}, None),
+    },
+    COMPRESSION_XZ: {
+        "magic": b"\xfd7zXZ\x00",
+        "extension": ".xz",
+        "module": "lzma",
+        "error": "LZMAError",
+        "options": {"preset": 1},
+        "stream": ("lzma", "LZMADecompressor", {}, "LZMAError"),
+    },
+}
+
+COMPRESSION_NAMES = list(COMPRESSIONS)
+
+MAGIC_LENGTH = max(len(cfg["magic"]) for cfg in COMPRESSIONS.values())
+
+
+def validate_compression(compression: str | None):
+    if compression is not None and compression not in COMPRESSIONS:
+        raise ValueError(
+            f"Unsupported compression: {compression}. "
+            f"Supported compressions: {COMPRESSION_NAMES}"
+        )
+
+def sniff_compression(head: bytes) -> str | None:
+    """
+    The compression whose magic bytes start head, or None.
+    """
+    for compression, cfg in COMPRESSIONS.items():
+        if head.startswith(cfg["magic"]):
+            return compression
+
+    return None
+
+def detect_compression(path: Path) -> str | None:
+    """
+    The compression of an existing file, by its magic bytes.
+
+    Raises:
+        FileNotFoundError: if the file does not exist.
+    """
+    with Path(path).open("rb") as f:
+        return sniff_compression(f.read(MAGIC_LENGTH))
+
+def compression_for_path(path: Path) -> str | None:
+    """
+    The compression an output path asks for, by its extension.
+    """
+    suffix = Path(path).suffix.lower()
+
+    for compression, cfg in COMPRESSIONS.items():
+        if suffix == cfg["extension"]:
+            return compression
+
+    return None
+
+def compressed_path(path: Path, compression: str | None) -> Path:
+    """
+    path with the compression's extension added (unless it already has it).
+    """
+    validate_compression(compression)
+
+    path = Path(path)
+
+    if compression is None or compression_for_path(path) == compression:
+        return path
+
+    return path.with_name(path.name + COMPRESSIONS[compression]["extension"])
+
+def uncompressed_name(path: Path) -> str:
+    """
+    A file's name without a compression extension ("a.json.gz" -> "a.json").
+    """
+    path = Path(path)
+
+    if compression_for_path(path) is None:
+        return path.name
+
+    return path.stem
+
+def find_export(path: Path) -> Path:
+    """
+    path if it exists, otherwise a compressed copy of it (path.gz, path.bz2
+    or path.xz) if there is one, otherwise path.
+    """
+    path = Path(path)
+
+    if path.exists():
+        return path
+
+    for compression in COMPRESSIONS:
+        candidate = compressed_path(path, compression)
+
+        if candidate.exists():
+            return candidate
+
+    return path
+
+def _codec(compression: str):
+    return importlib.import_module(COMPRESSIONS[compression]["module"])
+
+
+class CompressedTextReader:
+    """
+    Text file object decompressing a file as it is read. Corrupt or
+    truncated data raises ValueError naming the file, like invalid JSON
+    does, instead of each codec's own exception.
+    """
+
+    def __init__(self, path: Path, compression: str):
+        codec = _codec(compression)
+        error = COMPRESSIONS[compression]["error"]
+
+        self.path        = Path(path)
+        self.compression = compression
+        self._errors     = (EOFError, OSError) + ((getattr(codec, error),) if error else ())
+        self._fp         = codec.open(path, "rt", encoding="utf-8")
+
+    def read(self, size: int = -1) -> str:
+        try:
+            return self._fp.read(size)
+        except self._errors as e:
+            raise ValueError(f"Input file '{self.path}' is not valid {self.compression} data: {e}")
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        return self._fp.seek(offset, whence)
+
+    def close(self):
+        self._fp.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class StreamDecompressor:
+    """
+    Decompresses a single compressed stream piece by piece, as its bytes
+    arrive. Corrupt or truncated data raises ValueError, like
+    CompressedTextReader.
+    """
+
+    def __init__(self, compression: str):
+        module_name, factory, options, error = COMPRESSIONS[compression]["stream"]
+        module = importlib.import_module(module_name)
+
+        self.compression   = compression
+        self._errors       = (EOFError, OSError) + ((getattr(module, error),) if error else ())
+        self._decompressor = getattr(module, factory)(**options)
+
+    def decompress(self, data: bytes) -> bytes:
+        try:
+            return self._decompressor.decompress(data)
+        except self._errors as e:
+            raise ValueError(f"Input is not valid {self.compression} data: {e}")
+
+    def flush(self):
+        """
+        Check that the stream ended where the compressed data does.
+        """
+        if not self._decompressor.eof:
+            raise ValueError(
+                f"Input is not valid {self.compression} data: "
+                f"Compressed data ended before the end-of-stream marker was reached"
+            )
+
+
+def open_text_input(path: Path):
+    """
+    Open a possibly compressed UTF-8 file for reading as text, decompressing
+    on the fly.
+
+    Raises:
+        FileNotFoundError: if the file does not exist.
+    """
+    compression = detect_compression(path)
+
+    if compression is None:
+        return Path(path).open("r", encoding="utf-8")
+
+    return CompressedTextReader(path, compression)
+
+def open_binary_input(path: Path):
+    """
+    Open an uncompressed binary file for reading. Binary exports are
+    memory-mapped, which a decompressing reader can't be.
+
+    Raises:
+        FileNotFoundError: if the file does not exist.
+        ValueError: if the file is compressed.
+    """
+    compression = detect_compression(path)
+
+    if compression is not None:
+        raise ValueError(
+            f"Input file '{path}' is {compression} compressed; "
+            f"binary exports must be decompressed before converting"
+        )
+
+    return Path(path).open("rb")
+
+def open_text_output(path: Path, compression: str | None):
+    """
+    Open a file for writing UTF-8 text, compressed on the fly.
+    """
+    validate_compression(compression)
+
+    if compression is None:
+        return Path(path).open("w", encoding="utf-8")
+
+    cfg = COMPRESSIONS[compression]
+
+    return _codec(compression).open(path, "wt", encoding="utf-8", **cfg["options"])
+
+def decompress_bytes(data: bytes) -> bytes:
+    """
+    data decompressed if it starts with a compression's magic bytes,
+    otherwise data itself.
+
+    Raises:
+        ValueError: if the compressed data is corrupt or truncated.
+    """
+    compression = sniff_compression(data[:MAGIC_LENGTH])
+
+    if compression is None:
+        return data
+
+    codec = _codec(compression)
+    error = COMPRESSIONS[compression]["error"]
+
+    # bz2.decompress reports truncated data with a bare ValueError
+    try:
+        return codec.decompress(data)
+    except (EOFError, OSError, ValueError) + ((getattr(codec, error),) if error else ()) as e:
+        raise ValueError(f"Input is not valid {compression} data: {e}")
@@ -0,0 +1,278 @@
+"""
+Opt-in instrumentation for conversions.
+
+A ConversionStats object is handed to convert()/convert_file() and filled in
+while the conversion runs:
+
+- stages:   monotonic (perf_counter) self time and call count per pipeline
+            stage. Stages nest, and a stage's time excludes the stages it
+            calls, e.g. "write" pulls profiles through "parse" and "emit"
+            but is only charged for the serialization itself.
+- counters: profiles converted, chunks, targets, ...
+- caches:   address cache hits/misses (every miss in a parser cache is a
+            country + region lookup) and the geography key normalization
+            cache, counted over the conversion only.
+
+When stats are off the services use NULL_STATS, whose wrappers return the
+wrapped function unchanged, so the disabled path costs nothing per profile.
+"""
+
+import json
+import sys
+import threading
+import time
+
+from helpers.address_cache import address_cache_stats
+
+# pipeline stages, in the order they run
+STAGE_ORDER = ["read", "split", "decode", "cache", "parse", "emit", "transcode", "convert", "write", "wait"]
+
+
+class ConversionStats:
+    """
+    Collects stage timings, counters and cache statistics for one
+    conversion.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.seconds  = 0.0
+        self.counters = {}
+        self.caches   = {}
+
+        self._started       = None
+        self._cache_start   = None
+        self._lock          = threading.Lock()
+        self._local         = threading.local()
+        self._thread_stages = []
+
+    # timing
+
+    def _thread_state(self) -> tuple:
+        """
+        Per-thread (stage totals, nesting stack), so writer threads can be
+        timed alongside the main thread.
+        """
+        state = getattr(self._local, "state", None)
+
+        if state is None:
+            state = self._local.state = ({}, [])
+            with self._lock:
+                self._thread_stages.append(state[0])
+
+        return state
+
+    def timed(self, stage: str, func):
+        """
+        Wrap func so every call is charged to stage (minus nested stages).
+        """
+        clock = time.perf_counter
+
+        def run(*args):
+            totals, stack = self._thread_state()
+            stack.append(0.0)
+            started = clock()
+
+            try:
+                return func(*args)
+
+            finally:
+                elapsed = clock() - started
+                nested  = stack.pop()
+
+                seconds, calls = totals.get(stage, (0.0, 0))
+                totals[stage]  = (seconds + elapsed - nested, calls + 1)
+
+                if stack:
+                    stack[-1] += elapsed
+
+        return run
+
+    def timed_iter(self, stage: str, iterable):
+        """
+        Wrap an iterable so producing each item is charged to stage.
+        """
+        next_item = self.timed(stage, next)
+        iterator  = iter(iterable)
+
+        try:
+            while True:
+                try:
+                    item = next_item(iterator)
+                except StopIteration:
+                    return
+                yield item
+
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+    def count(self, counter: str, amount: int = 1):
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def start(self):
+        self._started     = time.perf_counter()
+        self._cache_start = self._cache_snapshot()
+
+    def stop(self):
+        if self._started is None:
+            return
+
+        self.seconds  += time.perf_counter() - self._started
+        self._started  = None
+        self.caches    = self._cache_delta(self._cache_start, self._cache_snapshot())
+
+    # caches
+
+    @staticmethod
+    def _cache_snapshot() -> dict:
+        snapshot = {
+            name: (stats["hits"], stats["misses"], stats["size"])
+            for name, stats in address_cache_stats().items()
+        }
+
+        # only look at the geography tables if a conversion imported them
+        countries_map = sys.modules.get("constants.countries_map")
+
+        if countries_map is None:
+            snapshot["geo_key_normalization"] = (0, 0, 0)
+        else:
+            info = countries_map.normalize_geo_key.cache_info()
+            snapshot["geo_key_normalization"] = (info.hits, info.misses, info.currsize)
+
+        return snapshot
+
+    @staticmethod
+    def _cache_delta(before: dict, after: dict) -> dict:
+        caches = {}
+
+        for name, (hits, misses, size) in after.items():
+            hits_before, misses_before, _ = before.get(name, (0, 0, 0))
+            hits, misses = hits - hits_before, misses - misses_before
+            lookups = hits + misses
+
+            if lookups:
+                caches[name] = {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_rate": round(hits / lookups, 4),
+                    "size": size,
+                }
+
+        return caches
+
+    # reporting
+
+    @property
+    def stages(self) -> dict:
+        """
+        Stage -> (self seconds, calls), summed across threads.
+        """
+        stages = {}
+
+        with self._lock:
+            thread_stages = list(self._thread_stages)
+
+        for totals in thread_stages:
+            for stage, (seconds, calls) in list(totals.items()):
+                total_seconds, total_calls = stages.get(stage, (0.0, 0))
+                stages[stage] = (total_seconds + seconds, total_calls + calls)
+
+        order = {stage: i for i, stage in enumerate(STAGE_ORDER)}
+        return dict(sorted(stages.items(), key=lambda item: order.get(item[0], len(order))))
+
+    def as_dict(self) -> dict:
+        profiles = self.counters.get("profiles", 0)
+
+        return {
+            "seconds": round(self.seconds, 4),
+            "profiles": profiles,
+            "profiles_per_sec": round(profiles / self.seconds) if self.seconds else 0,
+            "stages": {
+                stage: {"seconds": round(seconds, 4), "calls": calls}
+                for stage, (seconds, calls) in self.stages.items()
+            },
+            "counters": dict(self.counters),
+            "caches": self.caches,
+        }
+
+    def summary(self) -> str:
+        """
+        Human-readable summary for the CLI.
+        """
+        stats = self.as_dict()
+        lines = [
+            f"Conversion stats: {stats['profiles']} profiles in {stats['seconds']}s "
+            f"({stats['profiles_per_sec']} profiles/sec)"
+        ]
+
+        for stage, stage_stats in stats["stages"].items():
+            share = 100 * stage_stats["seconds"] / self.seconds if self.seconds else 0
+            lines.append(
+                f"  {stage:<10} {stage_stats['seconds']:>9.4f}s {share:>5.1f}%  "
+                f"{stage_stats['calls']} calls"
+            )
+
+        for counter, value in stats["counters"].items():
+            if counter != "profiles":
+                lines.append(f"  {counter:<10} {value}")
+
+        for name, cache in stats["caches"].items():
+            lines.append(
+                f"  cache {name}: {cache['hit_rate']:.1%} hits "
+                f"({cache['hits']} hits, {cache['misses']} misses)"
+            )
+
+        return "\n".join(lines)
+
+    def write_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.as_dict(), f, indent=2)
+
+
+class _NullStats:
+    """
+    Stand-in used when stats are off: nothing is wrapped or counted.
+    """
+
+    enabled = False
+
+    def timed(self, stage: str, func):
+        return func
+
+    def timed_iter(self, stage: str, iterable):
+        return iterable
+
+    def count(self, counter: str, amount: int = 1):
+        pass
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+NULL_STATS = _NullStats()
+
+
+class _TimedReader:
+    """
+    File object proxy that charges read() calls to the "read" stage.
+    """
+
+    def __init__(self, fp, stats: ConversionStats):
+        self.read = stats.timed("read", fp.read)
+
+
+def timed_input(fp, stats):
+    """
+    Wrap an input file object so raw file reads are timed separately from
+    JSON decoding. Returns fp itself when stats are off.
+    """
+    if not stats.enabled:
+        return fp
+
+    return _TimedReader(fp, stats)
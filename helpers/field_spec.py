@@ -0,0 +1,416 @@
+"""
+Declarative field mapping specs.
+
+Each bot describes its JSON format once, as a RecordSpec per canonical model
+(address, card, profile). A spec is an ordered list of Fields, in the order
+the keys appear in the bot's JSON, each saying which bot key maps to which
+canonical attribute(s) and how to transform the value in each direction.
+
+At import the parser and emitter modules compile a spec into specialized
+functions, so no spec is interpreted per profile:
+
+    build_stellar_address = compile_parser(STELLAR_ADDRESS_SPEC, "build_stellar_address", __name__)
+    build_stellar_shipping = compile_emitter(STELLAR_ADDRESS_SPEC, "build_stellar_shipping", __name__)
+
+The generated parser reads every required key in one try block (a missing key
+is reported through require_key, so error messages are unchanged), then
+applies the transforms and builds the model. The generated emitter is a single
+dict literal. Use inspect_source(func) to see the generated code.
+
+compile_transcoder fuses a source bot's parser with a target bot's emitter,
+converting one bot's JSON straight into another's without building the
+canonical models in between.
+"""
+
+import linecache
+from dataclasses import MISSING, dataclass, fields as dataclass_fields
+from typing import Any, Callable
+
+from helpers.json_utils import require_key
+
+# marks a Field as required (no default when the key is missing)
+REQUIRED = object()
+
+# marks a Field without a constant emitted value
+NO_VALUE = object()
+
+
+@dataclass(frozen=True)
+class Field:
+    """
+    One key of a bot's JSON record.
+
+    Args:
+        key: key in the bot's JSON, or None for an attribute that is not
+            stored in the record (it is computed from parse_args).
+        attrs: canonical attribute(s) parsed from the key. With several
+            attributes the parse transform returns a tuple.
+        context: human-readable context for a missing required key.
+        parse: transform(raw value, *parse_args) -> canonical value(s).
+        emit: transform(*emit_from values) -> bot value.
+        emit_from: canonical attributes (or emitter params) passed to emit,
+            defaults to attrs.
+        parse_args: earlier canonical attributes (or parser params) passed
+            to parse after the raw value.
+        nested: name of a nested record ("address", "card"); the value is
+            converted by the function supplied for it at compile time.
+        default: value used when an optional key is missing.
+        same_as: (flag attribute, attribute): when the flag is set, reuse
+            the other attribute's value instead of converting this key.
+        emit_only: the key is written by the emitter but never parsed.
+        value: constant emitted for this key.
+    """
+    key: str | None
+    attrs: tuple | str = ()
+    context: str = ""
+    parse: Callable | None = None
+    emit: Callable | None = None
+    emit_from: tuple | str | None = None
+    parse_args: tuple = ()
+    nested: str | None = None
+    default: Any = REQUIRED
+    same_as: tuple | None = None
+    emit_only: bool = False
+    value: Any = NO_VALUE
+
+    def __post_init__(self):
+        if isinstance(self.attrs, str):
+            object.__setattr__(self, "attrs", (self.attrs,))
+
+        if self.emit_from is None:
+            object.__setattr__(self, "emit_from", self.attrs)
+        elif isinstance(self.emit_from, str):
+            object.__setattr__(self, "emit_from", (self.emit_from,))
+
+    @property
+    def required(self) -> bool:
+        return self.default is REQUIRED
+
+
+@dataclass(frozen=True)
+class RecordSpec:
+    """
+    A bot's JSON record for one canonical model.
+
+    Args:
+        name: spec name, used in compile errors and generated file names.
+        model: canonical dataclass built by the parser.
+        fields: Fields in the order the keys appear in the bot's JSON.
+        parse_params: extra arguments the compiled parser takes.
+        emit_params: extra arguments the compiled emitter takes.
+    """
+    name: str
+    model: type
+    fields: tuple
+    parse_params: tuple = ()
+    emit_params: tuple = ()
+
+
+def require_keys(data: dict, required: tuple):
+    """
+    Raise require_key's error for the first missing (key, context).
+    """
+    for key, context in required:
+        require_key(data, key, context)
+
+def _slots_settable(model: type) -> bool:
+    """
+    Whether instances can be built by setting their slots directly: a
+    slotted dataclass without __post_init__ or default factories.
+    """
+    if hasattr(model, "__post_init__"):
+        return False
+
+    for model_field in dataclass_fields(model):
+        if model_field.default_factory is not MISSING:
+            return False
+        if type(model.__dict__.get(model_field.name)).__name__ != "member_descriptor":
+            return False
+
+    return True
+
+def _define(source: str, name: str, namespace: dict, module: str | None, doc: str | None):
+    """
+    exec generated source and return the function, registered with
+    linecache so tracebacks through it show the generated lines.
+    """
+    filename = f"<field spec {module or ''}.{name}>"
+    linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+
+    exec(compile(source, filename, "exec"), namespace)
+
+    func = namespace[name]
+    func.__doc__ = doc
+    func.__generated_source__ = source
+
+    if module is not None:
+        # lets the function pickle by reference, like a hand-written one
+        func.__module__ = module
+
+    return func
+
+def _parse_body(spec: RecordSpec, nested: dict, namespace: dict, lines: list,
+                used: set | None = None) -> dict:
+    """
+    Append the lines reading and transforming spec's keys from `raw`.
+
+    Args:
+        used: the attributes the caller reads, when it does not need them
+            all. An optional key passed through as is cannot fail, so it is
+            not read at all unless one of its attributes is used.
+
+    Returns:
+        attribute (or parse param) -> expression holding its parsed value.
+    """
+    values   = {param: param for param in spec.parse_params}
+    fields   = [f for f in spec.fields if not f.emit_only]
+
+    if used is not None:
+        used   = used.union(*(f.parse_args + (f.same_as or ()) for f in fields))
+        fields = [
+            f for f in fields
+            if f.required or f.parse or f.nested or f.same_as or not f.attrs or used.intersection(f.attrs)
+        ]
+    required = [(i, f) for i, f in enumerate(fields) if f.key is not None and f.required]
+
+    if required:
+        namespace["_require_keys"] = require_keys
+        namespace["_required"]     = tuple((f.key, f.context) for _, f in required)
+
+        lines.append("    try:")
+        lines.extend(f"        r{i} = raw[{f.key!r}]" for i, f in required)
+        lines.append("    except KeyError:")
+        lines.append("        _require_keys(raw, _required)")
+        lines.append("        raise")
+
+    for i, f in enumerate(fields):
+        if f.key is not None and not f.required:
+            namespace[f"d{i}"] = f.default
+            lines.append(f"    r{i} = raw.get({f.key!r}, d{i})")
+
+    for i, f in enumerate(fields):
+        for dependency in f.parse_args + (f.same_as or ()):
+            if dependency not in values:
+                raise ValueError(f"{spec.name}: '{dependency}' must be parsed before '{f.key}'")
+
+        args = [f"r{i}"] if f.key is not None else []
+        args.extend(values[arg] for arg in f.parse_args)
+
+        transform = nested[f.nested] if f.nested else f.parse
+
+        if transform is not None:
+            namespace[f"p{i}"] = transform
+            expression = f"p{i}({', '.join(args)})"
+        elif len(args) == 1:
+            expression = args[0]
+        else:
+            raise ValueError(f"{spec.name}: field '{f.key}' needs a parse transform")
+
+        if f.same_as:
+            flag, other = f.same_as
+            expression = f"{values[other]} if {values[flag]} else {expression}"
+
+        if not f.attrs:
+            # only validated as present
+            continue
+
+        if transform is None and not f.same_as:
+            # passed through as is
+            values[f.attrs[0]] = expression
+            continue
+
+        targets = [f"v{i}_{n}" for n in range(len(f.attrs))]
+        lines.append(f"    {', '.join(targets)} = {expression}")
+
+        for attr, target in zip(f.attrs, targets):
+            values[attr] = target
+
+    model_attrs = {f.name for f in dataclass_fields(spec.model)}
+
+    for attr in values:
+        if attr not in model_attrs and attr not in spec.parse_params:
+            raise ValueError(f"{spec.name}: '{attr}' is not a {spec.model.__name__} attribute")
+
+    return values
+
+def _emit_body(spec: RecordSpec, nested: dict, namespace: dict, lines: list, source) -> list:
+    """
+    Append the lines computing spec's transformed values.
+
+    Args:
+        nested: functions emitting nested records, by Field.nested name. A
+            name mapped to None means the value is already emitted.
+        source: attribute (or emit param) -> expression holding its value.
+
+    Returns:
+        the "key: expression" members of the emitted dict, in spec order.
+    """
+    emitted = {}
+    members = []
+
+    for i, f in enumerate(spec.fields):
+        if f.key is None:
+            continue
+
+        transform = nested[f.nested] if f.nested else f.emit
+        same_as   = f.same_as
+
+        if f.nested and transform is None:
+            # converted (same_as included) before it got here
+            same_as = None
+
+        if f.value is not NO_VALUE:
+            namespace[f"c{i}"] = f.value
+            expression = f"c{i}"
+        elif transform is not None:
+            namespace[f"e{i}"] = transform
+            expression = f"e{i}({', '.join(source(attr) for attr in f.emit_from)})"
+        elif len(f.emit_from) == 1:
+            expression = source(f.emit_from[0])
+        else:
+            raise ValueError(f"{spec.name}: field '{f.key}' needs an emit transform")
+
+        if same_as:
+            flag, other = same_as
+            expression = f"{emitted[other]} if {source(flag)} else {expression}"
+
+        if transform is None and not same_as:
+            # plain attributes and constants go straight into the dict
+            members.append(f"{f.key!r}: {expression}")
+            if len(f.emit_from) == 1:
+                emitted[f.emit_from[0]] = expression
+            continue
+
+        lines.append(f"    v{i} = {expression}")
+        members.append(f"{f.key!r}: v{i}")
+
+        if len(f.emit_from) == 1:
+            emitted[f.emit_from[0]] = f"v{i}"
+
+    return members
+
+def compile_parser(spec: RecordSpec, name: str, module: str | None = None,
+                   nested: dict | None = None, doc: str | None = None):
+    """
+    Compile a spec into parser(raw, *spec.parse_params) -> spec.model.
+
+    Args:
+        nested: functions converting nested records, by Field.nested name.
+
+    Raises:
+        ValueError: if the spec references unknown or later attributes, or
+            leaves a required model attribute unset.
+    """
+    namespace = {"_model": spec.model}
+    lines     = [f"def {name}(raw{''.join(', ' + p for p in spec.parse_params)}):"]
+    values    = _parse_body(spec, nested or {}, namespace, lines)
+
+    model_attrs = {f.name: f for f in dataclass_fields(spec.model)}
+
+    for attr, model_field in model_attrs.items():
+        if attr not in values and model_field.default is MISSING and model_field.default_factory is MISSING:
+            raise ValueError(f"{spec.name}: no field sets {spec.model.__name__}.{attr}")
+
+    if _slots_settable(spec.model):
+        # frozen dataclass __init__ goes through object.__setattr__ per field;
+        # filling the slots directly builds the same instance several times faster
+        namespace["_new"] = object.__new__
+        lines.append("    obj = _new(_model)")
+
+        for attr, model_field in model_attrs.items():
+            namespace[f"s_{attr}"] = spec.model.__dict__[attr].__set__
+
+            if attr not in values:
+                namespace[f"default_{attr}"] = model_field.default
+                values[attr] = f"default_{attr}"
+
+            lines.append(f"    s_{attr}(obj, {values[attr]})")
+
+        lines.append("    return obj")
+    else:
+        arguments = ", ".join(f"{attr}={values[attr]}" for attr in model_attrs if attr in values)
+        lines.append(f"    return _model({arguments})")
+
+    return _define("\n".join(lines) + "\n", name, namespace, module, doc)
+
+def compile_emitter(spec: RecordSpec, name: str, module: str | None = None,
+                    nested: dict | None = None, doc: str | None = None):
+    """
+    Compile a spec into emitter(obj, *spec.emit_params) -> dict, with the
+    keys in spec order.
+
+    Args:
+        nested: functions emitting nested records, by Field.nested name.
+    """
+    namespace = {}
+    lines     = [f"def {name}(obj{''.join(', ' + p for p in spec.emit_params)}):"]
+
+    def source(attr: str) -> str:
+        return attr if attr in spec.emit_params else f"obj.{attr}"
+
+    members = _emit_body(spec, nested or {}, namespace, lines, source)
+    lines.append(f"    return {{{', '.join(members)}}}")
+
+    return _define("\n".join(lines) + "\n", name, namespace, module, doc)
+
+def compile_transcoder(source_spec: RecordSpec, target_spec: RecordSpec, name: str,
+                       module: str | None = None, nested: dict | None = None, doc: str | None = None):
+    """
+    Compile two specs of the same model into a direct transcoder:
+    transcoder(raw, *source_spec.parse_params, *target_spec.emit_params)
+    -> the dict target_spec's emitter would build from source_spec's parser.
+
+    The source keys are read and transformed exactly as the compiled parser
+    does, so every validation (and its error message) still runs, but the
+    values go straight into the target dict literal instead of through a
+    model instance. Optional keys the target never emits are not read, as
+    reading them cannot fail. Attributes the source does not store take the
+    model's default.
+
+    Nested records are transcoded (parsed and emitted) where the source
+    reads them, whereas the canonical route parses the whole record before
+    emitting any of it. A record with several problems therefore fails
+    either way, but may report a different one of them.
+
+    Args:
+        nested: functions transcoding nested records (raw source record ->
+            target dict), by Field.nested name.
+
+    Raises:
+        ValueError: if the specs describe different models, or the target
+            needs an attribute the source cannot provide.
+    """
+    if source_spec.model is not target_spec.model:
+        raise ValueError(f"{source_spec.name} and {target_spec.name} describe different models")
+
+    nested    = nested or {}
+    params    = source_spec.parse_params + target_spec.emit_params
+    namespace = {}
+    lines     = [f"def {name}(raw{''.join(', ' + p for p in params)}):"]
+    used      = set().union(*(f.emit_from + (f.same_as or ()) for f in target_spec.fields if f.key is not None))
+    values    = _parse_body(source_spec, nested, namespace, lines, used)
+    defaults  = {f.name: f.default for f in dataclass_fields(source_spec.model) if f.default is not MISSING}
+
+    def source(attr: str) -> str:
+        if attr in target_spec.emit_params:
+            return attr
+
+        if attr in values:
+            return values[attr]
+
+        if attr in defaults:
+            namespace[f"default_{attr}"] = defaults[attr]
+            return f"default_{attr}"
+
+        raise ValueError(f"{target_spec.name}: {source_spec.name} does not set '{attr}'")
+
+    members = _emit_body(target_spec, dict.fromkeys(nested), namespace, lines, source)
+    lines.append(f"    return {{{', '.join(members)}}}")
+
+    return _define("\n".join(lines) + "\n", name, namespace, module, doc)
+
+def inspect_source(func) -> str:
+    """
+    The generated source of a compiled parser or emitter.
+    """
+    return func.__generated_source__
@@ -0,0 +1,227 @@
+"""
+JSON codecs: which library encodes and decodes JSON, and the output layout.
+
+Serializing output is the most expensive step of a conversion, and the
+stdlib only uses its C encoder for compact output; json.dumps(indent=2)
+runs in pure Python. A JSONCodec picks the library:
+
+    orjson   fastest, used automatically when installed
+    ujson    used automatically when installed and orjson is not
+    stdlib   always available, so no JSON library is ever required
+
+and the layout: indented (two spaces, like json.dump(..., indent=2)) or
+compact (no whitespace at all, the smallest and fastest output).
+
+Every codec produces the same JSON values; only the bytes may differ
+(orjson and ujson write non-ASCII characters as UTF-8 instead of \\u
+escapes). The stdlib codec writes exactly what json.dump does, so "auto"
+keeps it for indented output, which stays byte-identical to what the
+converter always wrote, and only uses the fastest library to read and to
+write compact output.
+
+The libraries are imported the first time a codec encodes or decodes, so
+importing this module costs nothing. Codecs pickle by name, so they can be
+sent to worker processes.
+"""
+
+import importlib
+import json
+
+CODEC_AUTO   = "auto"
+CODEC_ORJSON = "orjson"
+CODEC_UJSON  = "ujson"
+CODEC_STDLIB = "stdlib"
+
+# preference order of CODEC_AUTO
+CODEC_NAMES = [CODEC_ORJSON, CODEC_UJSON, CODEC_STDLIB]
+
+JSON_INDENT = 2
+
+LAYOUT_INDENTED = "indented"
+LAYOUT_COMPACT  = "compact"
+
+# json.JSONDecoder.raw_decode: decode one value and report where it ends,
+# which the streaming export reader needs. orjson and ujson only decode
+# whole documents, so every codec streams with the stdlib scanner.
+_stdlib_raw_decode = json.JSONDecoder().raw_decode
+
+
+def _stdlib_functions(compact: bool) -> tuple:
+    if compact:
+        return (lambda value: json.dumps(value, separators=(",", ":"))), json.loads
+
+    return (lambda value: json.dumps(value, indent=JSON_INDENT)), json.loads
+
+def _orjson_functions(compact: bool) -> tuple:
+    orjson = importlib.import_module("orjson")
+    option = 0 if compact else orjson.OPT_INDENT_2
+    dumps  = orjson.dumps
+
+    return (lambda value: dumps(value, option=option).decode("utf-8")), orjson.loads
+
+def _ujson_functions(compact: bool) -> tuple:
+    ujson  = importlib.import_module("ujson")
+    indent = 0 if compact else JSON_INDENT
+    dumps  = ujson.dumps
+
+    def ujson_dumps(value):
+        return dumps(value, indent=indent, ensure_ascii=False, escape_forward_slashes=False)
+
+    return ujson_dumps, ujson.loads
+
+_CODEC_FUNCTIONS = {
+    CODEC_ORJSON: _orjson_functions,
+    CODEC_UJSON: _ujson_functions,
+    CODEC_STDLIB: _stdlib_functions,
+}
+
+def _installed_functions(names: list[str], compact: bool) -> tuple:
+    """
+    (name, dumps, loads) of the first codec in names whose library is
+    installed.
+
+    Raises:
+        ImportError: if none is.
+    """
+    for name in names:
+        try:
+            return (name,) + _CODEC_FUNCTIONS[name](compact)
+        except ImportError:
+            continue
+
+    raise ImportError(f"JSON codec '{names[0]}' needs the {names[0]} package, which is not installed")
+
+def available_codecs() -> list[str]:
+    """
+    Names of the codecs whose library is installed, fastest first.
+    """
+    available = []
+
+    for name in CODEC_NAMES:
+        try:
+            _CODEC_FUNCTIONS[name](False)
+        except ImportError:
+            continue
+
+        available.append(name)
+
+    return available
+
+
+class JSONCodec:
+    """
+    Encodes and decodes JSON with one library, in one layout.
+
+    Args:
+        name: "orjson", "ujson", "stdlib" or "auto" (the fastest installed,
+            except that indented output is always written by the stdlib).
+        compact: write compact instead of indented JSON.
+
+    Raises:
+        ValueError: if the name is unknown. A library that is not installed
+            raises ImportError on first use.
+    """
+
+    def __init__(self, name: str = CODEC_AUTO, compact: bool = False):
+        if name != CODEC_AUTO and name not in CODEC_NAMES:
+            raise ValueError(
+                f"Unsupported JSON codec: {name}. "
+                f"Supported codecs: {[CODEC_AUTO] + CODEC_NAMES}"
+            )
+
+        self.requested     = name
+        self.compact       = compact
+        self._name         = None
+        self._dumps        = None
+        self._loads        = None
+        self._compact_twin = None
+
+    def __getstate__(self):
+        return {"requested": self.requested, "compact": self.compact}
+
+    def __setstate__(self, state):
+        self.__init__(state["requested"], state["compact"])
+
+    def __repr__(self) -> str:
+        return f"JSONCodec({self.requested!r}, compact={self.compact})"
+
+    def _resolve(self):
+        if self.requested != CODEC_AUTO:
+            self._name = self.requested
+            self._dumps, self._loads = _installed_functions([self.requested], self.compact)[1:]
+            return
+
+        self._name, self._dumps, self._loads = _installed_functions(CODEC_NAMES, self.compact)
+
+        if not self.compact:
+            self._name  = CODEC_STDLIB
+            self._dumps = _stdlib_functions(False)[0]
+
+    @property
+    def name(self) -> str:
+        """
+        The library actually used to write ("auto" resolved).
+        """
+        if self._name is None:
+            self._resolve()
+
+        return self._name
+
+    @property
+    def layout(self) -> str:
+        return LAYOUT_COMPACT if self.compact else LAYOUT_INDENTED
+
+    @property
+    def key_separator(self) -> str:
+        return ":" if self.compact else ": "
+
+    def as_compact(self) -> "JSONCodec":
+        """
+        This codec in the compact layout, for formats such as JSON lines
+        that are always written without indentation.
+        """
+        if self.compact:
+            return self
+
+        if self._compact_twin is None:
+            self._compact_twin = JSONCodec(self.requested, compact=True)
+
+        return self._compact_twin
+
+    def dumps(self, value) -> str:
+        """
+        Serialize a value as a top-level document in this codec's layout.
+        """
+        if self._dumps is None:
+            self._resolve()
+
+        return self._dumps(value)
+
+    def loads(self, text: str | bytes):
+        """
+        Decode a whole JSON document.
+
+        Raises:
+            ValueError: if the text is not valid JSON (the stdlib and orjson
+                raise json.JSONDecodeError, a subclass).
+        """
+        if self._loads is None:
+            self._resolve()
+
+        return self._loads(text)
+
+    @staticmethod
+    def raw_decode(text: str, pos: int) -> tuple:
+        """
+        Decode the JSON value starting at text[pos], returning it and the
+        position where it ends.
+
+        Raises:
+            json.JSONDecodeError: if no complete value starts there.
+        """
+        return _stdlib_raw_decode(text, pos)
+
+
+# indented output exactly as json.dump writes it, read with the fastest
+# installed library
+DEFAULT_CODEC = JSONCodec()
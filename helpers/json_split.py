@@ -0,0 +1,446 @@
+"""
+Byte-range splitting of bot exports, so worker processes can decode them.
+
+helpers.json_stream decodes an export in one process, which caps --jobs at
+the speed of a single JSON decoder. This module instead scans the raw bytes
+of an uncompressed export (memory-mapped, so the file is never read into
+Python objects) for profile boundaries, and cuts the list of profiles into
+byte ranges of about SPLIT_RANGE_SIZE each:
+
+    Stellar   [ {profile}, ... ]                     top-level elements
+    Valor     { "id": {profile}, ... }               top-level members
+    Cybersole [ { "profiles": [ {profile} ] }, ... ] elements of every
+                                                     group's "profiles"
+
+Each range is a run of whole elements (or members) of one profile container,
+so a worker only has to wrap it in brackets to decode it on its own with
+read_export_range.
+
+The containers above the profiles follow the export shape (see
+helpers.json_stream) and are walked token by token. Profile containers are
+scanned a window at a time with bytes.translate, which keeps only quotes and
+brackets: as long as no string in the window holds a bracket or an escaped
+quote, the bracket depth alone tells where each profile ends. A window that
+breaks this rule (a name with a "{" in it, a note with \\" in it) is scanned
+again with escapes blanked out and only the brackets outside of quotes
+counted, so cuts never land inside a string or a nested object. Anything else wrong with the JSON is left to the workers,
+which decode every byte of their range strictly.
+
+A JSON_LINES export (one profile per line after a header line) is simply
+cut at the first newline after every SPLIT_RANGE_SIZE bytes; its header is
+left to the bot's own reader.
+"""
+
+import json
+import mmap
+import re
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass
+from itertools import accumulate
+from pathlib import Path
+
+from helpers.json_codec import DEFAULT_CODEC, JSONCodec
+from helpers.json_stream import JSON_ARRAY, JSON_LINES, JSON_OBJECT, ProfileStreamDecoder
+
+# bytes of export handed to a worker process at a time (--jobs)
+SPLIT_RANGE_SIZE = 1024 * 1024
+
+_BRACKETS = {JSON_ARRAY: (b"[", b"]"), JSON_OBJECT: (b"{", b"}")}
+
+# bytes.translate tables: delete everything but quotes and brackets, and
+# map opening/closing brackets to +1/-1 (as signed bytes)
+_NOT_MARKS = bytes(byte for byte in range(256) if byte not in b'"[]{}')
+_DEPTH     = bytes.maketrans(b"[{]}", b"\x01\x01\xff\xff")
+
+_WHITESPACE = re.compile(rb"[ \t\n\r]*")
+_BRACKET    = re.compile(rb"[\[\]{}]")
+_MARK       = re.compile(rb'["\[\]{}]')
+_ESCAPE     = re.compile(rb"\\.", re.DOTALL)
+_STRING     = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+# a lone quote is a string running past the end of the scanned bytes
+_TOKEN      = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|"|[\[\]{}]', re.DOTALL)
+_SCALAR     = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[^\s,:\[\]{}"]+', re.DOTALL)
+
+# _fast_cut result for a window it cannot vouch for
+_UNVERIFIED = object()
+
+
+@dataclass(frozen=True)
+class ExportRange:
+    """
+    A run of whole elements (JSON_ARRAY), members (JSON_OBJECT) or lines
+    (JSON_LINES) of one profile container, as the bytes [start, end) of an
+    export file.
+    """
+    path: str
+    start: int
+    end: int
+    container: str
+
+
+def _export_head(path, pos: int) -> bytes:
+    with open(path, "rb") as f:
+        return f.read(pos)
+
+def _invalid_json_error(path, message: str, pos: int) -> ValueError:
+    """
+    The error for invalid JSON at byte pos of an export, placed by line,
+    column and character as helpers.json_stream places it, so --jobs
+    reports the same position a single process does.
+    """
+    head  = _export_head(path, pos).decode("utf-8", errors="replace")
+    error = json.JSONDecodeError(message, head, len(head))
+
+    return ValueError(f"Input file '{path}' contains invalid JSON: {error}")
+
+def _mark_offset(buf: bytes, pattern: re.Pattern, count: int, index: int) -> int:
+    """
+    Offset in buf of the index-th of its count matches of a one-byte
+    pattern, searching back from the end, where the wanted one almost
+    always is.
+    """
+    from_end = count - index
+    size     = 4096
+
+    while True:
+        offsets = [match.start() for match in pattern.finditer(buf, max(len(buf) - size, 0))]
+
+        if len(offsets) >= from_end:
+            return offsets[-from_end]
+
+        size *= 4
+
+def _last_boundary(depths: list):
+    """
+    The index of the bracket closing the container (closed=True), else of
+    the last bracket closing a profile, from the depths after each bracket.
+    """
+    if -1 in depths:
+        return depths.index(-1), True
+
+    if 0 in depths:
+        return len(depths) - 1 - depths[::-1].index(0), False
+
+    return None, False
+
+def _fast_cut(buf: bytes):
+    """
+    The last profile boundary in buf, which starts at one, from bracket
+    depths alone.
+
+    Returns:
+        (offset, closed): the offset just past the last profile ending in
+        buf, or with closed=True the offset of the bracket closing the
+        container. None if no profile ends in buf, and _UNVERIFIED if a
+        string in buf holds a bracket or an escaped quote.
+    """
+    if b"\\" in buf and b'\\"' in buf:
+        return _UNVERIFIED
+
+    marks    = buf.translate(None, _NOT_MARKS)
+    brackets = marks.translate(None, b'"')
+
+    # with bracket-free strings every string is an adjacent pair of quotes;
+    # brackets before the first unpaired quote are outside of strings
+    stray   = marks.replace(b'""', b"").find(b'"')
+    trusted = len(brackets) if stray < 0 else stray
+
+    index, closed = _last_boundary(list(accumulate(array("b", brackets[:trusted].translate(_DEPTH)))))
+
+    if index is None:
+        return None if trusted == len(brackets) else _UNVERIFIED
+
+    offset = _mark_offset(buf, _BRACKET, len(brackets), index)
+
+    return (offset, True) if closed else (offset + 1, False)
+
+def _exact_cut(buf: bytes):
+    """
+    _fast_cut for any window: escape sequences are blanked out (which keeps
+    offsets), and brackets after an odd number of quotes, inside strings,
+    are left out.
+    """
+    if b"\\" in buf:
+        buf = _ESCAPE.sub(b"__", buf)
+
+    marks   = buf.translate(None, _NOT_MARKS)
+    parts   = marks.split(b'"')
+    outside = parts[0::2]
+
+    index, closed = _last_boundary(list(accumulate(array("b", b"".join(outside).translate(_DEPTH)))))
+
+    if index is None:
+        return None
+
+    # find the bracket's part between two quotes, then its place in marks
+    ends   = list(accumulate(map(len, outside)))
+    part   = bisect_right(ends, index)
+    mark   = sum(map(len, parts[:2 * part])) + 2 * part + index - (ends[part - 1] if part else 0)
+    offset = _mark_offset(buf, _MARK, len(marks), mark)
+
+    return (offset, True) if closed else (offset + 1, False)
+
+
+class _ExportScanner:
+    """
+    Walks one memory-mapped export along its shape, yielding ExportRanges.
+    """
+
+    def __init__(self, path: Path, mm: mmap.mmap, shape: tuple, range_size: int):
+        self.path       = str(path)
+        self.mm         = mm
+        self.shape      = shape
+        self.range_size = range_size
+
+    def _error(self, message: str, pos: int):
+        raise _invalid_json_error(self.path, message, pos)
+
+    def _skip_whitespace(self, pos: int) -> int:
+        return _WHITESPACE.match(self.mm, pos).end()
+
+    def _expect(self, pos: int, char: bytes, message: str) -> int:
+        if self.mm[pos:pos + 1] != char:
+            self._error(message, pos)
+
+        return self._skip_whitespace(pos + 1)
+
+    def scan(self):
+        pos = yield from self._walk(0, self._skip_whitespace(0))
+
+        if self._skip_whitespace(pos) != len(self.mm):
+            self._error("Extra data", pos)
+
+    def _skip_value(self, pos: int) -> int:
+        """
+        Skip (and validate) a member of an outer container that does not
+        lead to profiles.
+        """
+        mm = self.mm
+
+        if mm[pos:pos + 1] in (b"[", b"{"):
+            depth = 0
+
+            for match in _TOKEN.finditer(mm, pos):
+                char = mm[match.start()]
+
+                if char == ord('"'):
+                    if match.end() - match.start() == 1:
+                        break
+                    continue
+
+                depth += 1 if char in b"[{" else -1
+
+                if depth == 0:
+                    end = match.end()
+                    break
+            else:
+                end = None
+
+            if depth:
+                self._error("Unterminated JSON document", pos)
+        else:
+            match = _SCALAR.match(mm, pos)
+
+            if match is None:
+                self._error("Expecting value", pos)
+
+            end = match.end()
+
+        try:
+            json.loads(mm[pos:end])
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            self._error("Invalid value", pos)
+
+        return end
+
+    def _walk(self, depth: int, pos: int):
+        kind, key, context = self.shape[depth]
+        opening, closing   = _BRACKETS[kind]
+
+        if self.mm[pos:pos + 1] != opening:
+            self._error(f"Expecting JSON {kind} for export profiles", pos)
+
+        if depth == len(self.shape) - 1:
+            return (yield from self._split(pos + 1, kind))
+
+        pos       = self._skip_whitespace(pos + 1)
+        keys_seen = []
+        found     = False
+
+        if self.mm[pos:pos + 1] != closing:
+            while True:
+                member = None
+
+                if kind == JSON_OBJECT:
+                    match = _STRING.match(self.mm, pos)
+
+                    if match is None:
+                        self._error("Expecting property name enclosed in double quotes", pos)
+
+                    member = json.loads(match.group())
+                    keys_seen.append(member)
+                    pos = self._expect(self._skip_whitespace(match.end()), b":", "Expecting ':' delimiter")
+
+                if key is None or member == key:
+                    pos   = yield from self._walk(depth + 1, pos)
+                    found = True
+                else:
+                    pos = self._skip_value(pos)
+
+                pos = self._skip_whitespace(pos)
+
+                if self.mm[pos:pos + 1] == closing:
+                    break
+
+                pos = self._expect(pos, b",", "Expecting ',' delimiter")
+
+        if key is not None and not found:
+            raise ValueError(
+                f"Missing required field '{key}' in {context}. "
+                f"Available keys: {keys_seen}"
+            )
+
+        return pos + 1
+
+    def _find_cut(self, start: int):
+        size   = len(self.mm)
+        window = self.range_size
+
+        while True:
+            end = min(start + window, size)
+            buf = self.mm[start:end]
+            cut = _fast_cut(buf)
+
+            if cut is _UNVERIFIED:
+                cut = _exact_cut(buf)
+
+            if cut is not None:
+                return start + cut[0], cut[1]
+
+            if end == size:
+                self._error("Unterminated JSON document", start)
+
+            window *= 2
+
+    def _split(self, pos: int, kind: str):
+        closing = _BRACKETS[kind][1]
+        start   = pos
+        member  = False
+
+        while True:
+            cut, closed = self._find_cut(start)
+
+            if self._skip_whitespace(start) < cut:
+                yield ExportRange(self.path, start, cut, kind)
+            elif member:
+                self._error("Expecting value", start)
+
+            if closed:
+                if self.mm[cut:cut + 1] != closing:
+                    self._error("Expecting ',' delimiter", cut)
+                return cut + 1
+
+            pos = self._skip_whitespace(cut)
+
+            if self.mm[pos:pos + 1] == closing:
+                return pos + 1
+
+            if self.mm[pos:pos + 1] != b",":
+                self._error("Expecting ',' delimiter", pos)
+
+            start  = pos + 1
+            member = True
+
+
+def _iter_line_ranges(path: Path, mm: mmap.mmap, range_size: int):
+    """
+    ExportRanges of whole lines, skipping the header line and any range
+    holding nothing but whitespace.
+    """
+    size  = len(mm)
+    start = mm.find(b"\n") + 1
+
+    while 0 < start < size:
+        cut = mm.find(b"\n", min(start + range_size, size) - 1)
+        end = size if cut < 0 else cut + 1
+
+        if _WHITESPACE.match(mm, start, end).end() < end:
+            yield ExportRange(str(path), start, end, JSON_LINES)
+
+        start = end
+
+def iter_export_ranges(path: Path, shape: tuple, range_size: int = SPLIT_RANGE_SIZE):
+    """
+    Lazily yield ExportRanges covering every profile of an uncompressed
+    export file, in order.
+
+    Raises:
+        ValueError: naming the line and column, if the export's structure
+            is not valid JSON of the given shape.
+    """
+    with Path(path).open("rb") as f:
+        if not f.seek(0, 2):
+            raise _invalid_json_error(path, "Expecting value", 0)
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if shape[0][0] == JSON_LINES:
+                yield from _iter_line_ranges(path, mm, range_size)
+            else:
+                yield from _ExportScanner(path, mm, shape, range_size).scan()
+
+def _read_line_range(export_range: ExportRange, data: bytes, codec: JSONCodec) -> list:
+    loads    = codec.loads
+    offset   = export_range.start
+    profiles = []
+
+    for line in data.split(b"\n"):
+        if line and not line.isspace():
+            try:
+                profiles.append(loads(line))
+            except ValueError as e:
+                number = _export_head(export_range.path, offset).count(b"\n") + 1
+                raise ValueError(f"Input file '{export_range.path}' contains invalid JSON on line {number}: {e}")
+
+        offset += len(line) + 1
+
+    return profiles
+
+def read_export_range(export_range: ExportRange, codec: JSONCodec = DEFAULT_CODEC) -> list:
+    """
+    Decode the raw profiles of one ExportRange, the way
+    helpers.json_stream would decode them from the whole export.
+
+    Raises:
+        ValueError: naming the line and column, if the range is not valid
+            JSON.
+    """
+    with open(export_range.path, "rb") as f:
+        f.seek(export_range.start)
+        data = f.read(export_range.end - export_range.start)
+
+    if export_range.container == JSON_LINES:
+        return _read_line_range(export_range, data, codec)
+
+    opening, closing = _BRACKETS[export_range.container]
+    decoder          = ProfileStreamDecoder(((export_range.container, None, "export range"),), codec)
+    text             = ""
+
+    try:
+        text     = (opening + data + closing).decode("utf-8")
+        profiles = decoder.feed(text)
+        profiles.extend(decoder.close())
+
+    except UnicodeDecodeError as e:
+        raise ValueError(
+            f"Input file '{export_range.path}' is not valid UTF-8: byte {export_range.start + e.start - 1}"
+        )
+
+    except json.JSONDecodeError as e:
+        offset = export_range.start + len(text[:e.pos].encode("utf-8")) - 1
+
+        raise _invalid_json_error(
+            export_range.path, e.msg, min(max(offset, export_range.start), export_range.end)
+        )
+
+    return profiles
@@ -0,0 +1,436 @@
+"""
+Incremental JSON reader for bot exports.
+
+Exports can hold millions of profiles, so instead of json.load-ing the whole
+file (and keeping the full raw dict tree alive while parsing) this module walks
+the document structure one token at a time and only fully decodes a single
+profile at a time.
+
+Each bot describes where its profiles live with an export shape: the chain of
+containers from the document root down to one profile. Every step is a tuple of
+
+    (container, key, context)
+
+- container: JSON_ARRAY or JSON_OBJECT, the container expected at that depth
+- key:       None to follow every element/member, or the name of a required
+             object key to follow (all other members are skipped)
+- context:   human-readable context used when a required key is missing
+
+Examples:
+    Stellar   [ {profile}, ... ]                    -> ((JSON_ARRAY, None, ...),)
+    Valor     { "id": {profile}, ... }              -> ((JSON_OBJECT, None, ...),)
+    Cybersole [ { "profiles": [ {profile} ] }, ...] -> array / "profiles" / array
+
+JSON_LINES describes a newline-delimited file instead: a header line, then
+one profile per line (the canonical format, see specs/canonical.py). Its
+bot reads it line by line rather than with this module's decoder, but loaded
+(a list of the profile values) it is walked like an array.
+"""
+
+import json
+
+from helpers.json_codec import DEFAULT_CODEC, JSONCodec
+
+JSON_ARRAY  = "array"
+JSON_OBJECT = "object"
+JSON_LINES  = "lines"
+
+READ_CHUNK_SIZE = 64 * 1024
+
+# characters read to sniff the first profile of an export
+SNIFF_SIZE = 256 * 1024
+
+_OPENING_CHAR = {JSON_ARRAY: "[", JSON_OBJECT: "{"}
+_WHITESPACE   = " \t\n\r"
+
+# a value that fails to decode this close to the end of the buffer may just
+# be cut short by the chunk boundary (a literal such as "tru", an exponent
+# such as "1e", a "\u00" escape); anywhere earlier the JSON is invalid
+_TRUNCATION_WINDOW = 8
+
+# parser states for an open container
+_FIRST = 0  # just opened, expecting a value/key or the closing bracket
+_VALUE = 1  # expecting a value
+_KEY   = 2  # expecting an object key
+_COLON = 3  # expecting ':' after an object key
+_COMMA = 4  # expecting ',' or the closing bracket
+
+
+class _NeedMoreData(Exception):
+    """
+    Raised internally when the buffer ends in the middle of a token.
+    """
+
+
+class _Frame:
+    """
+    One open container on the decoder stack.
+    """
+    __slots__ = ("kind", "state", "key", "keys_seen", "found")
+
+    def __init__(self, kind: str):
+        self.kind      = kind
+        self.state     = _FIRST
+        self.key       = None
+        self.keys_seen = []
+        self.found     = False
+
+
+class ProfileStreamDecoder:
+    """
+    Push-based incremental decoder that yields raw profiles as soon as they
+    are complete in the input.
+
+    Usage:
+        decoder = ProfileStreamDecoder(shape)
+        for chunk in chunks:
+            for profile in decoder.feed(chunk):
+                ...
+        for profile in decoder.close():
+            ...
+
+    Invalid JSON is reported as soon as the chunk holding it is fed, with
+    its line, column and character position in the whole input.
+
+    Raises:
+        json.JSONDecodeError: if the input is not valid JSON.
+        ValueError: if the document does not match the export shape.
+    """
+
+    def __init__(self, shape: tuple, codec: JSONCodec = DEFAULT_CODEC):
+        self._shape      = shape
+        self._raw_decode = codec.raw_decode
+        self._buf        = ""
+        self._pos        = 0
+        self._offset     = 0  # characters dropped from the front of the buffer
+        self._lines      = 0  # newlines among them
+        self._column     = 0  # characters after the last of them
+        self._stack      = []
+        self._started    = False
+        self._done       = False
+        self._closed     = False
+
+    def feed(self, text: str) -> list:
+        """
+        Append text to the buffer and return every profile completed by it.
+        """
+        if self._closed:
+            raise ValueError("Cannot feed a closed decoder")
+
+        if self._pos:
+            self._consume()
+            self._buf = self._buf[self._pos:] + text
+            self._pos = 0
+        else:
+            self._buf += text
+
+        return self._drain()
+
+    def close(self) -> list:
+        """
+        Signal the end of input and return any remaining profiles.
+        """
+        self._closed = True
+        profiles = self._drain()
+
+        if not self._done:
+            self._error("Expecting value" if not self._started else "Unterminated JSON document")
+
+        return profiles
+
+    # internals
+
+    def _drain(self) -> list:
+        profiles = []
+
+        try:
+            self._parse(profiles)
+        except _NeedMoreData:
+            if self._closed:
+                self._error("Unterminated JSON document")
+
+        return profiles
+
+    def _consume(self):
+        """
+        Account for the buffer up to the current position before it is dropped.
+        """
+        buf, pos = self._buf, self._pos
+        newlines = buf.count("\n", 0, pos)
+
+        if newlines:
+            self._lines  += newlines
+            self._column  = pos - buf.rindex("\n", 0, pos) - 1
+        else:
+            self._column += pos
+
+        self._offset += pos
+
+    def _decode_error(self, message: str, pos: int) -> json.JSONDecodeError:
+        """
+        A JSONDecodeError at buffer position pos, placed in the whole input.
+        """
+        error = json.JSONDecodeError(message, self._buf, pos)
+
+        if error.lineno == 1:
+            error.colno += self._column
+
+        error.lineno += self._lines
+        error.pos    += self._offset
+        error.args    = (f"{message}: line {error.lineno} column {error.colno} (char {error.pos})",)
+
+        return error
+
+    def _error(self, message: str):
+        raise self._decode_error(message, self._pos)
+
+    def _skip_whitespace(self) -> bool:
+        buf, pos, end = self._buf, self._pos, len(self._buf)
+
+        while pos < end and buf[pos] in _WHITESPACE:
+            pos += 1
+
+        self._pos = pos
+        return pos < end
+
+    def _decode_value(self):
+        """
+        Decode one complete JSON value at the current position.
+        """
+        try:
+            value, end = self._raw_decode(self._buf, self._pos)
+        except json.JSONDecodeError as e:
+            # only a value running into the end of the buffer can be completed
+            # by the next chunk ("Unterminated string" is reported where the
+            # string starts, but only when it runs to the end)
+            truncated = e.msg.startswith("Unterminated string") or e.pos >= len(self._buf) - _TRUNCATION_WINDOW
+
+            if truncated and not self._closed:
+                raise _NeedMoreData()
+
+            raise self._decode_error(e.msg, e.pos) from None
+
+        # a number touching the end of the buffer may still be incomplete
+        if end == len(self._buf) and not self._closed and isinstance(value, (int, float)):
+            raise _NeedMoreData()
+
+        self._pos = end
+        return value
+
+    def _open(self, depth: int):
+        kind = self._shape[depth][0]
+
+        if self._buf[self._pos] != _OPENING_CHAR[kind]:
+            self._error(f"Expecting JSON {kind} for export profiles")
+
+        self._pos += 1
+        self._stack.append(_Frame(kind))
+
+    def _close(self):
+        frame = self._stack.pop()
+        self._pos += 1
+
+        _, key, context = self._shape[len(self._stack)]
+        if key is not None and not frame.found:
+            raise ValueError(
+                f"Missing required field '{key}' in {context}. "
+                f"Available keys: {frame.keys_seen}"
+            )
+
+        if not self._stack:
+            self._done = True
+
+    def _parse(self, profiles: list):
+        shape = self._shape
+        last  = len(shape) - 1
+
+        while self._skip_whitespace():
+            if self._done:
+                self._error("Extra data")
+
+            if not self._started:
+                self._open(0)
+                self._started = True
+                continue
+
+            frame = self._stack[-1]
+            char  = self._buf[self._pos]
+            state = frame.state
+
+            if frame.kind == JSON_ARRAY:
+                if char == "]" and state in (_FIRST, _COMMA):
+                    self._close()
+                    continue
+
+                if state == _COMMA:
+                    if char != ",":
+                        self._error("Expecting ',' delimiter")
+                    self._pos += 1
+                    frame.state = _VALUE
+                    continue
+
+                member = None
+
+            else:
+                if char == "}" and state in (_FIRST, _COMMA):
+                    self._close()
+                    continue
+
+                if state == _COMMA:
+                    if char != ",":
+                        self._error("Expecting ',' delimiter")
+                    self._pos += 1
+                    frame.state = _KEY
+                    continue
+
+                if state in (_FIRST, _KEY):
+                    if char != '"':
+                        self._error("Expecting property name enclosed in double quotes")
+                    frame.key   = self._decode_value()
+                    frame.state = _COLON
+                    if shape[len(self._stack) - 1][1] is not None:
+                        frame.keys_seen.append(frame.key)
+                    continue
+
+                if state == _COLON:
+                    if char != ":":
+                        self._error("Expecting ':' delimiter")
+                    self._pos += 1
+                    frame.state = _VALUE
+                    continue
+
+                member = frame.key
+
+            depth   = len(self._stack) - 1
+            wanted  = shape[depth][1]
+            matches = wanted is None or member == wanted
+
+            if not matches:
+                self._decode_value()
+            elif depth == last:
+                profiles.append(self._decode_value())
+            else:
+                self._open(depth + 1)
+                frame.found = True
+
+            frame.state = _COMMA
+
+
+def iter_export_profiles(fp, shape: tuple, chunk_size: int = READ_CHUNK_SIZE,
+                         codec: JSONCodec = DEFAULT_CODEC):
+    """
+    Lazily yield raw profiles from a text file object holding a bot export.
+
+    Only the current read chunk and the profile being decoded are held in
+    memory, so peak memory stays flat regardless of the export size.
+    """
+    decoder = ProfileStreamDecoder(shape, codec)
+
+    while True:
+        chunk = fp.read(chunk_size)
+        if not chunk:
+            break
+        yield from decoder.feed(chunk)
+
+    yield from decoder.close()
+
+def read_first_profile(fp, shape: tuple, limit: int = SNIFF_SIZE):
+    """
+    Decode only the first profile of an export, following its shape, or for
+    JSON_LINES the first line (the header). At most limit characters are
+    read, and none of the containers holding the profile are decoded, so the
+    cost does not grow with the export.
+
+    Used to sniff what kind of export a file holds without reading it all.
+
+    Returns:
+        The first profile (or line), or None if there is none within the
+        limit, the document has another shape, or the JSON is malformed.
+    """
+    if shape[0][0] == JSON_LINES:
+        try:
+            return json.loads(fp.readline(limit))
+        except ValueError:
+            return None
+
+    decoder = ProfileStreamDecoder(shape)
+
+    try:
+        text     = fp.read(limit)
+        profiles = decoder.feed(text)
+
+        if not profiles and len(text) < limit:
+            profiles = decoder.close()
+
+    except ValueError:
+        return None
+
+    return profiles[0] if profiles else None
+
+def iter_document_profiles(document, shape: tuple, depth: int = 0):
+    """
+    Yield the raw profiles of an export that is already loaded (what
+    json.load returns for it), following the same export shape as the
+    streaming decoder.
+
+    Raises:
+        ValueError: if the document does not match the export shape.
+    """
+    kind, key, context = shape[depth]
+    sequence           = kind in (JSON_ARRAY, JSON_LINES)
+
+    if not isinstance(document, list if sequence else dict):
+        raise ValueError(f"Expecting JSON {kind} for export profiles")
+
+    if sequence:
+        values = document
+    elif key is None:
+        values = document.values()
+    elif key in document:
+        values = [document[key]]
+    else:
+        raise ValueError(
+            f"Missing required field '{key}' in {context}. "
+            f"Available keys: {list(document)}"
+        )
+
+    if depth == len(shape) - 1:
+        yield from values
+        return
+
+    for value in values:
+        yield from iter_document_profiles(value, shape, depth + 1)
+
+def iter_json_lines(fp, chunk_size: int = READ_CHUNK_SIZE, codec: JSONCodec = DEFAULT_CODEC):
+    """
+    Lazily yield the value on every line of a newline-delimited JSON (JSON
+    lines) text file object, skipping blank lines.
+
+    Raises:
+        ValueError: naming the line, if a line is not valid JSON.
+    """
+    loads   = codec.loads
+    pending = ""
+    number  = 0
+
+    while True:
+        chunk = fp.read(chunk_size)
+        lines = (pending + chunk).split("\n")
+
+        pending = lines.pop() if chunk else ""
+
+        for line in lines:
+            number += 1
+
+            if not line or line.isspace():
+                continue
+
+            try:
+                value = loads(line)
+            except ValueError as e:
+                raise ValueError(f"Invalid JSON on line {number}: {e}")
+
+            yield value
+
+        if not chunk:
+            return
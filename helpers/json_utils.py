@@ -1,3 +1,5 @@
+from helpers.json_codec import DEFAULT_CODEC, JSON_INDENT, JSONCodec
+
 def require_key(data: dict, key: str, context: str):
     """
     Retrieve a required key from a dictionary or raise a descriptive error.
@@ -22,3 +24,99 @@ def require_key(data: dict, key: str, context: str):
             f"Missing required field '{key}' in {context}. "
             f"Available keys: {list(data.keys())}"
         )
+
+class EncodedJSON(str):
+    """
+    JSON text that has already been serialized (e.g. by a worker process).
+
+    The streaming writers write these as-is instead of serializing again.
+    For write_json_array this is one element, for write_json_object it is a
+    whole `"key": value` member. It must have been encoded in the layout of
+    the codec it is written with.
+    """
+
+def encode_json(value, codec: JSONCodec = DEFAULT_CODEC) -> EncodedJSON:
+    """
+    Serialize a value for write_json_array ahead of time.
+    """
+    return EncodedJSON(codec.dumps(value))
+
+def encode_json_member(key: str, value, codec: JSONCodec = DEFAULT_CODEC) -> EncodedJSON:
+    """
+    Serialize a `"key": value` member for write_json_object ahead of time.
+    """
+    return EncodedJSON(codec.dumps(key) + codec.key_separator + codec.dumps(value))
+
+def _nested_dumps(value, level: int, codec: JSONCodec) -> str:
+    """
+    Serialize a value as it appears nested `level` containers deep, e.g.
+    exactly as json.dump(..., indent=2) would with the indented stdlib
+    codec.
+    """
+    text = value if isinstance(value, EncodedJSON) else codec.dumps(value)
+
+    if level and not codec.compact:
+        text = text.replace("\n", "\n" + " " * (JSON_INDENT * level))
+
+    return text
+
+def _layout(level: int, codec: JSONCodec) -> tuple[str, str]:
+    """
+    What goes before every element of a container nested `level` deep, and
+    before its closing bracket.
+    """
+    if codec.compact:
+        return "", ""
+
+    return "\n" + " " * (JSON_INDENT * (level + 1)), "\n" + " " * (JSON_INDENT * level)
+
+def write_json_array(fp, items, level: int = 0, codec: JSONCodec = DEFAULT_CODEC) -> int:
+    """
+    Stream an iterable as a JSON array, one element at a time.
+
+    With the indented stdlib codec the output is byte-identical to
+    json.dump(list(items), fp, indent=2) for an array nested `level`
+    containers deep, without ever holding the whole list in memory.
+
+    Returns:
+        The number of elements written.
+    """
+    separator, closing = _layout(level, codec)
+    count = 0
+
+    for item in items:
+        fp.write(("[" if not count else ",") + separator + _nested_dumps(item, level + 1, codec))
+        count += 1
+
+    fp.write((closing + "]") if count else "[]")
+
+    return count
+
+def write_json_object(fp, members, level: int = 0, codec: JSONCodec = DEFAULT_CODEC) -> int:
+    """
+    Stream an iterable of (key, value) pairs (or EncodedJSON members) as a
+    JSON object.
+
+    With the indented stdlib codec the output is byte-identical to
+    json.dump(dict(members), fp, indent=2) for an object nested `level`
+    containers deep.
+
+    Returns:
+        The number of members written.
+    """
+    separator, closing = _layout(level, codec)
+    count = 0
+
+    for member in members:
+        if isinstance(member, EncodedJSON):
+            text = _nested_dumps(member, level + 1, codec)
+        else:
+            key, value = member
+            text = codec.dumps(key) + codec.key_separator + _nested_dumps(value, level + 1, codec)
+
+        fp.write(("{" if not count else ",") + separator + text)
+        count += 1
+
+    fp.write((closing + "}") if count else "{}")
+
+    return count
@@ -0,0 +1,78 @@
+"""
+Registry entries whose functions are imported on first use.
+
+The bot registry lists the parser, emitter and transcoder functions of every
+bot, but one conversion only needs one source and a target or two. Importing
+every bot module up front (and with them the geography tables, the canonical
+models and the compiled field specs) would make every start-up pay for all
+of them. Instead an entry names its functions as "module:attribute" paths:
+
+    PARSERS = {
+        "stellar": LazyEntry({
+            "file": "stellarprofiles.json",
+            "reader": lazy("parsers.stellar_parser:iter_stellar_profiles"),
+        }),
+    }
+
+Plain values (file names, signatures) are available right away. A lazy value
+is imported the first time it is looked up (entry[key], entry.get(key),
+entry.values(), entry.items()) and replaces its reference in the entry, so
+later lookups cost a plain dict lookup.
+"""
+
+import importlib
+
+
+class LazyAttribute:
+    """
+    Reference to an attribute of a module that has not been imported yet.
+    """
+
+    __slots__ = ("path",)
+
+    def __init__(self, path: str):
+        module_name, _, attribute = path.partition(":")
+
+        if not module_name or not attribute:
+            raise ValueError(f"Lazy registry paths look like 'package.module:attribute', got '{path}'")
+
+        self.path = path
+
+    def resolve(self):
+        module_name, _, attribute = self.path.partition(":")
+
+        return getattr(importlib.import_module(module_name), attribute)
+
+    def __repr__(self) -> str:
+        return f"lazy({self.path!r})"
+
+def lazy(path: str) -> LazyAttribute:
+    """
+    Name a registry value by its "module:attribute" path.
+    """
+    return LazyAttribute(path)
+
+
+class LazyEntry(dict):
+    """
+    A registry entry that imports its lazy(...) values when they are looked
+    up.
+    """
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+
+        if isinstance(value, LazyAttribute):
+            value = value.resolve()
+            super().__setitem__(key, value)
+
+        return value
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def values(self) -> list:
+        return [self[key] for key in self]
+
+    def items(self) -> list:
+        return [(key, self[key]) for key in self]
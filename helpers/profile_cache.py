@@ -0,0 +1,264 @@
+"""
+On-disk cache of converted profiles, shared across runs.
+
+Exports are mostly re-converted unchanged from one day to the next, so the
+encoded output of every converted profile is kept in a SQLite database,
+keyed by a hash of the raw source profile (and its source bot) and the
+target bot. A later run only parses and emits the profiles it has not seen.
+
+- Values are the target's encoded JSON (what the writers write), so a hit
+  skips parsing, emitting and serializing.
+- Ids the emitter mints per profile (EMITTERS[bot]["minted_keys"]) are
+  stored as a placeholder and freshly minted on every hit, so a cached
+  profile never reuses an id from an earlier run or a duplicate profile.
+- The cache is tied to a hash of the converter code (code_version()); any
+  change to a parser, emitter, spec or helper empties it.
+- The database is kept under max_bytes: after a conversion the entries
+  stored longest ago are evicted. Hits are not written back (that would
+  cost a write per cached profile), so an evicted profile that is still in
+  use is simply converted and stored again by the next run.
+
+The cache object pickles without its connection, so worker processes open
+their own.
+"""
+
+import hashlib
+import marshal
+import sqlite3
+import sys
+import uuid
+from pathlib import Path
+
+from helpers.json_utils import EncodedJSON
+
+PROFILE_CACHE_FILE = ".profile_cache.sqlite"
+
+DEFAULT_PROFILE_CACHE_BYTES = 256 * 1024 * 1024
+
+# eviction frees space down to this share of max_bytes, so it does not run
+# again after every conversion
+EVICTION_LOW_WATER = 0.9
+
+# marshal format without object references, so equal profiles always
+# serialize (and hash) the same
+_KEY_MARSHAL_VERSION = 2
+
+# packages whose code determines what a profile converts to
+VERSIONED_PACKAGES = ["constants", "emitters", "helpers", "models", "parsers", "specs", "transcoders"]
+
+# a NUL character is always escaped inside JSON text, so the placeholder can
+# never collide with profile data
+MINTED_PLACEHOLDER = "\x00{}\x00"
+
+# SQLite's default limit on the number of bound parameters
+_MAX_QUERY_KEYS = 900
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    target TEXT NOT NULL,
+    key    BLOB NOT NULL,
+    value  TEXT NOT NULL,
+    PRIMARY KEY (target, key)
+);
+"""
+
+
+def code_version(root: Path | None = None) -> str:
+    """
+    Hash of the converter source code under root (the project directory)
+    and the Python version, which decides how JSON is serialized.
+    """
+    root   = Path(root) if root is not None else Path(__file__).resolve().parent.parent
+    digest = hashlib.blake2b(digest_size=16)
+
+    digest.update(f"{sys.version_info.major}.{sys.version_info.minor}".encode())
+
+    for package in VERSIONED_PACKAGES:
+        for source_file in sorted((root / package).rglob("*.py")):
+            digest.update(source_file.relative_to(root).as_posix().encode())
+            digest.update(source_file.read_bytes())
+
+    return digest.hexdigest()
+
+
+class ProfileCache:
+    """
+    Cache of encoded target profiles, keyed by raw source profile.
+
+    Args:
+        path: SQLite database file, created if missing.
+        max_bytes: bound on the database size, enforced by evict().
+        version: code version the entries belong to, code_version() by
+            default.
+    """
+
+    def __init__(self, path, max_bytes: int = DEFAULT_PROFILE_CACHE_BYTES, version: str | None = None):
+        if max_bytes < 1:
+            raise ValueError("Profile cache size must be at least 1 byte")
+
+        self.path        = Path(path)
+        self.max_bytes   = max_bytes
+        self.version     = version or code_version()
+        self.hits        = 0
+        self.misses      = 0
+        self._connection = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_connection"] = None
+        return state
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+
+            with connection:
+                connection.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+                row = connection.execute("SELECT value FROM meta WHERE name = 'version'").fetchone()
+
+                if row is None or row[0] != self.version:
+                    # written by other converter code (this module included, so
+                    # possibly another schema), none of it can be reused
+                    connection.execute("DROP TABLE IF EXISTS profiles")
+                    connection.execute(
+                        "INSERT OR REPLACE INTO meta (name, value) VALUES ('version', ?)", (self.version,)
+                    )
+
+                connection.executescript(_SCHEMA)
+
+            self._connection = connection
+
+        return self._connection
+
+    @staticmethod
+    def keys(from_bot: str, raw_profiles: list) -> list[bytes]:
+        """
+        Content hash of every raw profile and its source bot. A profile
+        that only differs in key order hashes differently, which just
+        costs a miss.
+        """
+        prefix = from_bot.encode() + b"\x00"
+        dumps  = marshal.dumps
+        sha256 = hashlib.sha256
+
+        return [
+            sha256(prefix + dumps(raw_profile, _KEY_MARSHAL_VERSION)).digest()[:16]
+            for raw_profile in raw_profiles
+        ]
+
+    def get_many(self, to_bot: str, keys: list[bytes]) -> dict:
+        """
+        Stored values for the keys that are cached, by key.
+        """
+        found      = {}
+        connection = self.connection
+
+        for start in range(0, len(keys), _MAX_QUERY_KEYS):
+            batch        = keys[start:start + _MAX_QUERY_KEYS]
+            placeholders = ", ".join("?" * len(batch))
+
+            found.update(connection.execute(
+                f"SELECT key, value FROM profiles WHERE target = ? AND key IN ({placeholders})",
+                (to_bot, *batch)
+            ))
+
+        self.hits   += len(found)
+        self.misses += len(set(keys)) - len(found)
+
+        return found
+
+    def put_many(self, to_bot: str, entries: dict):
+        """
+        Store {key: stored value} for one target.
+        """
+        if not entries:
+            return
+
+        with self.connection as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO profiles (target, key, value) VALUES (?, ?, ?)",
+                [(to_bot, key, value) for key, value in entries.items()]
+            )
+
+    @staticmethod
+    def stored_value(encoded: str, output_profile: dict, minted_keys: tuple) -> str:
+        """
+        The value stored for an emitted profile: its encoded JSON with the
+        minted ids replaced by placeholders.
+        """
+        for key in minted_keys:
+            encoded = encoded.replace(output_profile[key], MINTED_PLACEHOLDER.format(key))
+
+        return encoded
+
+    @staticmethod
+    def restored_profile(value: str, minted_keys: tuple) -> EncodedJSON:
+        """
+        Encoded JSON for a cache hit, with freshly minted ids.
+        """
+        for key in minted_keys:
+            value = value.replace(MINTED_PLACEHOLDER.format(key), str(uuid.uuid4()))
+
+        return EncodedJSON(value)
+
+    def size(self) -> int:
+        """
+        Bytes of the database in use (freed pages excluded).
+        """
+        connection = self.connection
+        pages      = connection.execute("PRAGMA page_count").fetchone()[0]
+        free_pages = connection.execute("PRAGMA freelist_count").fetchone()[0]
+        page_size  = connection.execute("PRAGMA page_size").fetchone()[0]
+
+        return (pages - free_pages) * page_size
+
+    def evict(self) -> int:
+        """
+        Drop the entries stored longest ago while the database exceeds
+        max_bytes. Freed pages are reused by later entries.
+
+        Returns:
+            int: number of entries evicted
+        """
+        size = self.size()
+
+        if size <= self.max_bytes:
+            return 0
+
+        with self.connection as connection:
+            count   = connection.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+            excess  = size - self.max_bytes * EVICTION_LOW_WATER
+            evicted = min(count, int(excess / (size / max(count, 1))) + 1)
+
+            # rowids grow with every insert (and re-store), oldest first
+            connection.execute(
+                "DELETE FROM profiles WHERE rowid IN (SELECT rowid FROM profiles ORDER BY rowid LIMIT ?)",
+                (evicted,)
+            )
+
+        return evicted
+
+    def clear(self):
+        with self.connection as connection:
+            connection.execute("DELETE FROM profiles")
+
+        self.hits   = 0
+        self.misses = 0
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,130 @@
+"""
+Per-profile error handling for conversions (--on-error).
+
+By default the first profile that fails to convert aborts the whole run. A
+Quarantine object handed to convert()/convert_file() switches that to
+keep-going: failing profiles are left out of the output and recorded
+instead, so one pass finds every bad record.
+
+- skip:    failures are counted and summarized in an error histogram.
+- collect: additionally, every failing raw profile is kept together with
+           its error and input index, and written to a quarantine JSON file.
+
+Histogram categories drop the variable part of an error message (the
+offending value, the available keys), so e.g. every unknown country lands
+in one "Unsupported country" bucket and card numbers never show up in it.
+"""
+
+import json
+from collections import Counter
+from pathlib import Path
+
+ON_ERROR_FAIL    = "fail"
+ON_ERROR_SKIP    = "skip"
+ON_ERROR_COLLECT = "collect"
+
+ON_ERROR_MODES = [ON_ERROR_FAIL, ON_ERROR_SKIP, ON_ERROR_COLLECT]
+
+QUARANTINE_FILE = "quarantine.json"
+
+
+def error_category(error: Exception) -> str:
+    """
+    The histogram bucket of an error: its type and the message up to the
+    first detail, e.g. "ValueError: Unsupported country".
+    """
+    message = str(error).split(". ", 1)[0].split(": ", 1)[0]
+
+    return f"{type(error).__name__}: {message}"
+
+def profile_failure(index: int, error: Exception, raw_profile) -> dict:
+    """
+    Record of one profile that could not be converted. Only built from
+    plain values, so it can be sent back from a worker process.
+    """
+    return {
+        "index": index,
+        "error": f"{type(error).__name__}: {error}",
+        "category": error_category(error),
+        "profile": raw_profile,
+    }
+
+
+class Quarantine:
+    """
+    Collects the profiles that failed during one conversion.
+
+    Args:
+        mode: "skip" or "collect" (see ON_ERROR_MODES).
+    """
+
+    def __init__(self, mode: str = ON_ERROR_SKIP):
+        if mode not in (ON_ERROR_SKIP, ON_ERROR_COLLECT):
+            raise ValueError(
+                f"Unsupported error mode for a quarantine: {mode}. "
+                f"Supported modes: {[ON_ERROR_SKIP, ON_ERROR_COLLECT]}"
+            )
+
+        self.mode      = mode
+        self.histogram = Counter()
+        self.failures  = []
+
+    @property
+    def failed(self) -> int:
+        return sum(self.histogram.values())
+
+    def add(self, failures: list[dict]):
+        """
+        Record the failures of one converted chunk.
+        """
+        for failure in failures:
+            self.histogram[failure["category"]] += 1
+
+        if self.mode == ON_ERROR_COLLECT:
+            self.failures.extend(failures)
+
+    def as_dict(self) -> dict:
+        return {
+            "failed": self.failed,
+            "errors": dict(self.histogram.most_common()),
+        }
+
+    def summary(self) -> str:
+        """
+        Human readable error histogram, most frequent error first.
+        """
+        lines = [f"{self.failed} profiles could not be converted:"]
+
+        for category, count in self.histogram.most_common():
+            lines.append(f"  {count:>8}  {category}")
+
+        return "\n".join(lines)
+
+    def write_json(self, path, source: str | None = None) -> int:
+        """
+        Write the collected failures, in input order, to a quarantine file:
+
+            {"source": ..., "failed": N, "errors": {category: count},
+             "profiles": [{"index": ..., "error": ..., "profile": {...}}]}
+
+        The raw profiles are written as they were read, so the file holds
+        the same personal and payment details as the input.
+
+        Returns:
+            int: number of quarantined profiles written
+        """
+        failures = sorted(self.failures, key=lambda failure: failure["index"])
+
+        quarantine = {
+            "source": source,
+            **self.as_dict(),
+            "profiles": [
+                {"index": failure["index"], "error": failure["error"], "profile": failure["profile"]}
+                for failure in failures
+            ],
+        }
+
+        with Path(path).open("w", encoding="utf-8") as f:
+            json.dump(quarantine, f, indent=2)
+
+        return len(failures)
@@ -1,8 +1,20 @@
 from dataclasses import dataclass
 
 # Middle ground object created to allow addition bot extensions to be included if needed
+#
+# Millions of these can be alive during a conversion, so the models are slotted
+# (no per-instance __dict__). Address and Card are also frozen: they are plain
+# values, which lets identical addresses be shared between profiles safely.
+# Low-cardinality string fields (country, state, card type) are interned by the
+# parsers so every profile references the same string objects.
+#
+# to_tuple/from_tuple convert the models to and from plain nested tuples of
+# their fields, in declaration order, which is how the canonical NDJSON
+# format stores them (see specs/canonical.py). They read and pass the fields
+# directly, which is many times faster than dataclasses.asdict/astuple:
+# those deep-copy every value through a generic recursive walk.
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Address:
     """ 
     Canonical address model.
@@ -22,7 +34,17 @@ class Address:
     city: str
     zip_code: str
 
-@dataclass
+    def to_tuple(self) -> tuple:
+        return (
+            self.first_name, self.last_name, self.address_line_1, self.address_line_2, self.country_name,
+            self.country_code, self.state_name, self.state_code, self.city, self.zip_code
+        )
+
+    @classmethod
+    def from_tuple(cls, values) -> "Address":
+        return cls(*values)
+
+@dataclass(slots=True, frozen=True)
 class Card:
     """ 
     Canonical card model.
@@ -39,7 +61,14 @@ class Card:
     exp_year: str
     cvv: str
 
-@dataclass
+    def to_tuple(self) -> tuple:
+        return (self.holder, self.card_type, self.number, self.exp_month, self.exp_year, self.cvv)
+
+    @classmethod
+    def from_tuple(cls, values) -> "Card":
+        return cls(*values)
+
+@dataclass(slots=True)
 class Profile:
     """ 
     Canonical profile model.
@@ -58,3 +87,30 @@ class Profile:
     card: Card
 
     one_checkout: bool = False
+
+    def to_tuple(self) -> tuple:
+        """
+        The profile as nested tuples. billing_address is None when it is the
+        shipping address itself (the parsers share one Address between
+        them when they are identical), which from_tuple restores.
+        """
+        shipping = self.shipping_address
+        billing  = self.billing_address
+
+        return (
+            self.profile_name, self.email, self.phone_number, shipping.to_tuple(),
+            None if billing is shipping else billing.to_tuple(),
+            self.billing_same_as_ship, self.card.to_tuple(), self.one_checkout
+        )
+
+    @classmethod
+    def from_tuple(cls, values) -> "Profile":
+        profile_name, email, phone_number, shipping, billing, billing_same_as_ship, card, one_checkout = values
+
+        shipping_address = Address(*shipping)
+
+        return cls(
+            profile_name, email, phone_number, shipping_address,
+            shipping_address if billing is None else Address(*billing),
+            billing_same_as_ship, Card(*card), one_checkout
+        )
@@ -0,0 +1,72 @@
+"""
+Canonical profile parser.
+
+This module reads canonical NDJSON files (see specs/canonical.py), written
+by emitters/canonical_emitter.py, back into canonical Profile objects.
+
+A line already holds every resolved field, so no geography or card type
+lookups run: each raw profile is a list of fields that Profile.from_tuple
+turns straight back into the models.
+"""
+
+from models.canonical import Profile
+from helpers.json_codec import DEFAULT_CODEC, JSONCodec
+from helpers.json_stream import JSON_LINES, iter_json_lines
+from specs.canonical import CANONICAL_FORMAT_VERSION, CANONICAL_HEADER_KEY
+
+# canonical files hold one profile per line, after a header line
+CANONICAL_EXPORT_SHAPE = (
+    (JSON_LINES, None, "canonical profile lines"),
+)
+
+def check_canonical_header(header) -> None:
+    """
+    Check the header line of a canonical file.
+
+    Raises:
+        ValueError: if it is missing or names an unsupported format version.
+    """
+    if not isinstance(header, dict) or not isinstance(header.get(CANONICAL_HEADER_KEY), dict):
+        raise ValueError(
+            f"Canonical profiles must start with a '{CANONICAL_HEADER_KEY}' header line"
+        )
+
+    version = header[CANONICAL_HEADER_KEY].get("format_version")
+
+    if version != CANONICAL_FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported canonical format version: {version}. "
+            f"Supported version: {CANONICAL_FORMAT_VERSION}"
+        )
+
+def decode_canonical_profile(raw_profile) -> Profile:
+    """
+    Convert a single canonical line (or a Profile, returned as is) to a
+    canonical Profile.
+    """
+    if isinstance(raw_profile, Profile):
+        return raw_profile
+
+    try:
+        return Profile.from_tuple(raw_profile)
+
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Malformed canonical profile (format version {CANONICAL_FORMAT_VERSION}): {e}")
+
+def decode_canonical_profiles(raw_profiles: list) -> list[Profile]:
+    """
+    Iterate over the input list of canonical lines.
+    """
+
+    return [decode_canonical_profile(p) for p in raw_profiles]
+
+def iter_canonical_profiles(fp, codec: JSONCodec = DEFAULT_CODEC):
+    """
+    Lazily yield raw canonical profiles from a canonical file object,
+    after checking its header line.
+    """
+    lines = iter_json_lines(fp, codec=codec)
+
+    check_canonical_header(next(lines, None))
+
+    yield from lines
@@ -55,74 +55,40 @@ Cybersole JSON format (as of December 26, 2025):
 This module maps Cybersole-specific fields to the canonical
 """
 
-from models.canonical import Profile, Card, Address
+from models.canonical import Profile, Address
 from helpers.json_utils import require_key
+from helpers.field_spec import compile_parser
+from helpers.json_codec import DEFAULT_CODEC, JSONCodec
+from helpers.json_stream import JSON_ARRAY, JSON_OBJECT, iter_export_profiles
+from helpers.address_cache import AddressCache
+from specs.cybersole import CYBERSOLE_ADDRESS_SPEC, CYBERSOLE_CARD_SPEC, CYBERSOLE_PROFILE_SPEC
 
-import constants.countries_map as countries_helper
-import helpers.card_utils as card_util
+# Cybersole exports are a list of groups, each holding its own profile list
+CYBERSOLE_EXPORT_SHAPE = (
+    (JSON_ARRAY, None, "cybersole group list"),
+    (JSON_OBJECT, "profiles", "cybersole group profiles"),
+    (JSON_ARRAY, None, "cybersole profile list"),
+)
 
-def map_cybersole_card(card_dict: dict, profile_holder_name: str) -> Card:
+# identical raw addresses resolve to one shared Address
+_ADDRESS_CACHE = AddressCache("cybersole_parser")
 
-    card_number   = require_key(card_dict, "number", "cybersole card number")
-    card_type     = card_util.determine_card_type(card_number)
-    exp_year_full = require_key(card_dict, "expYear", "cybersole card expiry year")
+# field mappings live in specs/cybersole.py and are compiled once, here
 
-    return Card(
-        holder    = profile_holder_name,
-        card_type = card_type,
-        number    = card_number,
-        exp_month = require_key(card_dict, "expMonth", "cybersole expiry month"),
-        exp_year  = exp_year_full[-2:], # passed in as 4 digits, only need last 2
-        cvv       = require_key(card_dict, "cvv", "cybersole card cvv"),
-    )
+build_cybersole_address = compile_parser(CYBERSOLE_ADDRESS_SPEC, "build_cybersole_address", __name__)
 
-def map_cybersole_address(shipping_dic: dict) -> Address:
-
-    country_name = require_key(shipping_dic, "country", "cybersole shipping country name")
-    country_code = countries_helper.COUNTRY_NAME_TO_CODE_MAP[country_name]
-
-    state_or_province_name = require_key(shipping_dic, "state", "cybersole shipping state name")
-    state_or_province_code = countries_helper.province_or_state_code_finder(country_code, state_or_province_name)
-    
-    return Address(
-        first_name     = require_key(shipping_dic, "firstName", "cybersole shipping first name"),
-        last_name      = require_key(shipping_dic, "lastName", "cybersole shipping last name"),
-        address_line_1 = require_key(shipping_dic, "address1", "cybersole shipping address 1"),
-        address_line_2 = shipping_dic.get("address2", ""),
-        country_name   = country_name,
-        country_code   = country_code,
-        state_name     = state_or_province_name,
-        state_code     = state_or_province_code,
-        city           = require_key(shipping_dic, "city", "cybersole shipping city"),
-        zip_code       = require_key(shipping_dic, "zip", "cybersole shipping zipcode"),
-    )
-
-def cybersole_profile_to_canonical(input_profile: dict) -> Profile:
-    """
-    Convert a single cybersole profile to a canonical Profile.
-    """
-    profile_holder_name = require_key(input_profile, "name", "cybersole profile name")
-
-    shipping_input      = require_key(input_profile, "delivery", "cybersole shipping key")
-    billing_input       = require_key(input_profile, "billing", "cybersole billing key")
-    card_input          = require_key(input_profile, "card", "cybersole payment key")
-    billing_different   = require_key(input_profile, "billingDifferent", "cybersole same ship key")
-
-    shipping = map_cybersole_address(shipping_input)
-    billing  = shipping if not billing_different else map_cybersole_address(billing_input)
-    card     = map_cybersole_card(card_input, profile_holder_name)
+# map_cybersole_card(card_dict, profile_holder_name)
+map_cybersole_card = compile_parser(CYBERSOLE_CARD_SPEC, "map_cybersole_card", __name__)
 
-    return Profile(
-        profile_name         = profile_holder_name,
-        email                = require_key(input_profile, "email", "cybersole profile email"),
-        phone_number         = require_key(input_profile, "phone", "cybersole profile phone"),
+def map_cybersole_address(shipping_dic: dict) -> Address:
 
-        shipping_address     = shipping,
-        billing_address      = billing,
-        billing_same_as_ship = not billing_different, # false value here is true in canonical
+    return _ADDRESS_CACHE.get_or_create_from_dict(shipping_dic, build_cybersole_address)
 
-        card                 = card
-    )
+cybersole_profile_to_canonical = compile_parser(
+    CYBERSOLE_PROFILE_SPEC, "cybersole_profile_to_canonical", __name__,
+    nested = {"address": map_cybersole_address, "card": map_cybersole_card},
+    doc    = "Convert a single cybersole profile to a canonical Profile.",
+)
 
 def map_cybersole_to_canonical(cybersole_profile_json: list[dict]) -> list[Profile]:
     """
@@ -134,4 +100,12 @@ def map_cybersole_to_canonical(cybersole_profile_json: list[dict]) -> list[Profi
         for profile in require_key(group, "profiles", "cybersole group profiles"):
             profiles.append(cybersole_profile_to_canonical(profile))
 
-    return profiles
\ No newline at end of file
+    return profiles
+
+def iter_cybersole_profiles(fp, codec: JSONCodec = DEFAULT_CODEC):
+    """
+    Lazily yield raw Cybersole profiles across every group of an export
+    file object.
+    """
+
+    return iter_export_profiles(fp, CYBERSOLE_EXPORT_SHAPE, codec=codec)
@@ -0,0 +1,240 @@
+"""
+Canonical snapshot parser.
+
+This module reads binary canonical snapshots (see specs/snapshot.py), written
+by emitters/snapshot_emitter.py. The file is memory-mapped and only its
+footer is read up front; a block's columns are decoded the first time one of
+its profiles is asked for, and Profiles are built one at a time from them:
+
+    with open_snapshot("canonical_profiles.snapshot") as snapshot:
+        profiles = snapshot[1000:2000]
+
+Conversions read a snapshot through iter_snapshot_profiles, whose raw
+profiles are in the Profile.to_tuple layout (see parsers/canonical_parser.py).
+"""
+
+import mmap
+import struct
+import sys
+from array import array
+from itertools import accumulate, islice
+from pathlib import Path
+
+from models.canonical import Profile
+from specs.snapshot import (
+    COLUMN_FLAG,
+    COLUMN_TEXT,
+    SNAPSHOT_COLUMNS,
+    SNAPSHOT_FORMAT_VERSION,
+    SNAPSHOT_MAGIC,
+    columns_to_profiles
+)
+
+_HEADER  = struct.Struct("<II")
+_TRAILER = struct.Struct("<QQ")
+_U32     = struct.Struct("<I")
+
+_HEADER_SIZE  = len(SNAPSHOT_MAGIC) + _HEADER.size
+_TRAILER_SIZE = _TRAILER.size + len(SNAPSHOT_MAGIC)
+
+def _unpacked(typecode: str, data) -> array:
+    """
+    Little-endian unsigned integers, "B" for u8, "I" for u32 and "Q" for
+    u64.
+    """
+    unpacked = array(typecode)
+    unpacked.frombytes(data)
+
+    if sys.byteorder == "big":
+        unpacked.byteswap()
+
+    return unpacked
+
+def _text_values(data, rows: int) -> list:
+    """
+    The values of a COLUMN_TEXT column; the text is decoded once and sliced
+    at the running total of the lengths.
+    """
+    start   = 1 + data[0] * rows
+    offsets = list(accumulate(_unpacked("B" if data[0] == 1 else "I", data[1:start]), initial=0))
+    count   = _U32.unpack_from(data, start)[0]
+    nulls   = _unpacked("I", data[start + 4:start + 4 + 4 * count])
+    text    = str(data[start + 4 + 4 * count:], "utf-8", "surrogatepass")
+    values  = [text[begin:end] for begin, end in zip(offsets, islice(offsets, 1, None))]
+
+    for row in nulls:
+        values[row] = None
+
+    return values
+
+def _decode_block(mm: mmap.mmap, offset: int, table: list) -> list[tuple]:
+    """
+    The profiles of the block at offset, in the Profile.to_tuple layout.
+    """
+    rows    = _U32.unpack_from(mm, offset)[0]
+    base    = offset + 4 * (len(SNAPSHOT_COLUMNS) + 2)
+    bounds  = _unpacked("I", mm[offset + 4:base])
+    columns = []
+
+    with memoryview(mm) as view:
+        for (_, kind), start, end in zip(SNAPSHOT_COLUMNS, bounds, islice(bounds, 1, None)):
+            data = view[base + start:base + end]
+
+            if kind == COLUMN_TEXT:
+                columns.append(_text_values(data, rows))
+            elif kind == COLUMN_FLAG:
+                columns.append(list(map(bool, data)))
+            else:
+                columns.append(list(map(table.__getitem__, _unpacked("I", data))))
+
+            data.release()
+
+    return columns_to_profiles(columns)
+
+
+class CanonicalSnapshot:
+    """
+    A read-only, lazily decoded view of a snapshot file.
+
+    len(snapshot) is the number of profiles, snapshot[i] builds one Profile
+    and snapshot[start:stop] a list of them; iterating yields every Profile
+    in order. Only the last block used is kept decoded.
+
+    Raises:
+        ValueError: if the file is not a snapshot, or is of another format
+            version.
+    """
+
+    def __init__(self, fp, name: str | None = None):
+        self.name = name or getattr(fp, "name", "snapshot")
+
+        try:
+            self._mm = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # mmap refuses empty files
+            raise ValueError(f"'{self.name}' is not a canonical snapshot")
+
+        try:
+            self._read_footer()
+        except Exception:
+            self._mm.close()
+            raise
+
+        self._block       = None
+        self._block_index = None
+
+    def _read_footer(self):
+        mm = self._mm
+
+        if (
+            len(mm) < _HEADER_SIZE + _TRAILER_SIZE
+            or mm[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC
+            or mm[-len(SNAPSHOT_MAGIC):] != SNAPSHOT_MAGIC
+        ):
+            raise ValueError(f"'{self.name}' is not a canonical snapshot")
+
+        version, self.block_size = _HEADER.unpack_from(mm, len(SNAPSHOT_MAGIC))
+
+        if version != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported snapshot format version: {version}. "
+                f"Supported version: {SNAPSHOT_FORMAT_VERSION}"
+            )
+
+        footer, self._count = _TRAILER.unpack_from(mm, len(mm) - _TRAILER_SIZE)
+
+        # every block but the last is full, so the block index, which ends
+        # the footer, has a known size
+        blocks = -(-self._count // self.block_size) if self.block_size else -1
+        index  = len(mm) - _TRAILER_SIZE - 8 * blocks - 4
+
+        if not _HEADER_SIZE <= footer <= index or _U32.unpack_from(mm, index)[0] != blocks:
+            raise ValueError(f"'{self.name}' is a damaged canonical snapshot")
+
+        self._offsets = _unpacked("Q", mm[index + 4:index + 4 + 8 * blocks])
+
+        # the string table: count, character offsets, text up to the index
+        entries = _U32.unpack_from(mm, footer)[0]
+        start   = footer + 8 + 4 * entries
+        offsets = _unpacked("I", mm[footer + 4:start])
+        text    = mm[start:index].decode("utf-8", "surrogatepass")
+
+        self._table = [None] + [text[offsets[i]:offsets[i + 1]] for i in range(1, entries)]
+
+    def close(self):
+        self._block = None
+        self._mm.close()
+
+    def __enter__(self) -> "CanonicalSnapshot":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _get_block(self, index: int) -> list[tuple]:
+        if index != self._block_index:
+            self._block       = _decode_block(self._mm, self._offsets[index], self._table)
+            self._block_index = index
+
+        return self._block
+
+    def row(self, index: int) -> tuple:
+        """
+        Profile index in the Profile.to_tuple layout.
+        """
+        if index < 0:
+            index += self._count
+
+        if not 0 <= index < self._count:
+            raise IndexError("snapshot index out of range")
+
+        block, row = divmod(index, self.block_size)
+
+        return self._get_block(block)[row]
+
+    def rows(self, start: int = 0, stop: int | None = None):
+        """
+        Lazily yield profiles start to stop in the Profile.to_tuple layout,
+        decoding one block at a time.
+        """
+        start, stop, _ = slice(start, stop).indices(self._count)
+
+        while start < stop:
+            block, row = divmod(start, self.block_size)
+
+            yield from self._get_block(block)[row:row + stop - start]
+
+            start = (block + 1) * self.block_size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._count)
+
+            if step == 1:
+                return [Profile.from_tuple(row) for row in self.rows(start, stop)]
+
+            return [Profile.from_tuple(self.row(i)) for i in range(start, stop, step)]
+
+        return Profile.from_tuple(self.row(index))
+
+    def __iter__(self):
+        return map(Profile.from_tuple, self.rows())
+
+
+def open_snapshot(path: Path) -> CanonicalSnapshot:
+    """
+    Open a snapshot file. Close it (or use it as a context manager) when
+    done.
+    """
+    with open(path, "rb") as f:
+        return CanonicalSnapshot(f, str(path))
+
+def iter_snapshot_profiles(fp, codec=None):
+    """
+    Lazily yield raw canonical profiles from a binary snapshot file object.
+    """
+    with CanonicalSnapshot(fp) as snapshot:
+        yield from snapshot.rows()
@@ -45,69 +45,36 @@ Stellar JSON format (as of December 21, 2025):
 This module maps Stellar-specific fields to the canonical
 """
 
-from models.canonical import Profile, Address, Card
-from helpers.json_utils import require_key
-import constants.countries_map as countries_helper
+from models.canonical import Profile, Address
+from helpers.field_spec import compile_parser
+from helpers.json_codec import DEFAULT_CODEC, JSONCodec
+from helpers.json_stream import JSON_ARRAY, iter_export_profiles
+from helpers.address_cache import AddressCache
+from specs.stellar import STELLAR_ADDRESS_SPEC, STELLAR_CARD_SPEC, STELLAR_PROFILE_SPEC
 
+# Stellar exports are a top-level list of profiles
+STELLAR_EXPORT_SHAPE = (
+    (JSON_ARRAY, None, "stellar profile list"),
+)
 
-def map_stellar_address(shipping_dic: dict) -> Address:
+# identical raw addresses resolve to one shared Address
+_ADDRESS_CACHE = AddressCache("stellar_parser")
 
-    country_code = require_key(shipping_dic, "country", "stellar shipping country") # e.g. "CA"
-    country_name = countries_helper.find_country_from_code(country_code)
-
-    state_or_province_code = require_key(shipping_dic, "state", "stellar shipping state/province")
-    state_or_province_name = countries_helper.province_or_state_name_finder(country_code, state_or_province_code)
-
-    return Address(
-        first_name     = require_key(shipping_dic, "firstName", "stellar shipping first name"),
-        last_name      = require_key(shipping_dic, "lastName", "stellar shipping last name"),
-        address_line_1 = require_key(shipping_dic, "address", "stellar shipping address"),
-        address_line_2 = shipping_dic.get("address2", ""),
-        country_name   = country_name,
-        country_code   = country_code,
-        state_name     = state_or_province_name,
-        state_code     = state_or_province_code,
-        city           = require_key(shipping_dic, "city", "stellar shipping city"),
-        zip_code       = require_key(shipping_dic, "zipcode", "stellar shipping zipcode"),
-    )
-
-def map_stellar_card(card_dic: dict) -> Card:
-    return Card(
-        holder    = require_key(card_dic, "cardName", "stellar card holder"),
-        card_type = require_key(card_dic, "cardType", "stellar card type").strip().lower(), # e.g "visa", "amex"
-        number    = require_key(card_dic, "cardNumber", "stellar card number"),
-        exp_month = require_key(card_dic, "cardMonth", "stellar card month"),
-        exp_year  = require_key(card_dic, "cardYear", "stellar card year"),
-        cvv       = require_key(card_dic, "cardCvv", "stellar card cvv") 
-    )
-
-def stellar_profile_to_canonical(input_profile: dict) -> Profile:
-    """
-    Convert a single Stellar profile to a canonical Profile.
-    """
+# field mappings live in specs/stellar.py and are compiled once, here
 
-    shipping_input = require_key(input_profile, "shipping", "stellar shipping key")
-    billing_input  = require_key(input_profile, "billing", "stellar billing key")
-    card_input     = require_key(input_profile, "payment", "stellar payment key")
-    same_billing   = require_key(input_profile, "billingAsShipping", "stellar same ship key")
+build_stellar_address = compile_parser(STELLAR_ADDRESS_SPEC, "build_stellar_address", __name__)
 
-    shipping = map_stellar_address(shipping_input)
-    billing  = shipping if same_billing else map_stellar_address(billing_input)
-    card     = map_stellar_card(card_input)
+map_stellar_card = compile_parser(STELLAR_CARD_SPEC, "map_stellar_card", __name__)
 
-    return Profile(
-        profile_name         = require_key(input_profile, "profileName", "stellar profile name"),
-        email                = require_key(input_profile, "email", "stellar profile email"),
-        phone_number         = require_key(input_profile, "phone", "stellar profile phone number"),
-
-        shipping_address     = shipping,
-        billing_address      = billing,
-        billing_same_as_ship = same_billing,
+def map_stellar_address(shipping_dic: dict) -> Address:
 
-        card                 = card,
+    return _ADDRESS_CACHE.get_or_create_from_dict(shipping_dic, build_stellar_address)
 
-        one_checkout         = input_profile.get("oneCheckoutPerProfile", False),
-    )
+stellar_profile_to_canonical = compile_parser(
+    STELLAR_PROFILE_SPEC, "stellar_profile_to_canonical", __name__,
+    nested = {"address": map_stellar_address, "card": map_stellar_card},
+    doc    = "Convert a single Stellar profile to a canonical Profile.",
+)
 
 def map_stellar_to_canonical(stellar_profiles: list[dict]) -> list[Profile]:
     """
@@ -115,3 +82,10 @@ def map_stellar_to_canonical(stellar_profiles: list[dict]) -> list[Profile]:
     """
     
     return [stellar_profile_to_canonical(p) for p in stellar_profiles]
+
+def iter_stellar_profiles(fp, codec: JSONCodec = DEFAULT_CODEC):
+    """
+    Lazily yield raw Stellar profiles from an export file object.
+    """
+
+    return iter_export_profiles(fp, STELLAR_EXPORT_SHAPE, codec=codec)
@@ -61,73 +61,36 @@ This module maps Valor-specific fields to the canonical
 Profile, Address, and Card models for downstream transformation.
 """
 
-from models.canonical import Profile, Address, Card
-from helpers.json_utils import require_key
-import constants.countries_map as countries_helper
+from models.canonical import Profile, Address
+from helpers.field_spec import compile_parser
+from helpers.json_codec import DEFAULT_CODEC, JSONCodec
+from helpers.json_stream import JSON_OBJECT, iter_export_profiles
+from helpers.address_cache import AddressCache
+from specs.valor import VALOR_ADDRESS_SPEC, VALOR_CARD_SPEC, VALOR_PROFILE_SPEC
 
-def map_valor_address(shipping_dic: dict) -> Address:
+# Valor exports are a top-level object of {profile_id: profile}
+VALOR_EXPORT_SHAPE = (
+    (JSON_OBJECT, None, "valor profile map"),
+)
 
-    country_code = require_key(shipping_dic, "countryCode", "valor shipping country")
-    country_name = countries_helper.find_country_from_code(country_code)
-
-    province_or_state_name = require_key(shipping_dic, "state", "valor shipping state/province")
-    province_or_state_code = countries_helper.province_or_state_code_finder(country_code, province_or_state_name)
-
-    return Address(
-        first_name     = require_key(shipping_dic, "firstName", "valor shipping first name"),
-        last_name      = require_key(shipping_dic, "lastName", "valor shipping last name"),
-        address_line_1 = require_key(shipping_dic, "addressLine1", "valor shipping address"),
-        address_line_2 = require_key(shipping_dic, "addressLine2", "valor shipping address2"),
-        country_name   = country_name,
-        country_code   = country_code,
-        state_name     = province_or_state_name,
-        state_code     = province_or_state_code,
-        city           = require_key(shipping_dic, "city", "valor shipping city"),
-        zip_code       = require_key(shipping_dic, "zipCode", "valor shipping zipcode"),
-    )
-
-def map_card_info(card_dic: dict) -> Card:
-
-    # Valor stores month/year: E.g 02/12
-    month, year = require_key(card_dic, "expiration", "valor card expiry").split("/")
-
-    return Card(
-        holder    = require_key(card_dic, "holder", "valor card holder name"),
-        card_type = require_key(card_dic, "type", "valor card type").strip().lower(),
-        number    = require_key(card_dic, "number", "valor card type").replace(" ", ""),
-        exp_month = month,
-        exp_year  = year,
-        cvv       = require_key(card_dic, "cvv", "valor card cvv") 
-    )
-
-
-def valor_profile_to_canonical(input_profile: dict) -> Profile:
-    """
-    Convert a single Valor profile to a canonical Profile.
-    """
+# identical raw addresses resolve to one shared Address
+_ADDRESS_CACHE = AddressCache("valor_parser")
 
-    shipping_input = require_key(input_profile, "shipping", "valor shipping key")
-    billing_input  = require_key(input_profile, "billing", "valor billing key")
-    card_input     = require_key(input_profile, "card", "valor card key")
-    same_billing   = require_key(input_profile, "billingSameAsShipping", "valor billingSameAsShipping key")
+# field mappings live in specs/valor.py and are compiled once, here
 
-    shipping = map_valor_address(shipping_input)
-    billing  = shipping if same_billing else map_valor_address(billing_input)
-    card     = map_card_info(card_input)
+build_valor_address = compile_parser(VALOR_ADDRESS_SPEC, "build_valor_address", __name__)
 
-    return Profile(
-        profile_name         = require_key(input_profile, "name", "valor profile name"),
-        email                = require_key(input_profile, "email", "valor profile email"),
-        phone_number         = require_key(input_profile, "phoneNumber", "valor profile phone number"),
+map_card_info = compile_parser(VALOR_CARD_SPEC, "map_card_info", __name__)
 
-        shipping_address     = shipping,
-        billing_address      = billing,
-        billing_same_as_ship = same_billing,
+def map_valor_address(shipping_dic: dict) -> Address:
 
-        card                 = card,
+    return _ADDRESS_CACHE.get_or_create_from_dict(shipping_dic, build_valor_address)
 
-        one_checkout         = require_key(input_profile, "oneCheckout", "valor profile onecheckout")
-    )
+valor_profile_to_canonical = compile_parser(
+    VALOR_PROFILE_SPEC, "valor_profile_to_canonical", __name__,
+    nested = {"address": map_valor_address, "card": map_card_info},
+    doc    = "Convert a single Valor profile to a canonical Profile.",
+)
 
 
 def map_valor_to_canonical(valor_profiles: dict) -> list[Profile]:
@@ -142,3 +105,10 @@ def map_valor_to_canonical(valor_profiles: dict) -> list[Profile]:
 
     return profiles
 
+def iter_valor_profiles(fp, codec: JSONCodec = DEFAULT_CODEC):
+    """
+    Lazily yield raw Valor profiles (the values of the id map) from an
+    export file object.
+    """
+
+    return iter_export_profiles(fp, VALOR_EXPORT_SHAPE, codec=codec)
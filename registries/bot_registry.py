@@ -4,45 +4,178 @@ Docstring for registries.bot_registry
 Holds the supported parsers and emitters this program supports.
 """
 
-from parsers.stellar_parser import stellar_profile_to_canonical
-from parsers.valor_parser import map_valor_to_canonical
-from parsers.cybersole_parser import map_cybersole_to_canonical
+from helpers.json_stream import JSON_ARRAY, JSON_LINES, JSON_OBJECT
+from helpers.lazy_registry import LazyEntry, lazy
 
-from emitters.stellar_emitter import canonical_profiles_to_stellar
-from emitters.valor_emitter import canonical_profiles_to_valor
-from emitters.cybersole_emitter import canonical_profiles_to_cybersole
+# "parser" converts a fully loaded export, "reader" lazily yields raw profiles
+# from an export file object (decoding with a helpers.json_codec.JSONCodec)
+# and "profile_parser" converts one raw profile.
+# "shape" is where the export keeps its profiles (see helpers.json_stream),
+# which lets helpers.json_split cut it into byte ranges for worker processes.
+# "signature" identifies an export: its top-level container and a key found
+# in its first profile (where "shape" leads), or in the first line of JSON
+# lines, or ("binary", the file's leading magic bytes) for a binary export.
+# "identity_key" is the raw profile key that identifies a profile across
+# re-exports (None when profiles are only identified by their position).
+# "binary" marks a binary export, which the reader is given as a binary file
+# object and which has no "shape".
+#
+# Functions are given as lazy("module:attribute") and only imported when a
+# conversion first looks them up (see helpers.lazy_registry), so listing the
+# supported bots imports none of their modules.
+#
+# "canonical" is not a bot but the canonical models persisted as NDJSON (see
+# specs/canonical.py): converting to it parses an export once, converting
+# from it emits those profiles for any bot without parsing them again.
+# "snapshot" holds the same profiles in a binary columnar file (see
+# specs/snapshot.py) that parsers.snapshot_parser reads lazily through mmap.
 
+CANONICAL = "canonical"
+SNAPSHOT  = "snapshot"
+
+# formats that hold canonical profiles rather than a bot's; "all" skips them
+CANONICAL_FORMATS = [CANONICAL, SNAPSHOT]
 
 PARSERS = {
-    "stellar": {
+    "stellar": LazyEntry({
         "file": "stellarprofiles.json",
-        "parser": lambda data: [
-            stellar_profile_to_canonical(p) for p in data
-        ]
-    },
-    "valor": {
+        "parser": lazy("parsers.stellar_parser:map_stellar_to_canonical"),
+        "reader": lazy("parsers.stellar_parser:iter_stellar_profiles"),
+        "shape": lazy("parsers.stellar_parser:STELLAR_EXPORT_SHAPE"),
+        "signature": (JSON_ARRAY, "profileName"),
+        "identity_key": "profileName",
+        "binary": False,
+        "profile_parser": lazy("parsers.stellar_parser:stellar_profile_to_canonical")
+    }),
+    "valor": LazyEntry({
         "file": "valorprofiles.json",
-        "parser": map_valor_to_canonical
-    },
-    "cybersole": {
+        "parser": lazy("parsers.valor_parser:map_valor_to_canonical"),
+        "reader": lazy("parsers.valor_parser:iter_valor_profiles"),
+        "shape": lazy("parsers.valor_parser:VALOR_EXPORT_SHAPE"),
+        "signature": (JSON_OBJECT, "billingSameAsShipping"),
+        "identity_key": "id",
+        "binary": False,
+        "profile_parser": lazy("parsers.valor_parser:valor_profile_to_canonical")
+    }),
+    "cybersole": LazyEntry({
         "file": "cybersoleprofiles.json",
-        "parser": map_cybersole_to_canonical
-    }
+        "parser": lazy("parsers.cybersole_parser:map_cybersole_to_canonical"),
+        "reader": lazy("parsers.cybersole_parser:iter_cybersole_profiles"),
+        "shape": lazy("parsers.cybersole_parser:CYBERSOLE_EXPORT_SHAPE"),
+        "signature": (JSON_ARRAY, "billingDifferent"),
+        "identity_key": "id",
+        "binary": False,
+        "profile_parser": lazy("parsers.cybersole_parser:cybersole_profile_to_canonical")
+    }),
+    CANONICAL: LazyEntry({
+        "file": "canonical_profiles.ndjson",
+        "parser": lazy("parsers.canonical_parser:decode_canonical_profiles"),
+        "reader": lazy("parsers.canonical_parser:iter_canonical_profiles"),
+        "shape": lazy("parsers.canonical_parser:CANONICAL_EXPORT_SHAPE"),
+        "signature": (JSON_LINES, "canonical_profiles"),
+        "identity_key": None,
+        "binary": False,
+        "profile_parser": lazy("parsers.canonical_parser:decode_canonical_profile")
+    }),
+    SNAPSHOT: LazyEntry({
+        "file": "canonical_profiles.snapshot",
+        "parser": lazy("parsers.canonical_parser:decode_canonical_profiles"),
+        "reader": lazy("parsers.snapshot_parser:iter_snapshot_profiles"),
+        "shape": None,
+        "signature": ("binary", b"PTSNAP\r\n"),
+        "identity_key": None,
+        "binary": True,
+        "profile_parser": lazy("parsers.canonical_parser:decode_canonical_profile")
+    })
 }
 
+# "emitter" converts a full list of canonical profiles, "profile_emitter"
+# converts one canonical profile, "encoder" pre-serializes one emitted profile
+# with a helpers.json_codec.JSONCodec (so worker processes can do it) and
+# "writer" streams emitted or encoded profiles to a file object inside the
+# bot's output envelope, in the codec's layout. "export" wraps a list of
+# emitted profiles in that envelope as Python objects instead, the document
+# json.load would return for the written file. "minted_keys" are the keys of
+# an emitted profile holding ids minted per conversion. "json_lines" marks an
+# output written as JSON lines rather than as one JSON document, and "binary"
+# one written to a binary file object (which can't be compressed).
+
 EMITTERS = {
-    "stellar": {
+    "stellar": LazyEntry({
         "file": "stellar_output.json",
-        "emitter": canonical_profiles_to_stellar
-    },
-    "valor": {
+        "emitter": lazy("emitters.stellar_emitter:canonical_profiles_to_stellar"),
+        "profile_emitter": lazy("emitters.stellar_emitter:canonical_profile_to_stellar"),
+        "encoder": lazy("helpers.json_utils:encode_json"),
+        "writer": lazy("emitters.stellar_emitter:write_stellar_profiles"),
+        "export": lazy("emitters.stellar_emitter:stellar_export"),
+        "minted_keys": (),
+        "json_lines": False,
+        "binary": False
+    }),
+    "valor": LazyEntry({
         "file": "valor_output.json",
-        "emitter": canonical_profiles_to_valor
-    },
-    "cybersole": {
+        "emitter": lazy("emitters.valor_emitter:canonical_profiles_to_valor"),
+        "profile_emitter": lazy("emitters.valor_emitter:emit_valor_profile"),
+        "encoder": lazy("emitters.valor_emitter:encode_valor_profile"),
+        "writer": lazy("emitters.valor_emitter:write_valor_profiles"),
+        "export": lazy("emitters.valor_emitter:valor_export"),
+        "minted_keys": ("id",),
+        "json_lines": False,
+        "binary": False
+    }),
+    "cybersole": LazyEntry({
         "file": "cybersole_output.json",
-        "emitter": canonical_profiles_to_cybersole
-    }
+        "emitter": lazy("emitters.cybersole_emitter:canonical_profiles_to_cybersole"),
+        "profile_emitter": lazy("emitters.cybersole_emitter:canonical_profile_to_cybersole"),
+        "encoder": lazy("helpers.json_utils:encode_json"),
+        "writer": lazy("emitters.cybersole_emitter:write_cybersole_profiles"),
+        "export": lazy("emitters.cybersole_emitter:cybersole_export"),
+        "minted_keys": ("id",),
+        "json_lines": False,
+        "binary": False
+    }),
+    CANONICAL: LazyEntry({
+        "file": "canonical_profiles.ndjson",
+        "emitter": lazy("emitters.canonical_emitter:emit_canonical_profiles"),
+        "profile_emitter": lazy("emitters.canonical_emitter:emit_canonical_profile"),
+        "encoder": lazy("emitters.canonical_emitter:encode_canonical_profile"),
+        "writer": lazy("emitters.canonical_emitter:write_canonical_profiles"),
+        "export": lazy("emitters.canonical_emitter:canonical_export"),
+        "minted_keys": (),
+        "json_lines": True,
+        "binary": False
+    }),
+    SNAPSHOT: LazyEntry({
+        "file": "canonical_profiles.snapshot",
+        "emitter": lazy("emitters.canonical_emitter:emit_canonical_profiles"),
+        "profile_emitter": lazy("emitters.canonical_emitter:emit_canonical_profile"),
+        "encoder": lazy("emitters.canonical_emitter:encode_canonical_profile"),
+        "writer": lazy("emitters.snapshot_emitter:write_snapshot_profiles"),
+        "export": lazy("emitters.canonical_emitter:canonical_export"),
+        "minted_keys": (),
+        "json_lines": False,
+        "binary": True
+    })
+}
+
+# TRANSCODERS[source][target] converts one raw source profile straight into
+# an emitted target profile, the same as the target's "profile_emitter"
+# applied to the source's "profile_parser" but without building canonical
+# models. Pairs missing here always go through the canonical models.
+
+TRANSCODERS = {
+    "stellar": LazyEntry({
+        "valor": lazy("transcoders.stellar_transcoder:stellar_profile_to_valor"),
+        "cybersole": lazy("transcoders.stellar_transcoder:stellar_profile_to_cybersole")
+    }),
+    "valor": LazyEntry({
+        "stellar": lazy("transcoders.valor_transcoder:valor_profile_to_stellar"),
+        "cybersole": lazy("transcoders.valor_transcoder:valor_profile_to_cybersole")
+    }),
+    "cybersole": LazyEntry({
+        "stellar": lazy("transcoders.cybersole_transcoder:cybersole_profile_to_stellar"),
+        "valor": lazy("transcoders.cybersole_transcoder:cybersole_profile_to_valor")
+    })
 }
 
 SUPPORTED_SOURCE_BOTS = list(PARSERS.keys())
@@ -0,0 +1,238 @@
+"""
+Batch conversion of many export files at once.
+
+Every input file is sniffed to detect which bot exported it (and whether it
+is gzip, bz2 or xz compressed), converted through the regular parsers and
+emitters, and written to <output dir>/<input name>_<target bot>.json (.ndjson
+or .snapshot for the canonical formats), with the compression's extension
+added when outputs are compressed (snapshots never are). Files are
+converted in a bounded pool of worker processes, so reading one file
+overlaps with parsing and emitting others.
+
+With on_error="skip" or "collect" bad profiles are left out instead of
+failing their file; the per-file report entry counts them by error, and
+"collect" also writes them to <output dir>/<input name>_quarantine.json.
+"""
+
+import glob
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from helpers.compression import (
+    COMPRESSIONS,
+    compressed_path,
+    open_text_input,
+    uncompressed_name,
+    validate_compression
+)
+from helpers.json_codec import DEFAULT_CODEC, JSONCodec
+from helpers.json_stream import read_first_profile
+from helpers.quarantine import ON_ERROR_COLLECT, ON_ERROR_FAIL, Quarantine
+from registries.bot_registry import EMITTERS, PARSERS
+from services.conversion_service import convert_file, resolve_targets
+
+BATCH_REPORT_FILE = "batch_report.json"
+
+
+def collect_input_files(source: str) -> list[Path]:
+    """
+    Resolve a directory (every *.json, or canonical *.ndjson or *.snapshot,
+    file directly inside it, compressed ones such as *.json.gz included) or
+    a glob pattern into a sorted list of input files.
+
+    Raises:
+        FileNotFoundError: if nothing matches.
+    """
+    source_path = Path(source)
+
+    if source_path.is_dir():
+        extensions = [""] + [cfg["extension"] for cfg in COMPRESSIONS.values()]
+        suffixes   = sorted({Path(parser_cfg["file"]).suffix for parser_cfg in PARSERS.values()})
+        patterns   = [f"*{suffix}{extension}" for suffix in suffixes for extension in extensions]
+        files      = sorted(p for pattern in patterns for p in source_path.glob(pattern) if p.is_file())
+    else:
+        files = sorted(Path(p) for p in glob.glob(source, recursive=True) if Path(p).is_file())
+
+    if not files:
+        raise FileNotFoundError(f"No input files found for '{source}'")
+
+    return files
+
+def detect_export_bot(fp) -> str | None:
+    """
+    Detect which bot produced the export in a seekable text file object by
+    its structure, or None if it matches no supported bot. Only the start
+    of the export, up to its first profile, is read.
+    """
+    for bot, parser_cfg in PARSERS.items():
+        if parser_cfg["binary"]:
+            continue
+
+        _, marker = parser_cfg["signature"]
+
+        fp.seek(0)
+        first_profile = read_first_profile(fp, parser_cfg["shape"])
+
+        if isinstance(first_profile, dict) and marker in first_profile:
+            return bot
+
+    return None
+
+def detect_source_bot(input_file: Path) -> str:
+    """
+    Detect which bot produced an export file by its structure, or by its
+    leading magic bytes for a binary export.
+
+    Raises:
+        ValueError: if the file matches no supported bot.
+    """
+    with Path(input_file).open("rb") as f:
+        head = f.read(max(len(cfg["signature"][1]) for cfg in PARSERS.values() if cfg["binary"]))
+
+    for bot, parser_cfg in PARSERS.items():
+        if parser_cfg["binary"] and head.startswith(parser_cfg["signature"][1]):
+            return bot
+
+    with open_text_input(input_file) as f:
+        bot = detect_export_bot(f)
+
+    if bot is None:
+        raise ValueError(f"Unable to detect the bot type of '{input_file}'")
+
+    return bot
+
+def export_stem(input_file: Path) -> str:
+    """
+    An input's name without its extensions ("a.json.gz" -> "a").
+    """
+    return Path(uncompressed_name(input_file)).stem
+
+def batch_output_file(output_dir: Path, input_file: Path, to_bot: str, compression: str | None = None) -> Path:
+    suffix = Path(EMITTERS[to_bot]["file"]).suffix
+
+    if EMITTERS[to_bot]["binary"]:
+        compression = None
+
+    return compressed_path(output_dir / f"{export_stem(input_file)}_{to_bot}{suffix}", compression)
+
+def batch_quarantine_file(output_dir: Path, input_file: Path) -> Path:
+    return output_dir / f"{export_stem(input_file)}_quarantine.json"
+
+def convert_batch_file(input_file: Path, to_bot, output_dir: Path, from_bot: str | None = None,
+                       on_error: str = ON_ERROR_FAIL, codec: JSONCodec = DEFAULT_CODEC,
+                       compression: str | None = None) -> dict:
+    """
+    Convert a single batch input. Runs in a worker process and never raises:
+    failures are recorded in the returned per-file report entry.
+    """
+    started = time.perf_counter()
+    result  = {
+        "input": str(input_file),
+        "source": from_bot,
+        "outputs": [],
+        "profiles": 0,
+        "error": None,
+    }
+
+    quarantine = None if on_error == ON_ERROR_FAIL else Quarantine(on_error)
+
+    try:
+        source   = from_bot or detect_source_bot(input_file)
+        to_bots  = resolve_targets(source, to_bot)
+        outputs  = [batch_output_file(output_dir, input_file, target, compression) for target in to_bots]
+
+        result["source"]   = source
+        result["profiles"] = convert_file(
+            source, to_bots, input_file, outputs, quarantine=quarantine, codec=codec
+        )
+        result["outputs"]  = [str(output) for output in outputs]
+
+        if quarantine is not None:
+            result.update(quarantine.as_dict())
+
+            if on_error == ON_ERROR_COLLECT and quarantine.failed:
+                quarantine_file = batch_quarantine_file(output_dir, input_file)
+                quarantine.write_json(quarantine_file, source)
+                result["quarantine"] = str(quarantine_file)
+
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+
+    result["seconds"] = round(time.perf_counter() - started, 4)
+
+    return result
+
+def convert_batch(source: str, to_bot, output_dir: Path,
+                  from_bot: str | None = None, jobs: int = 1, on_error: str = ON_ERROR_FAIL,
+                  codec: JSONCodec = DEFAULT_CODEC, compression: str | None = None) -> dict:
+    """
+    Convert every export matched by `source` (a directory or glob) and write
+    a summary report to <output_dir>/batch_report.json.
+
+    Args:
+        source: input directory or glob pattern.
+        to_bot: target bot, list of target bots, or "all".
+        output_dir: directory the outputs and report are written to.
+        from_bot: force a source bot instead of detecting it per file.
+        jobs: number of files converted concurrently.
+        on_error: "fail", "skip" or "collect" (see helpers.quarantine).
+        codec: JSON library and output layout (see helpers.json_codec).
+        compression: "gzip", "bz2" or "xz" to compress the outputs (see
+            helpers.compression).
+
+    Returns:
+        The summary report (per-file counts, failures and timings).
+    """
+    if jobs < 1:
+        raise ValueError("Number of jobs must be at least 1")
+
+    validate_compression(compression)
+
+    input_files = collect_input_files(source)
+
+    stems = [export_stem(input_file) for input_file in input_files]
+    duplicates = sorted({stem for stem in stems if stems.count(stem) > 1})
+    if duplicates:
+        raise ValueError(f"Input files share output names: {duplicates}")
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    started = time.perf_counter()
+
+    if jobs == 1:
+        results = [
+            convert_batch_file(f, to_bot, output_dir, from_bot, on_error, codec, compression)
+            for f in input_files
+        ]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(
+                convert_batch_file,
+                input_files,
+                [to_bot] * len(input_files),
+                [output_dir] * len(input_files),
+                [from_bot] * len(input_files),
+                [on_error] * len(input_files),
+                [codec] * len(input_files),
+                [compression] * len(input_files),
+            ))
+
+    failed = [result for result in results if result["error"]]
+
+    report = {
+        "files": results,
+        "total_files": len(results),
+        "succeeded": len(results) - len(failed),
+        "failed": len(failed),
+        "total_profiles": sum(result["profiles"] for result in results),
+        "skipped_profiles": sum(result.get("failed", 0) for result in results),
+        "seconds": round(time.perf_counter() - started, 4),
+    }
+
+    with (output_dir / BATCH_REPORT_FILE).open("w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    return report
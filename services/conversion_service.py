@@ -1,11 +1,46 @@
+import asyncio
+import codecs
+import io
 import json
 import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack, aclosing, closing, contextmanager
+from dataclasses import dataclass, replace
+from functools import partial
+from itertools import chain, islice
 from pathlib import Path
-from registries.bot_registry import PARSERS, EMITTERS
+from queue import Queue
+from typing import Iterable, Iterator
+from registries.bot_registry import CANONICAL_FORMATS, PARSERS, EMITTERS, TRANSCODERS
+from helpers.compression import (
+    MAGIC_LENGTH, StreamDecompressor, compressed_path, compression_for_path, decompress_bytes, detect_compression,
+    find_export, open_binary_input, open_text_input, open_text_output, sniff_compression
+)
+from helpers.conversion_stats import NULL_STATS, timed_input
+from helpers.json_codec import DEFAULT_CODEC
+from helpers.json_split import iter_export_ranges, read_export_range
+from helpers.json_stream import JSON_LINES, READ_CHUNK_SIZE, ProfileStreamDecoder, iter_document_profiles
+from helpers.quarantine import profile_failure
 
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 CONFIG_PATH = BASE_DIR / "config.json"
+BATCH_OUTPUT_DIR = BASE_DIR / "batch_output"
+
+# number of raw profiles handed to a worker process at a time (--jobs)
+DEFAULT_CHUNK_SIZE = 500
+
+# what convert_export returns for each target: the export as Python objects,
+# as JSON text, or as UTF-8 encoded JSON
+OUTPUT_OBJECTS = "objects"
+OUTPUT_TEXT    = "text"
+OUTPUT_BYTES   = "bytes"
+
+OUTPUTS = [OUTPUT_OBJECTS, OUTPUT_TEXT, OUTPUT_BYTES]
+
+# chunks one convert_async run may have waiting on its executor
+ASYNC_CHUNKS_IN_FLIGHT = 2
 
 
 def load_config():
@@ -19,10 +54,30 @@ def load_config():
     with CONFIG_PATH.open("r", encoding="utf-8") as f:
         return json.load(f)
 
-def resolve_source_target(cli_source: str | None, cli_target: str | None):
+def resolve_target(cli_target: str | list[str] | None):
+    """
+    Resolve only the target from CLI args or config.json (used when the
+    source is detected per file). CLI args take precedence.
+    """
+    if cli_target:
+        return cli_target
+
+    config = load_config()
+
+    if config is not None and config.get("to"):
+        return config["to"]
+
+    raise RuntimeError(
+        "No conversion target specified.\n"
+        "Use CLI arguments or create config.json."
+    )
+
+def resolve_source_target(cli_source: str | None, cli_target: str | list[str] | None):
     """
     Resolve source/target from CLI args or config.json.
     CLI args take precedence.
+
+    The target may be a single bot, a list of bots or "all".
     """
     if cli_source and cli_target:
         return cli_source, cli_target
@@ -45,63 +100,1196 @@ def resolve_source_target(cli_source: str | None, cli_target: str | None):
         "Use CLI arguments or create config.json."
     )
 
-def convert(from_bot: str, to_bot: str) -> int:
+@contextmanager
+def open_output(output_file: Path, binary: bool = False):
     """
-    Convert profiles from one bot format to another via the canonical model.
+    Open an output file for streaming writes, compressed if its extension
+    asks for it (see helpers.compression). binary=True opens it for bytes,
+    which can't be compressed.
 
-    Flow:
-        Raw input (bot-specific)
-            -> Canonical profiles
-            -> Bot-specific output
+    Output is written to a temporary sibling file and only moved into place
+    once writing succeeds, so a failed conversion never leaves a truncated
+    output behind (or clobbers the previous one).
+
+    Raises:
+        ValueError: if a binary output's extension asks for compression.
+    """
+    temp_file   = output_file.with_name(output_file.name + ".tmp")
+    compression = compression_for_path(output_file)
+
+    if binary and compression is not None:
+        raise ValueError(f"Binary output '{output_file}' can't be {compression} compressed")
+
+    try:
+        with (temp_file.open("wb") if binary else open_text_output(temp_file, compression)) as f:
+            yield f
+
+        os.replace(temp_file, output_file)
+
+    finally:
+        if temp_file.exists():
+            temp_file.unlink()
+
+def profile_conversion_error(index: int, error: Exception | str) -> ValueError:
+    """
+    Wrap a per-profile failure (or the error recorded for it, see
+    helpers.quarantine) so it reports the profile's position in the input,
+    regardless of which chunk or process it was converted in.
+    """
+    return ValueError(f"Profile at index {index} could not be converted: {error}")
+
+def _unchanged(output_profile):
+    return output_profile
+
+def find_transcoder(from_bot: str, to_bots: list[str]):
+    """
+    The direct transcoder for a single-target conversion, or None.
+
+    With several targets the canonical route is used, since it parses each
+    profile once for all of them.
+    """
+    if len(to_bots) != 1:
+        return None
+
+    return TRANSCODERS.get(from_bot, {}).get(to_bots[0])
+
+def convert_chunk(from_bot: str, to_bots: list[str], start_index: int,
+                  raw_profiles: list, encode: bool = False, stats=NULL_STATS,
+                  failures: list | None = None, direct: bool = True,
+                  cache=None, indices: list[int] | None = None,
+                  codec=DEFAULT_CODEC) -> list[list]:
+    """
+    Parse a chunk of raw profiles once and emit it for every target bot.
+
+    This is the unit of work for worker processes, so it only takes
+    picklable arguments and looks the parser/emitters up by bot name.
+    With encode=True the emitted profiles are also pre-serialized with
+    codec (a helpers.json_codec.JSONCodec), which moves JSON encoding off
+    the writing process. Parsing and emitting are
+    timed when stats are enabled.
+
+    With direct=True a single target with a registered transcoder (see
+    TRANSCODERS) is converted straight from the raw profiles, skipping the
+    canonical models; the output is the same.
+
+    When a failures list is passed, a profile that fails to convert is left
+    out of every output and recorded in it (see helpers.quarantine) instead
+    of aborting the chunk.
+
+    With a helpers.profile_cache.ProfileCache only the profiles it does not
+    hold are converted, and every output profile is returned encoded.
+    indices gives the global index of each raw profile when they are not
+    consecutive from start_index.
 
     Returns:
-        int: number of profiles converted
+        One list of output profiles per target bot, in to_bots order.
+
+    Raises:
+        ValueError: naming the global index of the first failing profile,
+            unless failures are collected.
+    """
+    if cache is not None:
+        return _convert_chunk_cached(
+            from_bot, to_bots, start_index, raw_profiles, stats, failures, direct, cache, codec
+        )
+
+    transcoder = find_transcoder(from_bot, to_bots) if direct else None
+
+    if transcoder is not None:
+        profile_parser = stats.timed("transcode", transcoder)
+        emitters       = [(_unchanged, EMITTERS[to_bots[0]]["encoder"])]
+    else:
+        profile_parser = stats.timed("parse", PARSERS[from_bot]["profile_parser"])
+        emitters       = [
+            (stats.timed("emit", EMITTERS[to_bot]["profile_emitter"]), EMITTERS[to_bot]["encoder"])
+            for to_bot in to_bots
+        ]
+
+    outputs  = [[] for _ in to_bots]
+    numbered = enumerate(raw_profiles, start_index) if indices is None else zip(indices, raw_profiles)
+
+    for index, raw_profile in numbered:
+        try:
+            canonical_profile = profile_parser(raw_profile)
+
+            for (profile_emitter, encoder), output_profiles in zip(emitters, outputs):
+                output_profile = profile_emitter(canonical_profile)
+                output_profiles.append(encoder(output_profile, codec) if encode else output_profile)
+
+        except Exception as e:
+            if failures is None:
+                raise profile_conversion_error(index, e) from e
+
+            # keep the outputs aligned: drop what earlier targets already emitted for it
+            converted = min(map(len, outputs))
+            for output_profiles in outputs:
+                del output_profiles[converted:]
+
+            failures.append(profile_failure(index, e, raw_profile))
+
+    return outputs
+
+def _convert_chunk_cached(from_bot: str, to_bots: list[str], start_index: int, raw_profiles: list,
+                          stats, failures: list | None, direct: bool, cache, codec) -> list[list]:
+    """
+    convert_chunk through a profile cache: profiles missing from it for any
+    target are converted and stored, the rest are restored from it with
+    freshly minted ids. Entries are kept per target, JSON library and output
+    layout, since they hold encoded JSON (and the libraries do not escape
+    the same characters).
+    """
+    targets     = [f"{to_bot}/{codec.name}/{codec.layout}" for to_bot in to_bots]
+    minted_keys = [EMITTERS[to_bot]["minted_keys"] for to_bot in to_bots]
+    encoders    = [stats.timed("write", EMITTERS[to_bot]["encoder"]) for to_bot in to_bots]
+    keys        = stats.timed("cache", cache.keys)(from_bot, raw_profiles)
+    cached      = [stats.timed("cache", cache.get_many)(target, keys) for target in targets]
+    pending     = [i for i, key in enumerate(keys) if any(key not in hits for hits in cached)]
+
+    chunk_failures = None if failures is None else []
+
+    converted = convert_chunk(
+        from_bot, to_bots, start_index, [raw_profiles[i] for i in pending],
+        stats=stats, failures=chunk_failures, direct=direct, indices=[start_index + i for i in pending]
+    )
+
+    failed = set()
+
+    if chunk_failures:
+        failed = {failure["index"] - start_index for failure in chunk_failures}
+        failures.extend(chunk_failures)
+
+    converted_positions = [i for i in pending if i not in failed]
+    outputs             = []
+
+    for target, hits, encoder, minted, output_profiles in zip(targets, cached, encoders, minted_keys, converted):
+        fresh  = {}
+        stored = {}
+
+        for i, output_profile in zip(converted_positions, output_profiles):
+            fresh[i] = encoder(output_profile, codec)
+
+            if keys[i] not in hits:
+                stored[keys[i]] = cache.stored_value(fresh[i], output_profile, minted)
+
+        stats.timed("cache", cache.put_many)(target, stored)
+
+        outputs.append([
+            fresh[i] if i in fresh else cache.restored_profile(hits[keys[i]], minted)
+            for i in range(len(raw_profiles)) if i not in failed
+        ])
+
+    stats.count("cached", len(raw_profiles) - len(pending))
+
+    return outputs
+
+def convert_chunk_tolerant(from_bot: str, to_bots: list[str], start_index: int,
+                           raw_profiles: list, encode: bool = False,
+                           direct: bool = True, cache=None,
+                           codec=DEFAULT_CODEC) -> tuple[list[list], list[dict]]:
+    """
+    convert_chunk for worker processes that keeps going past failing
+    profiles.
+
+    Returns:
+        (outputs, failures) for the chunk.
+    """
+    failures = []
+    outputs  = convert_chunk(from_bot, to_bots, start_index, raw_profiles, encode,
+                             failures=failures, direct=direct, cache=cache, codec=codec)
+
+    return outputs, failures
+
+def convert_range(from_bot: str, to_bots: list[str], export_range, encode: bool = False,
+                  direct: bool = True, cache=None,
+                  codec=DEFAULT_CODEC) -> tuple[list[list], list[dict], int]:
+    """
+    convert_chunk for worker processes handed a helpers.json_split
+    ExportRange instead of raw profiles: the worker decodes its own part of
+    the export, so JSON decoding runs in parallel too.
+
+    Only the process collecting the results knows how many profiles came
+    before the range, so failing profiles are always recorded, numbered
+    from the start of the range.
+
+    Returns:
+        (outputs, failures, number of profiles in the range)
+    """
+    raw_profiles = read_export_range(export_range, codec)
+    failures     = []
+    outputs      = convert_chunk(from_bot, to_bots, 0, raw_profiles, encode,
+                                 failures=failures, direct=direct, cache=cache, codec=codec)
+
+    return outputs, failures, len(raw_profiles)
+
+def iter_chunks(items: Iterable, chunk_size: int) -> Iterator[list]:
+    """
+    Split an iterable into lists of at most chunk_size items.
+    """
+    iterator = iter(items)
+
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def _iter_converted_chunks_parallel(raw_profiles: Iterable[dict], from_bot: str, to_bots: list[str],
+                                    jobs: int, chunk_size: int, quarantine=None,
+                                    direct: bool = True, cache=None,
+                                    codec=DEFAULT_CODEC) -> Iterator[list[list]]:
+    """
+    Fan chunks out to a process pool and yield results in input order.
+
+    Only a bounded window of chunks is in flight at once, so memory stays
+    flat while every worker is kept busy.
     """
+    executor = ProcessPoolExecutor(max_workers=jobs)
+    pending  = deque()
+    worker   = convert_chunk if quarantine is None else convert_chunk_tolerant
 
-    if from_bot == to_bot:
-        raise ValueError("Source and target bots cannot be the same")
+    def result():
+        outputs = pending.popleft().result()
 
+        if quarantine is not None:
+            outputs, failures = outputs
+            quarantine.add(failures)
+
+        return outputs
+
+    try:
+        start_index = 0
+
+        for chunk in iter_chunks(raw_profiles, chunk_size):
+            pending.append(executor.submit(
+                worker, from_bot, to_bots, start_index, chunk, True,
+                direct=direct, cache=cache, codec=codec
+            ))
+            start_index += len(chunk)
+
+            if len(pending) >= jobs * 2:
+                yield result()
+
+        while pending:
+            yield result()
+
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+def _iter_converted_ranges_parallel(export_ranges: Iterable, from_bot: str, to_bots: list[str],
+                                    jobs: int, quarantine=None, direct: bool = True,
+                                    cache=None, codec=DEFAULT_CODEC) -> Iterator[list[list]]:
+    """
+    _iter_converted_chunks_parallel for export byte ranges (see
+    convert_range). Profiles are numbered as results come back in order;
+    without a quarantine the first failure the workers recorded is raised
+    with its index in the input, like a single-process run does.
+    """
+    executor    = ProcessPoolExecutor(max_workers=jobs)
+    pending     = deque()
+    start_index = 0
+
+    def result():
+        nonlocal start_index
+
+        outputs, failures, count = pending.popleft().result()
+
+        for failure in failures:
+            failure["index"] += start_index
+
+        if failures and quarantine is None:
+            raise profile_conversion_error(failures[0]["index"], failures[0]["error"])
+
+        if failures:
+            quarantine.add(failures)
+
+        start_index += count
+        return outputs
+
+    try:
+        for export_range in export_ranges:
+            pending.append(executor.submit(
+                convert_range, from_bot, to_bots, export_range, True,
+                direct=direct, cache=cache, codec=codec
+            ))
+
+            if len(pending) >= jobs * 2:
+                yield result()
+
+        while pending:
+            yield result()
+
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+def iter_converted_chunks(raw_profiles: Iterable[dict], from_bot: str, to_bots: list[str],
+                          jobs: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                          stats=NULL_STATS, quarantine=None, direct: bool = True,
+                          cache=None, codec=DEFAULT_CODEC) -> Iterator[list[list]]:
+    """
+    Lazily convert raw source profiles for every target bot, chunk by chunk.
+
+    Each yielded item holds one list of output profiles per target bot.
+    With jobs > 1 parsing, emitting and encoding run in a pool of worker
+    processes and the output profiles are pre-encoded JSON (in codec's
+    layout), ready for the target's writer. Time spent waiting on the workers is charged to the
+    "convert" stage, since parsing and emitting happen out of process.
+
+    Pass a helpers.quarantine.Quarantine to skip profiles that fail to
+    convert; they are recorded in it as their chunk is yielded. With
+    direct=False the canonical models are used even where a direct
+    transcoder is registered. With a helpers.profile_cache.ProfileCache,
+    profiles converted in an earlier run are reused from it.
+
+    Raises:
+        ValueError: naming the global index of the first failing profile,
+            unless a quarantine is given.
+    """
+    if jobs > 1:
+        chunks = stats.timed_iter(
+            "convert",
+            _iter_converted_chunks_parallel(
+                raw_profiles, from_bot, to_bots, jobs, chunk_size, quarantine, direct, cache, codec
+            )
+        )
+
+        for chunk in chunks:
+            stats.count("chunks")
+            stats.count("profiles", len(chunk[0]))
+            yield chunk
+
+        return
+
+    start_index = 0
+    failures    = None if quarantine is None else []
+
+    for chunk in iter_chunks(raw_profiles, chunk_size):
+        outputs = convert_chunk(from_bot, to_bots, start_index, chunk,
+                                stats=stats, failures=failures, direct=direct, cache=cache, codec=codec)
+
+        if failures:
+            quarantine.add(failures)
+            failures.clear()
+
+        stats.count("chunks")
+        stats.count("profiles", len(outputs[0]))
+        yield outputs
+        start_index += len(chunk)
+
+def iter_converted_ranges(export_ranges: Iterable, from_bot: str, to_bots: list[str], jobs: int,
+                          stats=NULL_STATS, quarantine=None, direct: bool = True,
+                          cache=None, codec=DEFAULT_CODEC) -> Iterator[list[list]]:
+    """
+    iter_converted_chunks for an export split into byte ranges (see
+    helpers.json_split.iter_export_ranges), each decoded and converted in a
+    worker process. Scanning the export for the ranges is charged to the
+    "split" stage, waiting on the workers to "convert".
+
+    Raises:
+        ValueError: naming the global index of the first failing profile,
+            unless a quarantine is given.
+    """
+    chunks = stats.timed_iter(
+        "convert",
+        _iter_converted_ranges_parallel(
+            stats.timed_iter("split", export_ranges), from_bot, to_bots, jobs, quarantine, direct, cache, codec
+        )
+    )
+
+    for chunk in chunks:
+        stats.count("chunks")
+        stats.count("profiles", len(chunk[0]))
+        yield chunk
+
+def iter_converted_profiles(raw_profiles: Iterable[dict], from_bot: str, to_bot: str,
+                            jobs: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator:
+    """
+    Lazily convert raw source profiles into target profiles, in input order.
+    """
+    for (output_profiles,) in iter_converted_chunks(raw_profiles, from_bot, [to_bot], jobs, chunk_size):
+        yield from output_profiles
+
+# queue markers for the per-target writer threads
+_END_OF_OUTPUT    = object()
+_ABORT_OUTPUT     = object()
+WRITER_QUEUE_SIZE = 4
+
+class _OutputAborted(Exception):
+    """
+    Raised inside a writer thread when another part of the run failed.
+    """
+
+def _iter_queued_profiles(chunk_queue: Queue, stats=NULL_STATS) -> Iterator:
+    get_chunk = stats.timed("wait", chunk_queue.get)
+
+    while True:
+        chunk = get_chunk()
+
+        if chunk is _END_OF_OUTPUT:
+            return
+
+        if chunk is _ABORT_OUTPUT:
+            raise _OutputAborted()
+
+        yield from chunk
+
+def _run_writer(writer, output_fp, chunk_queue: Queue, stats=NULL_STATS) -> int:
+    try:
+        return writer(output_fp, _iter_queued_profiles(chunk_queue, stats))
+
+    except _OutputAborted:
+        raise
+
+    except BaseException:
+        # keep draining so the producer never blocks on a dead writer
+        while True:
+            chunk = chunk_queue.get()
+            if chunk is _END_OF_OUTPUT or chunk is _ABORT_OUTPUT:
+                raise
+
+def write_outputs(chunks: Iterator[list[list]], writers: list, output_fps: list,
+                  stats=NULL_STATS, codec=DEFAULT_CODEC) -> int:
+    """
+    Write converted chunks to every target output.
+
+    With several targets each output is written on its own thread, fed
+    through a small bounded queue, so the targets are serialized and
+    written concurrently while the main thread keeps parsing. Writer
+    threads charge time spent waiting for chunks to the "wait" stage.
+    Profiles are serialized with codec.
+
+    Returns:
+        int: number of profiles written per target
+    """
+    writers = [stats.timed("write", partial(writer, codec=codec)) for writer in writers]
+
+    if len(writers) == 1:
+        return writers[0](output_fps[0], chain.from_iterable(chunk[0] for chunk in chunks))
+
+    queues = [Queue(maxsize=WRITER_QUEUE_SIZE) for _ in writers]
+
+    with ThreadPoolExecutor(max_workers=len(writers)) as pool:
+        futures = [
+            pool.submit(_run_writer, writer, output_fp, chunk_queue, stats)
+            for writer, output_fp, chunk_queue in zip(writers, output_fps, queues)
+        ]
+
+        end_marker = _ABORT_OUTPUT
+
+        try:
+            for chunk in chunks:
+                for chunk_queue, output_profiles in zip(queues, chunk):
+                    chunk_queue.put(output_profiles)
+
+                if any(future.done() for future in futures):
+                    break
+            else:
+                end_marker = _END_OF_OUTPUT
+
+        finally:
+            for chunk_queue in queues:
+                chunk_queue.put(end_marker)
+
+        errors = [future.exception() for future in futures]
+
+        for error in errors:
+            if error is not None and not isinstance(error, _OutputAborted):
+                raise error
+
+        return futures[0].result()
+
+def resolve_targets(from_bot: str, to_bots) -> list[str]:
+    """
+    Normalize a target selection into a list of target bots.
+
+    Accepts a single bot name, a list of bot names, or "all" (every
+    supported target bot except the source bot; the canonical formats are
+    only written when asked for by name). Duplicates are dropped.
+    """
+    if isinstance(to_bots, str):
+        to_bots = [to_bots]
+
+    targets = []
+
+    for to_bot in to_bots:
+        if to_bot == "all":
+            candidates = [bot for bot in EMITTERS if bot != from_bot and bot not in CANONICAL_FORMATS]
+        else:
+            candidates = [to_bot]
+
+        for candidate in candidates:
+            if candidate not in targets:
+                targets.append(candidate)
+
+    if not targets:
+        raise ValueError("At least one target bot must be specified")
+
+    return targets
+
+def validate_conversion(from_bot: str, to_bots: list[str], jobs: int = 1):
+    """
+    Check that a conversion request only names supported bots.
+
+    Raises:
+        ValueError: if a bot is unsupported or a target equals the source.
+    """
     if from_bot not in PARSERS:
         raise ValueError(f"Unsupported source bot: {from_bot}")
 
-    if to_bot not in EMITTERS:
-        raise ValueError(f"Unsupported target bot: {to_bot}")
-    
-    # begin processing file
+    for target in to_bots:
+        if target == from_bot:
+            raise ValueError("Source and target bots cannot be the same")
 
-    parser_cfg = PARSERS[from_bot]
-    input_file = BASE_DIR / parser_cfg["file"]
+        if target not in EMITTERS:
+            raise ValueError(f"Unsupported target bot: {target}")
+
+    if jobs < 1:
+        raise ValueError("Number of jobs must be at least 1")
+
+def convert_file(from_bot: str, to_bots: list[str], input_file: Path,
+                 output_files: list[Path], jobs: int = 1, stats=NULL_STATS,
+                 quarantine=None, direct: bool = True, cache=None,
+                 codec=DEFAULT_CODEC) -> int:
+    """
+    Convert one export file into one output file per target bot.
+
+    Pass a helpers.conversion_stats.ConversionStats as stats to have it
+    filled in with stage timings, counters and cache statistics, and a
+    helpers.quarantine.Quarantine to skip (and record) profiles that fail
+    to convert instead of aborting. direct=False forces the canonical
+    route instead of a registered direct transcoder. Pass a
+    helpers.profile_cache.ProfileCache to reuse profiles converted by
+    earlier runs; it is trimmed to its size bound afterwards. codec, a
+    helpers.json_codec.JSONCodec, picks the JSON library and whether the
+    output is indented or compact. A gzip, bz2 or xz compressed input is
+    detected and decompressed as it is read, and outputs named *.gz, *.bz2
+    or *.xz are compressed as they are written, except binary outputs (a
+    snapshot), which can't be. With jobs > 1 an uncompressed JSON input is
+    split into byte ranges that the worker processes decode themselves (see
+    helpers.json_split).
+
+    Returns:
+        int: number of profiles converted
+    """
+    validate_conversion(from_bot, to_bots, jobs)
+
+    parser_cfg   = PARSERS[from_bot]
+    emitter_cfgs = [EMITTERS[target] for target in to_bots]
 
     try:
-        with input_file.open("r", encoding="utf-8") as f:
-            raw_data = json.load(f)
+        if parser_cfg["binary"]:
+            input_fp = open_binary_input(input_file)
+        else:
+            input_fp = open_text_input(input_file)
 
     except FileNotFoundError:
         raise FileNotFoundError(
             f"Input file '{input_file}' not found. "
             f"Please create it before running the conversion."
         )
-    
+
+    # raw input -> canonical -> target output(s), one chunk at a time
+
+    if jobs > 1 and parser_cfg["shape"] is not None and detect_compression(input_file) is None:
+        if parser_cfg["shape"][0][0] == JSON_LINES:
+            # the byte ranges skip the header line, which the bot's reader checks
+            with open_text_input(input_file) as header_fp:
+                next(parser_cfg["reader"](header_fp, codec), None)
+
+        chunks = iter_converted_ranges(
+            iter_export_ranges(input_file, parser_cfg["shape"]), from_bot, to_bots, jobs,
+            stats=stats, quarantine=quarantine, direct=direct, cache=cache, codec=codec
+        )
+    else:
+        chunks = iter_converted_chunks(
+            stats.timed_iter("decode", parser_cfg["reader"](
+                input_fp if parser_cfg["binary"] else timed_input(input_fp, stats), codec
+            )),
+            from_bot, to_bots, jobs,
+            stats=stats, quarantine=quarantine, direct=direct, cache=cache, codec=codec
+        )
+
+    stats.start()
+
+    try:
+        with input_fp, closing(chunks) as chunks, ExitStack() as outputs:
+
+            first_chunk = next(chunks, None)
+
+            if first_chunk is None:
+                raise ValueError("No profiles were parsed from input")
+
+            output_fps = [
+                outputs.enter_context(open_output(f, emitter_cfg["binary"]))
+                for f, emitter_cfg in zip(output_files, emitter_cfgs)
+            ]
+
+            count = write_outputs(
+                chain([first_chunk], chunks),
+                [emitter_cfg["writer"] for emitter_cfg in emitter_cfgs],
+                output_fps,
+                stats,
+                codec
+            )
+
     except json.JSONDecodeError as e:
         raise ValueError(
             f"Input file '{input_file}' contains invalid JSON: {e}"
         )
 
-    # convert to canonical
+    finally:
+        stats.stop()
+
+    if quarantine is not None and quarantine.failed:
+        stats.count("failed", quarantine.failed)
+
+    if cache is not None:
+        cache.evict()
+
+    return count
+
+def iter_raw_profiles(from_bot: str, export, codec=DEFAULT_CODEC) -> Iterator:
+    """
+    Lazily yield the raw profiles of a from_bot export held in memory:
+
+        str          the export's JSON text
+        bytes        the same, UTF-8 encoded, possibly gzip, bz2 or xz
+                     compressed (see helpers.compression)
+        dict, list   the export as json.load returns it
+        other        any other iterable (a generator, a tuple, ...) is
+                     taken to hold the raw profiles themselves
+
+    A list is always read as a whole export, which for Stellar is the same
+    as a list of raw profiles; pass iter(profiles) for Valor or Cybersole
+    raw profiles held in a list. A binary export (a snapshot) is only read
+    from a file; pass the rows of a parsers.snapshot_parser.CanonicalSnapshot
+    instead.
+
+    Raises:
+        TypeError: if export is none of these.
+        ValueError: if bytes are not a valid compressed stream or not UTF-8,
+            or a binary export is given as anything but its raw profiles.
+    """
+    parser_cfg = PARSERS[from_bot]
+
+    if parser_cfg["binary"] and isinstance(export, (bytes, bytearray, memoryview, str, dict, list)):
+        raise ValueError(
+            f"{from_bot} exports are read from files; pass the raw profiles of "
+            f"an open snapshot (snapshot.rows()) instead"
+        )
+
+    if isinstance(export, (bytes, bytearray, memoryview)):
+        try:
+            export = decompress_bytes(bytes(export)).decode("utf-8")
+        except UnicodeDecodeError as e:
+            raise ValueError(f"Input is not valid UTF-8: {e}")
+
+    if isinstance(export, str):
+        return parser_cfg["reader"](io.StringIO(export), codec)
+
+    if isinstance(export, (dict, list)):
+        return iter_document_profiles(export, parser_cfg["shape"])
+
+    if isinstance(export, Iterable):
+        return iter(export)
+
+    raise TypeError(f"Cannot read {from_bot} profiles from {type(export).__name__}")
+
+def convert_export(from_bot: str, to_bot: str | list[str], export, output: str = OUTPUT_OBJECTS,
+                   stats=NULL_STATS, quarantine=None, direct: bool = True, cache=None,
+                   codec=DEFAULT_CODEC) -> tuple[list, int]:
+    """
+    Convert an export held in memory (anything iter_raw_profiles reads)
+    for every target bot, in this process and without touching any file.
+
+    output picks what is returned for each target:
+
+        OUTPUT_OBJECTS  the target export as Python objects, the document
+                        json.load returns for the file convert_file writes
+        OUTPUT_TEXT     the JSON text convert_file would write
+        OUTPUT_BYTES    the same, UTF-8 encoded (or, for a binary target
+                        such as a snapshot, the file itself)
+
+    stats, quarantine, direct, cache and codec work as for convert_file;
+    a profile cache holds encoded JSON, so it only works with text or
+    bytes output.
+
+    Returns:
+        One result per target bot (in resolve_targets order) and the number
+        of profiles converted.
+
+    Raises:
+        ValueError: if the input is not a valid export, or, unless a
+            quarantine is given, naming the index of the first profile
+            that fails to convert.
+    """
+    to_bots = resolve_targets(from_bot, to_bot)
+
+    validate_conversion(from_bot, to_bots)
+
+    if output not in OUTPUTS:
+        raise ValueError(f"Unsupported output: {output}. Supported outputs: {OUTPUTS}")
+
+    if cache is not None and output == OUTPUT_OBJECTS:
+        raise ValueError("A profile cache can only be used with text or bytes output")
+
+    if output == OUTPUT_TEXT and any(EMITTERS[target]["binary"] for target in to_bots):
+        raise ValueError("Binary targets can only be converted to objects or bytes output")
+
+    raw_profiles = stats.timed_iter("decode", iter_raw_profiles(from_bot, export, codec))
+
+    stats.start()
+
+    try:
+        with closing(
+            iter_converted_chunks(
+                raw_profiles, from_bot, to_bots,
+                stats=stats, quarantine=quarantine, direct=direct, cache=cache, codec=codec
+            )
+        ) as chunks:
+
+            first_chunk = next(chunks, None)
+
+            if first_chunk is None:
+                raise ValueError("No profiles were parsed from input")
+
+            if output == OUTPUT_OBJECTS:
+                emitted = [[] for _ in to_bots]
+
+                for chunk in chain([first_chunk], chunks):
+                    for target_profiles, output_profiles in zip(emitted, chunk):
+                        target_profiles.extend(output_profiles)
+
+                count   = len(emitted[0])
+                results = [EMITTERS[target]["export"](profiles) for target, profiles in zip(to_bots, emitted)]
+
+            else:
+                output_fps = [io.BytesIO() if EMITTERS[target]["binary"] else io.StringIO() for target in to_bots]
+
+                count = write_outputs(
+                    chain([first_chunk], chunks),
+                    [EMITTERS[target]["writer"] for target in to_bots],
+                    output_fps,
+                    stats,
+                    codec
+                )
+
+                results = [output_fp.getvalue() for output_fp in output_fps]
+
+                if output == OUTPUT_BYTES:
+                    results = [result if isinstance(result, bytes) else result.encode("utf-8") for result in results]
+
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Input contains invalid JSON: {e}")
+
+    finally:
+        stats.stop()
+
+    if quarantine is not None and quarantine.failed:
+        stats.count("failed", quarantine.failed)
+
+    if cache is not None:
+        cache.evict()
+
+    return results, count
+
+def _iter_batches(chunks: Iterator[list[list]]) -> Iterator[list[list]]:
+    try:
+        yield from chunks
+
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Input contains invalid JSON: {e}")
+
+def iter_export_batches(from_bot: str, to_bot: str | list[str], export,
+                        batch_size: int = DEFAULT_CHUNK_SIZE, quarantine=None,
+                        direct: bool = True, codec=DEFAULT_CODEC) -> Iterator[list[list]]:
+    """
+    Lazily convert an export held in memory (anything iter_raw_profiles
+    reads), batch_size raw profiles at a time. Only the current batch is
+    held, so e.g. a generator of raw profiles of any length converts in
+    flat memory:
+
+        for (stellar_profiles,) in iter_export_batches("valor", "stellar", raw_profiles, 1000):
+            upload(stellar_profiles)
+
+    Each batch holds one list of emitted profiles per target bot (in
+    resolve_targets order); with a quarantine, failing profiles are left
+    out of their batch.
+
+    Raises:
+        ValueError: if the input is not a valid export, or, unless a
+            quarantine is given, naming the index of the first profile
+            that fails to convert.
+    """
+    to_bots = resolve_targets(from_bot, to_bot)
+
+    validate_conversion(from_bot, to_bots)
+
+    if batch_size < 1:
+        raise ValueError("Batch size must be at least 1")
+
+    return _iter_batches(iter_converted_chunks(
+        iter_raw_profiles(from_bot, export, codec), from_bot, to_bots,
+        chunk_size=batch_size, quarantine=quarantine, direct=direct, codec=codec
+    ))
+
+def convert_text(from_bot: str, to_bots: list[str], export_text: str, stats=NULL_STATS,
+                 quarantine=None, direct: bool = True, cache=None,
+                 codec=DEFAULT_CODEC) -> tuple[list[str], int]:
+    """
+    Convert export text the way convert_file converts a file (in this
+    process, without worker processes); convert_export with OUTPUT_TEXT.
+
+    Returns:
+        The output text for each target bot (exactly what convert_file
+        would write) and the number of profiles converted.
+    """
+    return convert_export(from_bot, to_bots, export_text, OUTPUT_TEXT, stats, quarantine, direct, cache, codec)
+
+
+@dataclass
+class ConversionProgress:
+    """
+    Progress of one convert_async run, reported after every converted chunk.
+
+    bytes_read counts the input as it arrived (compressed, if it was), so
+    against the input's size it gives the share of the work done.
+    """
+    bytes_read: int = 0
+    profiles: int = 0
+    failed: int = 0
+    done: bool = False
+
+async def _aiter_stream_bytes(source, read_size: int):
+    """
+    Read an async byte stream: an object with an async read(size) such as
+    asyncio.StreamReader, or any async iterable of bytes.
+    """
+    if hasattr(source, "read"):
+        while data := await source.read(read_size):
+            yield data
+
+    else:
+        async for data in source:
+            yield data
+
+
+class _InputDecoder:
+    """
+    Decodes an export arriving as pieces of bytes into raw profiles: undoes
+    the compression its magic bytes name, if any (see helpers.compression),
+    decodes the UTF-8 and feeds the text to a ProfileStreamDecoder. Plain
+    blocking code, which convert_async runs on its reader thread.
+    """
+
+    def __init__(self, shape: tuple, codec):
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._decompressor = None
+        self._head         = b""
+        self._profiles     = ProfileStreamDecoder(shape, codec)
+
+    def _decode(self, data: bytes, final: bool = False) -> list:
+        try:
+            text = self._text_decoder.decode(data, final)
+        except UnicodeDecodeError as e:
+            raise ValueError(f"Input is not valid UTF-8: {e}")
+
+        return self._profiles.feed(text)
+
+    def feed(self, data: bytes) -> list:
+        """
+        The raw profiles completed by the next piece of the input.
+        """
+        if self._head is not None:
+            self._head += data
+
+            if len(self._head) < MAGIC_LENGTH:
+                return []
+
+            compression        = sniff_compression(self._head)
+            self._decompressor = None if compression is None else StreamDecompressor(compression)
+            data, self._head   = self._head, None
+
+        if self._decompressor is not None:
+            data = self._decompressor.decompress(data)
+
+        return self._decode(data)
+
+    def close(self) -> list:
+        """
+        The raw profiles left at the end of the input.
+        """
+        profiles = self._decode(self._head) if self._head else []
+
+        if self._decompressor is not None:
+            self._decompressor.flush()
+
+        profiles.extend(self._decode(b"", final=True))
+        profiles.extend(self._profiles.close())
+
+        return profiles
+
+
+async def _aiter_raw_profiles(source, shape: tuple, codec, read_size: int,
+                              progress: ConversionProgress, reader_pool):
+    """
+    The raw profiles of an export read from a path or an async byte stream,
+    a list per piece read. Reading a path, decompressing and decoding all
+    run on reader_pool, so the event loop only hands the pieces over.
+    """
+    loop    = asyncio.get_running_loop()
+    decoder = _InputDecoder(shape, codec)
+
+    if isinstance(source, (str, os.PathLike)):
+        try:
+            fp = await loop.run_in_executor(reader_pool, Path(source).open, "rb")
+        except FileNotFoundError:
+            raise FileNotFoundError(
+                f"Input file '{source}' not found. "
+                f"Please create it before running the conversion."
+            )
+
+        def read_profiles():
+            data = fp.read(read_size)
+            progress.bytes_read += len(data)
+            return decoder.feed(data) if data else None
+
+        try:
+            while (profiles := await loop.run_in_executor(reader_pool, read_profiles)) is not None:
+                yield profiles
+        finally:
+            # behind any read still running on the reader thread
+            reader_pool.submit(fp.close)
+
+    else:
+        async for data in _aiter_stream_bytes(source, read_size):
+            progress.bytes_read += len(data)
+            yield await loop.run_in_executor(reader_pool, decoder.feed, data)
+
+    yield await loop.run_in_executor(reader_pool, decoder.close)
+
+def _write_chunks(get_chunk, to_bots: list[str], output_files: list[Path], codec) -> int:
+    """
+    Write every chunk get_chunk returns, until _END_OF_OUTPUT, to the
+    target bots' output files. Runs on convert_async's writer thread.
+    """
+    def chunks():
+        while (chunk := get_chunk()) is not _END_OF_OUTPUT:
+            if chunk is _ABORT_OUTPUT:
+                raise _OutputAborted()
+            yield chunk
+
+    with ExitStack() as outputs:
+        output_fps = [
+            outputs.enter_context(open_output(Path(f), EMITTERS[target]["binary"]))
+            for f, target in zip(output_files, to_bots)
+        ]
+
+        return write_outputs(chunks(), [EMITTERS[target]["writer"] for target in to_bots], output_fps, codec=codec)
+
+async def convert_async(from_bot: str, to_bots: list[str], source, output_files: list[Path],
+                        executor=None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                        quarantine=None, direct: bool = True, codec=DEFAULT_CODEC,
+                        read_size: int = READ_CHUNK_SIZE):
+    """
+    convert_file for asyncio services, as an async generator of
+    ConversionProgress:
+
+        async for progress in convert_async("valor", ["stellar"], request.content, [path]):
+            print(progress.profiles)
+
+    source is a path or an async byte stream (an async read(size) method
+    or an async iterable of bytes), possibly gzip, bz2 or xz compressed.
+    Nothing blocks the event loop: the export is read, decompressed and
+    decoded a read_size piece at a time on a reader thread, every chunk of
+    chunk_size raw profiles is parsed, emitted and encoded on executor (a
+    concurrent.futures executor, the loop's default one if None; pass a
+    ProcessPoolExecutor to use more cores), and the outputs are written on
+    a thread of their own. Each run keeps at most ASYNC_CHUNKS_IN_FLIGHT
+    chunks waiting on the executor, so concurrent conversions sharing it
+    take turns instead of queueing behind one large export.
+
+    Progress is yielded after every chunk, and a last time with done=True
+    once the outputs are in place. Cancelling the task (or closing the
+    generator) stops the conversion and leaves no output behind, like a
+    failed convert_file. quarantine and direct work as for convert_file.
+    A binary export (a snapshot) can't be read from a stream; convert it
+    with convert_file.
+
+    Raises:
+        ValueError: if the input is not a valid export, or, unless a
+            quarantine is given, naming the index of the first profile
+            that fails to convert.
+    """
+    validate_conversion(from_bot, to_bots)
+
+    if PARSERS[from_bot]["binary"]:
+        raise ValueError(f"{from_bot} exports can't be converted from a stream; use convert_file")
 
-    canonical_profiles = parser_cfg["parser"](raw_data)
+    loop        = asyncio.get_running_loop()
+    worker      = convert_chunk if quarantine is None else convert_chunk_tolerant
+    chunk_queue = asyncio.Queue(maxsize=WRITER_QUEUE_SIZE)
+    reader_pool = ThreadPoolExecutor(max_workers=1)
+    writer_pool = ThreadPoolExecutor(max_workers=1)
+    progress    = ConversionProgress()
+    pending     = deque()
+    writing     = None
+    raw_chunk   = []
+    start_index = 0
 
-    if not canonical_profiles:
-        raise ValueError("No profiles were parsed from input")
-    
-    # canonical to source
+    def get_chunk():
+        return asyncio.run_coroutine_threadsafe(chunk_queue.get(), loop).result()
 
-    emitter_cfg = EMITTERS[to_bot]
-    output_profiles = emitter_cfg["emitter"](canonical_profiles)
+    def submit(chunk: list):
+        nonlocal start_index
 
-    output_file = BASE_DIR / emitter_cfg["file"]
+        pending.append(loop.run_in_executor(executor, partial(
+            worker, from_bot, to_bots, start_index, chunk, True, direct=direct, codec=codec
+        )))
+        start_index += len(chunk)
 
-    with output_file.open("w", encoding="utf-8") as f:
-        json.dump(output_profiles, f, indent=2)
+    async def queue_chunk(item):
+        putting = asyncio.ensure_future(chunk_queue.put(item))
+        await asyncio.wait((putting, writing), return_when=asyncio.FIRST_COMPLETED)
 
-    return len(canonical_profiles)
+        if not putting.done():
+            putting.cancel()
+            await writing
+
+    async def collect() -> ConversionProgress:
+        nonlocal writing
+
+        outputs = await pending.popleft()
+
+        if quarantine is not None:
+            outputs, failures = outputs
+            quarantine.add(failures)
+            progress.failed = quarantine.failed
+
+        if writing is None:
+            writing = loop.run_in_executor(writer_pool, _write_chunks, get_chunk, to_bots, output_files, codec)
+
+        await queue_chunk(outputs)
+        progress.profiles += len(outputs[0])
+
+        return replace(progress)
+
+    try:
+        try:
+            raw_profiles = _aiter_raw_profiles(
+                source, PARSERS[from_bot]["shape"], codec, read_size, progress, reader_pool
+            )
+
+            async with aclosing(raw_profiles):
+                async for profiles in raw_profiles:
+                    raw_chunk.extend(profiles)
+
+                    while len(raw_chunk) >= chunk_size:
+                        submit(raw_chunk[:chunk_size])
+                        raw_chunk = raw_chunk[chunk_size:]
+
+                        if len(pending) >= ASYNC_CHUNKS_IN_FLIGHT:
+                            yield await collect()
+
+                    # let the other conversions on the loop have a turn
+                    await asyncio.sleep(0)
+
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Input contains invalid JSON: {e}")
+
+        if raw_chunk:
+            submit(raw_chunk)
+
+        while pending:
+            yield await collect()
+
+        if writing is None:
+            raise ValueError("No profiles were parsed from input")
+
+        await queue_chunk(_END_OF_OUTPUT)
+        progress.profiles = await writing
+        progress.done     = True
+
+        yield replace(progress)
+
+    finally:
+        for future in pending:
+            future.cancel()
+
+        if writing is not None and not writing.done():
+            while not chunk_queue.empty():
+                chunk_queue.get_nowait()
+
+            chunk_queue.put_nowait(_ABORT_OUTPUT)
+            await asyncio.wait((writing,))
+
+            # the writer stopped because of the abort, which needs no report
+            writing.exception()
+
+        reader_pool.shutdown(wait=False)
+        writer_pool.shutdown(wait=False)
+
+def convert(from_bot: str, to_bot: str | list[str], jobs: int = 1, stats=NULL_STATS,
+            quarantine=None, direct: bool = True, cache=None,
+            codec=DEFAULT_CODEC, compression: str | None = None) -> int:
+    """
+    Convert profiles from one bot format to another via the canonical model.
+
+    Flow:
+        Raw input (bot-specific)
+            -> Canonical profiles
+            -> Bot-specific output(s)
+
+    Profiles are streamed through one at a time, so memory use does not
+    grow with the size of the export. The input is parsed once, however
+    many targets are requested (a list of bots, or "all"). With jobs > 1 the
+    input is split into chunks that are converted in parallel worker
+    processes. A single target is converted with its direct transcoder
+    (raw source dict -> target dict, no canonical models) unless
+    direct=False. With a helpers.profile_cache.ProfileCache, profiles that
+    are unchanged since an earlier run are taken from the cache. Output is
+    indented JSON written with the fastest installed JSON library; pass a
+    helpers.json_codec.JSONCodec(compact=True) for compact output.
+
+    Reads BASE_DIR / <source file> and writes BASE_DIR / <target file>.
+    The source file may be compressed (see helpers.compression), and may be
+    named <source file>.gz, .bz2 or .xz; pass compression="gzip", "bz2" or
+    "xz" to write <target file>.gz, .bz2 or .xz (binary targets are written
+    uncompressed).
+
+    Pass a helpers.conversion_stats.ConversionStats as stats to collect
+    per-stage timings and counters, e.g.:
+
+        stats = ConversionStats()
+        convert("valor", "stellar", stats=stats)
+        print(stats.summary())
+
+    Pass a helpers.quarantine.Quarantine to keep converting past profiles
+    that fail (missing keys, unknown card types or geography), e.g.:
+
+        quarantine = Quarantine("collect")
+        convert("valor", "stellar", quarantine=quarantine)
+        quarantine.write_json("quarantine.json", "valor")
+
+    Returns:
+        int: number of profiles converted
+    """
+
+    to_bots = resolve_targets(from_bot, to_bot)
+
+    validate_conversion(from_bot, to_bots, jobs)
+
+    return convert_file(
+        from_bot,
+        to_bots,
+        find_export(BASE_DIR / PARSERS[from_bot]["file"]),
+        [
+            compressed_path(BASE_DIR / EMITTERS[target]["file"], None if EMITTERS[target]["binary"] else compression)
+            for target in to_bots
+        ],
+        jobs,
+        stats,
+        quarantine,
+        direct,
+        cache,
+        codec
+    )
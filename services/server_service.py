@@ -0,0 +1,418 @@
+"""
+Long-running conversion server (convert.py --serve).
+
+Starting Python and importing the parsers, emitters and lookup tables costs
+more than converting a handful of profiles, so callers that convert often can
+keep one server running and send it requests instead. The server listens on
+localhost HTTP and converts in a bounded pool of worker processes, which
+import every parser, emitter and transcoder when they start and keep their
+address caches between requests.
+
+    GET  /health     {"status": "ok", "workers": N}
+    POST /convert    convert one export
+
+Every server has a random token, which convert.py --serve writes to
+.server_<port>.token in the project directory (see server_token_file) for
+convert_client.py to read. /convert requests must send it as
+"Authorization: Bearer <token>". Requests whose Host or Origin header names
+another host than localhost (or the address the server listens on) are
+refused, so web pages cannot reach the server through the browser.
+
+/convert takes its options as query parameters:
+
+    from      source bot, detected from the export when left out
+    to        target bot, repeated for several targets, or "all"
+    on_error  "fail" (default), "skip" or "collect" (see helpers.quarantine)
+    direct    "0" to force the canonical route
+    compact   "1" to write compact instead of indented JSON
+    input     path of an export file to convert, instead of the request body
+    output    output file path, one per target, for input; defaults to
+              <input name>_<target>.json next to the input. Paths ending in
+              .gz, .bz2 or .xz are written compressed
+    compress  "gzip", "bz2" or "xz" to compress the default output files
+
+input and output paths are relative to the server root (the project
+directory unless the server is given another), and must stay inside it.
+
+Without input the request body is the export itself, possibly gzip, bz2
+or xz compressed (see helpers.compression). A binary snapshot is only
+converted from and to files, with input. The response is a JSON object:
+
+    {"source": ..., "targets": [...], "profiles": N,
+     "failed": ..., "errors": {...},      on_error skip/collect
+     "quarantine": [...],                 on_error collect, as in the
+                                          quarantine file
+     "outputs": {target: output export (the canonical
+                 format's JSON lines as a string), or the output file path}}
+
+Errors are {"error": message} with status 400 (bad request or a profile
+that cannot be converted), 401 (missing or wrong token), 403 (host, origin
+or path not allowed), 404 (input file not found), 503 (too many requests
+queued; retry later) or 500.
+"""
+
+import hmac
+import io
+import json
+import os
+import secrets
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from threading import BoundedSemaphore
+from urllib.parse import parse_qs, urlsplit
+
+from helpers.compression import decompress_bytes, validate_compression
+from helpers.json_codec import CODEC_AUTO, JSONCodec
+from helpers.quarantine import ON_ERROR_COLLECT, ON_ERROR_FAIL, ON_ERROR_MODES, Quarantine
+from registries.bot_registry import EMITTERS, PARSERS, TRANSCODERS
+from services.batch_service import batch_output_file, detect_export_bot, detect_source_bot
+from services.conversion_service import BASE_DIR, convert_file, convert_text, resolve_targets
+
+DEFAULT_SERVER_HOST = "127.0.0.1"
+DEFAULT_SERVER_PORT = 8765
+
+DEFAULT_SERVER_WORKERS = os.cpu_count() or 1
+
+# requests accepted per worker (running or waiting for it) before the
+# server answers 503
+QUEUED_REQUESTS_PER_WORKER = 4
+
+# names the Host and Origin headers may use besides the listening address
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1"}
+
+# listening addresses that accept connections on every interface
+WILDCARD_HOSTS = {"", "0.0.0.0", "::"}
+
+
+def server_token_file(port: int) -> Path:
+    return BASE_DIR / f".server_{port}.token"
+
+def write_server_token(port: int, token: str) -> Path:
+    """
+    Write a server's token where convert_client.py looks for it, readable
+    by the current user only.
+    """
+    token_file = server_token_file(port)
+    fd         = os.open(token_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(token)
+
+    return token_file
+
+def server_path(path: str, root: Path) -> Path:
+    """
+    Resolve a requested input or output path against the server root.
+
+    Raises:
+        PermissionError: if the path (an absolute one, one with "..", or a
+            symlink) leads outside the root.
+    """
+    root     = Path(root).resolve()
+    resolved = (root / path).resolve()
+
+    if not resolved.is_relative_to(root):
+        raise PermissionError(f"Path '{path}' is outside the server root '{root}'")
+
+    return resolved
+
+def conversion_request(query: str, payload: bytes, root: Path = BASE_DIR) -> dict:
+    """
+    Validate a /convert request's query string and body, resolving its
+    input and output paths against root.
+
+    Raises:
+        ValueError: if the request is incomplete or has unknown options.
+        PermissionError: if a path leads outside root.
+    """
+    params = parse_qs(query)
+
+    def param(name: str, default=None):
+        values = params.get(name)
+        return values[-1] if values else default
+
+    request = {
+        "from": param("from"),
+        "to": params.get("to", []),
+        "on_error": param("on_error", ON_ERROR_FAIL),
+        "direct": param("direct", "1") not in ("0", "false", "no"),
+        "compact": param("compact", "0") not in ("0", "false", "no"),
+        "input": param("input"),
+        "output": params.get("output", []),
+        "compress": param("compress"),
+        "payload": payload,
+    }
+
+    if not request["to"]:
+        raise ValueError("At least one target bot must be specified (to=...)")
+
+    if request["on_error"] not in ON_ERROR_MODES:
+        raise ValueError(f"on_error must be one of {', '.join(ON_ERROR_MODES)}")
+
+    validate_compression(request["compress"])
+
+    if request["input"] is None and not payload:
+        raise ValueError("Send the export as the request body, or an input file path (input=...)")
+
+    if request["input"] is not None and payload:
+        raise ValueError("Send either an export or an input file path, not both")
+
+    if request["input"] is not None:
+        request["input"]  = str(server_path(request["input"], root))
+        request["output"] = [str(server_path(output, root)) for output in request["output"]]
+
+    return request
+
+def handle_conversion(request: dict, cache=None, codec_name: str = CODEC_AUTO) -> str:
+    """
+    Run one conversion request with the named JSON codec. Runs in a worker
+    process.
+
+    Returns:
+        The JSON response text.
+    """
+    from_bot   = request["from"]
+    codec      = JSONCodec(codec_name, request["compact"])
+    quarantine = None if request["on_error"] == ON_ERROR_FAIL else Quarantine(request["on_error"])
+
+    if request["input"] is not None:
+        input_file = Path(request["input"])
+
+        if not input_file.is_file():
+            raise FileNotFoundError(f"Input file '{input_file}' not found")
+
+        from_bot = from_bot or detect_source_bot(input_file)
+        to_bots  = resolve_targets(from_bot, request["to"])
+
+        output_files = [Path(output) for output in request["output"]] or [
+            batch_output_file(input_file.parent, input_file, target, request["compress"]) for target in to_bots
+        ]
+
+        if len(output_files) != len(to_bots):
+            raise ValueError(f"Got {len(output_files)} output paths for {len(to_bots)} targets")
+
+        count = convert_file(
+            from_bot, to_bots, input_file, output_files,
+            quarantine=quarantine, direct=request["direct"], cache=cache, codec=codec
+        )
+        outputs = [json.dumps(str(output_file)) for output_file in output_files]
+
+    else:
+        export_text = decompress_bytes(request["payload"]).decode("utf-8")
+        from_bot    = from_bot or detect_export_bot(io.StringIO(export_text))
+
+        if from_bot is None:
+            raise ValueError("Unable to detect the bot type of the export")
+
+        to_bots = resolve_targets(from_bot, request["to"])
+
+        outputs, count = convert_text(
+            from_bot, to_bots, export_text,
+            quarantine=quarantine, direct=request["direct"], cache=cache, codec=codec
+        )
+
+    response = {"source": from_bot, "targets": to_bots, "profiles": count}
+
+    if quarantine is not None:
+        response.update(quarantine.as_dict())
+
+        if request["on_error"] == ON_ERROR_COLLECT:
+            response["quarantine"] = [
+                {"index": failure["index"], "error": failure["error"], "profile": failure["profile"]}
+                for failure in sorted(quarantine.failures, key=lambda failure: failure["index"])
+            ]
+
+    # the outputs are already JSON text, so they are spliced in rather
+    # than decoded and encoded again; JSON lines are sent as a string
+    members = ", ".join(
+        f"{json.dumps(target)}: {json.dumps(output) if EMITTERS[target]['json_lines'] else output}"
+        for target, output in zip(to_bots, outputs)
+    )
+
+    return json.dumps(response)[:-1] + f', "outputs": {{{members}}}}}'
+
+def _warm_worker(_) -> int:
+    """
+    Import every parser, emitter and transcoder (and with them the field
+    specs, geography and card tables) in a new worker process.
+    """
+    for registry in (PARSERS, EMITTERS, TRANSCODERS):
+        for entry in registry.values():
+            entry.values()
+
+    return os.getpid()
+
+
+class ConversionRequestHandler(BaseHTTPRequestHandler):
+    server_version   = "ProfileTransformer"
+    protocol_version = "HTTP/1.1"
+
+    def send_body(self, status: int, body: str, headers: dict | None = None):
+        data = body.encode("utf-8")
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_error_body(self, status: int, message: str, headers: dict | None = None):
+        self.send_body(status, json.dumps({"error": message}), headers)
+
+    def log_request(self, code="-", size="-"):
+        # one line per conversion would drown out the errors
+        pass
+
+    def refuse_foreign(self) -> bool:
+        """
+        Answer 403 (and return True) if the Host or Origin header names a
+        host the server is not reached by locally, as with a web page
+        calling it from the browser.
+        """
+        for header in ("Host", "Origin"):
+            value = self.headers.get(header)
+
+            if value is None:
+                continue
+
+            host = urlsplit(value if header == "Origin" else "//" + value).hostname
+
+            if not self.server.allows_host(host):
+                # the request body is left unread
+                self.close_connection = True
+                self.send_error_body(403, f"{header} '{value}' is not allowed")
+                return True
+
+        return False
+
+    def authorized(self) -> bool:
+        supplied = self.headers.get("Authorization", "")
+
+        return hmac.compare_digest(supplied.encode(), f"Bearer {self.server.token}".encode())
+
+    def do_GET(self):
+        if self.refuse_foreign():
+            return
+
+        if urlsplit(self.path).path != "/health":
+            self.send_error_body(404, f"Unknown path '{self.path}'")
+            return
+
+        self.send_body(200, json.dumps({"status": "ok", "workers": self.server.workers}))
+
+    def do_POST(self):
+        if self.refuse_foreign():
+            return
+
+        if not self.authorized():
+            self.close_connection = True
+            self.send_error_body(401, "Missing or wrong server token (Authorization: Bearer <token>)")
+            return
+
+        url     = urlsplit(self.path)
+        payload = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+        if url.path != "/convert":
+            self.send_error_body(404, f"Unknown path '{url.path}'")
+            return
+
+        try:
+            request = conversion_request(url.query, payload, self.server.root)
+        except PermissionError as e:
+            self.send_error_body(403, str(e))
+            return
+        except ValueError as e:
+            self.send_error_body(400, str(e))
+            return
+
+        if not self.server.slots.acquire(blocking=False):
+            self.send_error_body(503, "Server busy, retry later", {"Retry-After": "1"})
+            return
+
+        try:
+            body = self.server.pool.submit(
+                handle_conversion, request, self.server.cache, self.server.codec_name
+            ).result()
+
+        except FileNotFoundError as e:
+            self.send_error_body(404, str(e))
+
+        except PermissionError as e:
+            self.send_error_body(403, str(e))
+
+        except ValueError as e:
+            self.send_error_body(400, str(e))
+
+        except Exception as e:
+            self.log_error("Conversion failed: %s: %s", type(e).__name__, e)
+            self.send_error_body(500, f"{type(e).__name__}: {e}")
+
+        else:
+            self.send_body(200, body)
+
+        finally:
+            self.server.slots.release()
+
+
+class ConversionServer(ThreadingHTTPServer):
+    """
+    HTTP server handing conversions to a pool of worker processes.
+
+    Args:
+        address: (host, port) to listen on; port 0 picks a free port.
+        workers: number of worker processes.
+        max_pending: requests accepted at once (running or queued) before
+            answering 503, workers * QUEUED_REQUESTS_PER_WORKER by default.
+        cache: helpers.profile_cache.ProfileCache shared by the workers.
+        codec_name: JSON library the workers use (see helpers.json_codec).
+        root: directory input and output paths must stay in, BASE_DIR by
+            default.
+        token: token /convert requests must send, a random one by default.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple, workers: int = DEFAULT_SERVER_WORKERS,
+                 max_pending: int | None = None, cache=None, codec_name: str = CODEC_AUTO,
+                 root: Path | None = None, token: str | None = None):
+        if workers < 1:
+            raise ValueError("Number of workers must be at least 1")
+
+        super().__init__(address, ConversionRequestHandler)
+
+        # fail on an unknown or missing library now rather than per request
+        JSONCodec(codec_name).name
+
+        self.host       = address[0]
+        self.workers    = workers
+        self.cache      = cache
+        self.codec_name = codec_name
+        self.root       = Path(root or BASE_DIR).resolve()
+        self.token      = token or secrets.token_urlsafe(32)
+        self.slots      = BoundedSemaphore(max_pending or workers * QUEUED_REQUESTS_PER_WORKER)
+        self.pool       = ProcessPoolExecutor(max_workers=workers)
+
+        # start every worker now rather than on the first requests
+        list(self.pool.map(_warm_worker, range(workers)))
+
+    def allows_host(self, host: str | None) -> bool:
+        """
+        Whether a request may name host in its Host or Origin header. A
+        server listening on every interface accepts any (the token still
+        guards /convert).
+        """
+        return self.host in WILDCARD_HOSTS or host in LOCAL_HOSTS or host == self.host
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=True, cancel_futures=True)
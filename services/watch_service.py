@@ -0,0 +1,326 @@
+"""
+Incremental watch mode (--watch).
+
+Polls the input export's modification time and size. The first sync
+converts every profile; every later one only converts the profiles that
+were added or changed since the previous sync, drops the removed ones, and
+rewrites each output from the profiles it kept.
+
+What each sync produced is saved in a state file next to the outputs:
+
+    {"version": ..., "source": ..., "targets": [...], "outputs": [...],
+     "profiles": [{"identity": ..., "key": ..., "ids": [...]}]}
+
+- outputs: the (mtime, size) signature of every output as the sync wrote
+  it, so an output changed by anything else is not reused.
+- identity: the profile's own id in the source export (its name for
+  Stellar, see PARSERS[bot]["identity_key"]), so an edited profile is
+  recognized as the same profile.
+- key: hash of the raw profile, to tell whether it changed.
+- ids: its minted ids per target.
+
+The state holds no profile data. Unchanged profiles are read back from the
+previous outputs (in the state's profile order) and written again, and a
+changed profile is emitted under the ids it had, so the Valor (and
+Cybersole) profile ids in the outputs only change for new profiles.
+"""
+
+import json
+import time
+from itertools import tee
+from pathlib import Path
+from typing import Callable
+
+from helpers.compression import compressed_path, find_export, open_binary_input, open_text_input
+from helpers.json_codec import DEFAULT_CODEC, JSONCodec
+from helpers.profile_cache import ProfileCache, code_version
+from helpers.quarantine import Quarantine
+from registries.bot_registry import CANONICAL_FORMATS, EMITTERS, PARSERS
+from services.conversion_service import (
+    BASE_DIR, DEFAULT_CHUNK_SIZE, convert_chunk, open_output, resolve_targets, validate_conversion
+)
+
+DEFAULT_POLL_INTERVAL = 1.0
+
+# the state file is only read back by sync_outputs, so it is kept compact
+STATE_CODEC = JSONCodec(compact=True)
+
+
+def watch_state_file(from_bot: str) -> Path:
+    return BASE_DIR / f".watch_{from_bot}.json"
+
+def file_signature(path: Path) -> tuple | None:
+    """
+    (mtime, size) of a file, or None while it does not exist.
+    """
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+
+    return stat.st_mtime_ns, stat.st_size
+
+def profile_identities(from_bot: str, raw_profiles):
+    """
+    Lazily yield the identity of every raw profile: its identity key's
+    value, numbered when several profiles share it.
+    """
+    identity_key = PARSERS[from_bot]["identity_key"]
+    seen         = {}
+
+    for raw_profile in raw_profiles:
+        value = raw_profile.get(identity_key) if isinstance(raw_profile, dict) else None
+        value = json.dumps(value)
+
+        seen[value] = seen.get(value, 0) + 1
+        yield f"{value}#{seen[value]}"
+
+def load_watch_state(state_file: Path, from_bot: str, to_bots: list[str]) -> dict:
+    """
+    The previous sync's state, or an empty one if there is none for this
+    source and these targets.
+    """
+    empty = {"version": None, "source": from_bot, "targets": to_bots, "outputs": [], "profiles": []}
+
+    try:
+        state = STATE_CODEC.loads(state_file.read_bytes())
+    except (FileNotFoundError, ValueError):
+        return empty
+
+    if state.get("source") != from_bot or state.get("targets") != to_bots:
+        return empty
+
+    return state
+
+def save_watch_state(state_file: Path, state: dict):
+    with open_output(state_file) as f:
+        f.write(STATE_CODEC.dumps(state))
+
+def read_output_profiles(to_bot: str, output_file: Path, codec: JSONCodec = DEFAULT_CODEC):
+    """
+    Lazily yield the profiles of an output written for to_bot, in order,
+    encoded as its writer takes them.
+    """
+    encoder = EMITTERS[to_bot]["encoder"]
+
+    # canonical formats are emitted as Profiles, and read back as raw rows
+    decode = PARSERS[to_bot]["profile_parser"] if to_bot in CANONICAL_FORMATS else None
+
+    with (open_binary_input if PARSERS[to_bot]["binary"] else open_text_input)(output_file) as f:
+        for raw_profile in PARSERS[to_bot]["reader"](f, codec):
+            yield encoder(decode(raw_profile) if decode else raw_profile, codec)
+
+def sync_outputs(from_bot: str, to_bots: list[str], input_file: Path, output_files: list[Path],
+                 state_file: Path, quarantine: Quarantine | None = None,
+                 codec: JSONCodec = DEFAULT_CODEC, chunk_size: int = DEFAULT_CHUNK_SIZE) -> dict:
+    """
+    Bring the outputs up to date with the input, converting only what
+    changed since the state was saved.
+
+    The input is read one profile at a time; only the added and changed
+    ones are kept, and converted chunk_size at a time.
+
+    A profile that fails to convert aborts the sync (outputs and state stay
+    as they were) unless a quarantine is given, in which case it is left out.
+
+    Returns:
+        Counts of the profiles added, changed, removed, unchanged and
+        failed (added or changed, but left out), and of the profiles
+        written.
+
+    Raises:
+        ValueError: if the input is not valid JSON or a profile fails.
+    """
+    validate_conversion(from_bot, to_bots)
+
+    state   = load_watch_state(state_file, from_bot, to_bots)
+    version = code_version()
+    earlier = {record["identity"]: (index, record) for index, record in enumerate(state["profiles"])}
+
+    if state["version"] != version or state.get("outputs") != [
+        list(signature or ()) for signature in map(file_signature, output_files)
+    ]:
+        # converted by other code, or an output was changed since: convert
+        # everything again, keeping the ids
+        earlier = {identity: (None, dict(record, key=None)) for identity, (_, record) in earlier.items()}
+
+    records    = []    # per input profile, None once it failed
+    identities = set()
+    reused     = {}    # position -> the profile's index in the previous outputs
+    converted  = {}    # position -> its encoded output per target
+    pending    = []    # (position, raw profile) of the profiles to convert
+    failures   = None if quarantine is None else []
+    counts     = {"added": 0, "changed": 0, "removed": 0, "unchanged": 0, "failed": 0}
+
+    def convert_pending():
+        positions      = [position for position, _ in pending]
+        chunk_failures = None if failures is None else []
+
+        outputs = convert_chunk(
+            from_bot, to_bots, 0, [raw_profile for _, raw_profile in pending],
+            failures=chunk_failures, indices=positions
+        )
+
+        failed = set()
+
+        if chunk_failures:
+            failures.extend(chunk_failures)
+            failed = {failure["index"] for failure in chunk_failures}
+
+        for n, position in enumerate(position for position in positions if position not in failed):
+            record  = records[position]
+            encoded = []
+            ids     = []
+
+            for t, to_bot in enumerate(to_bots):
+                emitter_cfg    = EMITTERS[to_bot]
+                output_profile = outputs[t][n]
+
+                if record["ids"] is not None and emitter_cfg["minted_keys"]:
+                    # an edited profile keeps the ids the target already knows
+                    output_profile.update(zip(emitter_cfg["minted_keys"], record["ids"][t]))
+
+                encoded.append(emitter_cfg["encoder"](output_profile, codec))
+                ids.append([output_profile[key] for key in emitter_cfg["minted_keys"]])
+
+            record["ids"]       = ids
+            converted[position] = encoded
+
+        for position in failed:
+            records[position] = None
+
+        pending.clear()
+
+    try:
+        with (open_binary_input if PARSERS[from_bot]["binary"] else open_text_input)(input_file) as f:
+            raw_profiles, identified = tee(PARSERS[from_bot]["reader"](f, codec))
+
+            for position, (identity, raw_profile) in enumerate(
+                zip(profile_identities(from_bot, identified), raw_profiles)
+            ):
+                key          = ProfileCache.keys(from_bot, [raw_profile])[0].hex()
+                index, found = earlier.get(identity, (None, None))
+
+                identities.add(identity)
+
+                if found is not None and found["key"] == key:
+                    records.append(found)
+                    reused[position] = index
+                    counts["unchanged"] += 1
+                    continue
+
+                records.append({"identity": identity, "key": key, "ids": found and found["ids"]})
+                pending.append((position, raw_profile))
+                counts["changed" if found is not None else "added"] += 1
+
+                if len(pending) == chunk_size:
+                    convert_pending()
+
+            if pending:
+                convert_pending()
+
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Input file '{input_file}' contains invalid JSON: {e}")
+
+    if failures:
+        quarantine.add(failures)
+
+    counts["failed"]  = len(failures or ())
+    counts["removed"] = len(set(earlier) - identities)
+
+    kept = [position for position, record in enumerate(records) if record is not None]
+
+    for t, (to_bot, output_file) in enumerate(zip(to_bots, output_files)):
+        previous = {}
+
+        if reused:
+            wanted   = set(reused.values())
+            previous = {
+                index: encoded for index, encoded in enumerate(read_output_profiles(to_bot, output_file, codec))
+                if index in wanted
+            }
+
+            if len(previous) != len(wanted):
+                raise ValueError(
+                    f"Output file '{output_file}' does not match {state_file.name}; "
+                    f"delete {state_file.name} to convert every profile again"
+                )
+
+        with open_output(output_file, EMITTERS[to_bot]["binary"]) as f:
+            EMITTERS[to_bot]["writer"](f, (
+                converted[position][t] if position in converted else previous[reused[position]]
+                for position in kept
+            ), codec)
+
+    save_watch_state(state_file, {
+        "version": version, "source": from_bot, "targets": to_bots,
+        "outputs": [list(file_signature(output_file)) for output_file in output_files],
+        "profiles": [records[position] for position in kept]
+    })
+
+    counts["profiles"] = len(kept)
+
+    return counts
+
+def watch(from_bot: str, to_bot, interval: float = DEFAULT_POLL_INTERVAL,
+          on_sync: Callable | None = None, on_error: Callable | None = None,
+          quarantine_mode: str | None = None, stop: Callable | None = None,
+          codec: JSONCodec = DEFAULT_CODEC, compression: str | None = None):
+    """
+    Keep the outputs for BASE_DIR's export of from_bot in sync until
+    interrupted (or until stop() returns True).
+
+    A change is synced once the file's mtime and size have stayed the same
+    for one poll, so a file that is still being written is not read.
+
+    Args:
+        on_sync: called with sync_outputs' counts (and the quarantine, if
+            any) after every sync.
+        on_error: called with the exception when a sync fails; the previous
+            outputs are kept and the sync is retried on the next change.
+        quarantine_mode: "skip" or "collect" to leave failing profiles out
+            instead of failing the sync.
+        compression: "gzip", "bz2" or "xz" to write compressed outputs
+            (see helpers.compression), binary outputs excepted. The export
+            may be compressed too, unless it is binary.
+    """
+    to_bots      = resolve_targets(from_bot, to_bot)
+    input_file   = find_export(BASE_DIR / PARSERS[from_bot]["file"])
+    output_files = [
+        compressed_path(BASE_DIR / EMITTERS[target]["file"], None if EMITTERS[target]["binary"] else compression)
+        for target in to_bots
+    ]
+    state_file   = watch_state_file(from_bot)
+
+    validate_conversion(from_bot, to_bots)
+
+    synced    = None
+    candidate = None
+
+    while stop is None or not stop():
+        signature = file_signature(input_file)
+
+        if signature is not None and signature != synced:
+            if signature == candidate:
+                quarantine = Quarantine(quarantine_mode) if quarantine_mode else None
+
+                try:
+                    counts = sync_outputs(
+                        from_bot, to_bots, input_file, output_files, state_file, quarantine, codec
+                    )
+
+                except Exception as e:
+                    if on_error is None:
+                        raise
+                    on_error(e)
+
+                else:
+                    if on_sync is not None:
+                        on_sync(counts, quarantine)
+
+                # failed syncs are not retried until the file changes again
+                synced = signature
+
+            candidate = signature
+
+        time.sleep(interval)
@@ -0,0 +1,39 @@
+"""
+Canonical NDJSON format: the canonical models persisted to disk.
+
+Parsing an export resolves its geography and card types into canonical
+Profiles; storing those lets the export be emitted for any bot later without
+parsing it again. The file is newline-delimited JSON, written compact and
+UTF-8 encoded:
+
+    {"canonical_profiles": {"format_version": 1, "profile": [...], "address": [...], "card": [...]}}
+    ["John Doe", "email@email.com", "6041230123", [...shipping], null, true, [...card], false]
+    ...
+
+The first line is a header naming the format version and the field order of
+every model. Each following line is one Profile as Profile.to_tuple writes
+it: its fields in declaration order, with the addresses and card as arrays
+of their own fields, and null billing when it is the shipping address.
+
+One profile per line keeps the file streamable and lets --jobs cut it into
+byte ranges at any newline (see helpers.json_split).
+"""
+
+from dataclasses import fields
+
+from models.canonical import Profile, Address, Card
+
+# bump when the line layout changes; readers reject other versions
+CANONICAL_FORMAT_VERSION = 1
+
+# the header line's only key
+CANONICAL_HEADER_KEY = "canonical_profiles"
+
+CANONICAL_HEADER = {
+    CANONICAL_HEADER_KEY: {
+        "format_version": CANONICAL_FORMAT_VERSION,
+        "profile": [field.name for field in fields(Profile)],
+        "address": [field.name for field in fields(Address)],
+        "card": [field.name for field in fields(Card)],
+    }
+}
@@ -0,0 +1,92 @@
+"""
+Cybersole AIO profile format, described once for both directions.
+
+See parsers/cybersole_parser.py for an example export. The parser and emitter
+compile these specs into their conversion functions at import. Profiles sit
+inside groups; the group envelope is handled by the reader and writer.
+"""
+
+import uuid
+from operator import not_
+
+from models.canonical import Profile, Address, Card
+from helpers.field_spec import Field, RecordSpec
+import helpers.card_utils as card_helper
+import constants.countries_map as countries_helper
+
+def cybersole_region(state_name: str, country_code: str) -> tuple[str, str]:
+    return countries_helper.resolve_region(country_code, state_name, "name")
+
+def cybersole_card_number(card_number: str) -> tuple[str, str]:
+    # Cybersole stores the number spaced and not the card type, which is
+    # inferred from the number
+    number = card_helper.normalize_card_number(card_number)
+    return number, card_helper.determine_card_type(number)
+
+def cybersole_expiry_year(exp_year_full: str) -> str:
+    # passed in as 4 digits, only need last 2
+    return exp_year_full[-2:]
+
+def full_expiry_year(exp_year: str) -> str:
+    return card_helper.CARD_EXPIRY_YEAR_PREFIX + exp_year
+
+def optional_address_line(address_line: str):
+    # cybersole expects None not empty strings
+    return address_line or None
+
+def new_cybersole_id() -> str:
+    return str(uuid.uuid4())
+
+CYBERSOLE_ADDRESS_SPEC = RecordSpec(
+    name   = "cybersole address",
+    model  = Address,
+    fields = (
+        Field("firstName", "first_name", "cybersole shipping first name"),
+        Field("lastName", "last_name", "cybersole shipping last name"),
+        Field("address1", "address_line_1", "cybersole shipping address 1"),
+        Field("address2", "address_line_2", default="", emit=optional_address_line),
+        Field("city", "city", "cybersole shipping city"),
+        Field("zip", "zip_code", "cybersole shipping zipcode"),
+        # full country and state/province names, resolved through the shared geography index
+        Field("country", ("country_code", "country_name"), "cybersole shipping country name",
+              parse=countries_helper.resolve_country, emit_from="country_name"),
+        Field("state", ("state_code", "state_name"), "cybersole shipping state name",
+              parse=cybersole_region, parse_args=("country_code",), emit_from="state_name"),
+    ),
+)
+
+CYBERSOLE_CARD_SPEC = RecordSpec(
+    name         = "cybersole card",
+    model        = Card,
+    # the card holder is the profile name, cybersole cards have no holder
+    parse_params = ("holder",),
+    fields       = (
+        Field(None, "holder", parse_args=("holder",)),
+        Field("number", ("number", "card_type"), "cybersole card number",
+              parse=cybersole_card_number, emit=card_helper.formatted_card_number),
+        Field("expMonth", "exp_month", "cybersole expiry month"),
+        Field("expYear", "exp_year", "cybersole card expiry year",
+              parse=cybersole_expiry_year, emit=full_expiry_year),
+        Field("cvv", "cvv", "cybersole card cvv"),
+    ),
+)
+
+CYBERSOLE_PROFILE_SPEC = RecordSpec(
+    name   = "cybersole profile",
+    model  = Profile,
+    fields = (
+        Field("id", emit=new_cybersole_id, emit_only=True),
+        Field("name", "profile_name", "cybersole profile name"),
+        Field("email", "email", "cybersole profile email"),
+        Field("phone", "phone_number", "cybersole profile phone"),
+        # false value here is true in canonical
+        Field("billingDifferent", "billing_same_as_ship", "cybersole same ship key", parse=not_, emit=not_),
+
+        Field("card", "card", "cybersole payment key", nested="card", parse_args=("profile_name",)),
+        Field("delivery", "shipping_address", "cybersole shipping key", nested="address"),
+        Field("billing", "billing_address", "cybersole billing key", nested="address",
+              same_as=("billing_same_as_ship", "shipping_address")),
+
+        Field("properties", emit=dict, emit_only=True),
+    ),
+)
@@ -0,0 +1,113 @@
+"""
+Canonical snapshot format: canonical profiles in a compact binary file that
+opens without decoding it.
+
+Even the canonical NDJSON format (specs/canonical.py) has to be decoded line
+by line to be read back. A snapshot stores the same profiles column by
+column instead, so a reader can memory-map the file and build just the
+Profiles it is asked for:
+
+    header   MAGIC, format version (u32), profiles per block (u32)
+    blocks   up to SNAPSHOT_BLOCK_SIZE profiles each
+    footer   string table, block index
+    trailer  footer offset (u64), profile count (u64), MAGIC
+
+A block is its profile count (u32) and the offset of every column from the
+end of these offsets (u32, one more than there are columns), followed by
+the columns in SNAPSHOT_COLUMNS order:
+
+    COLUMN_TEXT   the byte width of its lengths (u8, 1 when every value is
+                  shorter than 256 characters, else 4), the character
+                  length of every value (u8 or u32), the rows holding None
+                  (u32 count, then their numbers), then the text as UTF-8
+    COLUMN_TABLE  an index into the string table per profile (u32), for
+                  the few distinct values countries, states, card types
+                  and expiry dates take; index 0 stands for None
+    COLUMN_FLAG   one byte per profile
+
+The footer is the string table (u32 count, u32 character offsets, UTF-8
+text) and the block index (u32 count, then the u64 file offset of every
+block). Every integer is little-endian.
+
+A profile's columns follow Profile.to_tuple: "billing_shared" is set when
+the billing address is the shipping address (stored as None by to_tuple),
+in which case the billing columns are left empty.
+"""
+
+from dataclasses import fields
+
+from models.canonical import Address, Card
+
+# a text editor or transfer in text mode mangles the \r\n, so a damaged
+# snapshot is rejected straight away
+SNAPSHOT_MAGIC = b"PTSNAP\r\n"
+
+# bump when the layout changes; readers reject other versions
+SNAPSHOT_FORMAT_VERSION = 1
+
+# profiles per block, the unit a reader decodes at a time; every block but
+# the last is full, so a profile's block is its index // the block size
+SNAPSHOT_BLOCK_SIZE = 1024
+
+COLUMN_TEXT  = "text"
+COLUMN_TABLE = "table"
+COLUMN_FLAG  = "flag"
+
+_TABLE_FIELDS = {"country_name", "country_code", "state_name", "state_code", "card_type", "exp_month", "exp_year"}
+
+def _model_columns(prefix: str, model) -> tuple:
+    return tuple(
+        (f"{prefix}.{field.name}", COLUMN_TABLE if field.name in _TABLE_FIELDS else COLUMN_TEXT)
+        for field in fields(model)
+    )
+
+SNAPSHOT_COLUMNS = (
+    ("profile_name", COLUMN_TEXT),
+    ("email", COLUMN_TEXT),
+    ("phone_number", COLUMN_TEXT),
+    *_model_columns("shipping_address", Address),
+    ("billing_shared", COLUMN_FLAG),
+    *_model_columns("billing_address", Address),
+    ("billing_same_as_ship", COLUMN_FLAG),
+    *_model_columns("card", Card),
+    ("one_checkout", COLUMN_FLAG),
+)
+
+# the billing columns of a profile whose billing is its shipping address
+_EMPTY_ADDRESS = tuple(None if kind == COLUMN_TABLE else "" for _, kind in _model_columns("", Address))
+
+# where a profile's parts sit in its row of SNAPSHOT_COLUMNS values
+_SHIPPING       = slice(3, 3 + len(fields(Address)))
+_BILLING_SHARED = _SHIPPING.stop
+_BILLING        = slice(_BILLING_SHARED + 1, _BILLING_SHARED + 1 + len(fields(Address)))
+_SAME_AS_SHIP   = _BILLING.stop
+_CARD           = slice(_SAME_AS_SHIP + 1, _SAME_AS_SHIP + 1 + len(fields(Card)))
+_ONE_CHECKOUT   = _CARD.stop
+
+def profile_to_row(values) -> tuple:
+    """
+    The SNAPSHOT_COLUMNS values of a profile given as Profile.to_tuple
+    returns it.
+    """
+    profile_name, email, phone_number, shipping, billing, billing_same_as_ship, card, one_checkout = values
+
+    return (
+        profile_name, email, phone_number, *shipping,
+        billing is None, *(_EMPTY_ADDRESS if billing is None else billing),
+        billing_same_as_ship, *card, one_checkout
+    )
+
+def columns_to_profiles(columns: list) -> list[tuple]:
+    """
+    The profiles of a block, given as one list of values per
+    SNAPSHOT_COLUMNS column, back in the Profile.to_tuple layout.
+    """
+    billing = [
+        None if shared else address
+        for shared, address in zip(columns[_BILLING_SHARED], zip(*columns[_BILLING]))
+    ]
+
+    return list(zip(
+        columns[0], columns[1], columns[2], zip(*columns[_SHIPPING]), billing,
+        columns[_SAME_AS_SHIP], zip(*columns[_CARD]), columns[_ONE_CHECKOUT]
+    ))
@@ -0,0 +1,81 @@
+"""
+Stellar AIO profile format, described once for both directions.
+
+See parsers/stellar_parser.py for an example export. The parser and emitter
+compile these specs into their conversion functions at import.
+"""
+
+from models.canonical import Profile, Address, Card
+from helpers.field_spec import Field, RecordSpec
+from helpers.card_utils import normalize_card_type
+import constants.countries_map as countries_helper
+
+STELLAR_CARD_TYPE_MAP = {
+    "visa": "Visa",
+    "discover": "Discover",
+    "mastercard": "MasterCard",
+    "amex": "Amex",
+    "jcb": "JCB"
+}
+
+def stellar_card_type(card_type: str) -> str:
+
+    if card_type in STELLAR_CARD_TYPE_MAP:
+        return STELLAR_CARD_TYPE_MAP[card_type]
+
+    raise ValueError(
+        f"Unsupported Stellar card type: '{card_type}'. "
+        f"Supported types: {list(STELLAR_CARD_TYPE_MAP.values())}"
+    )
+
+def stellar_region(state_code: str, country_code: str) -> tuple[str, str]:
+    # Stellar stores the 2 letter state/province code, e.g. "BC"
+    return countries_helper.resolve_region(country_code, state_code, "code")
+
+STELLAR_ADDRESS_SPEC = RecordSpec(
+    name   = "stellar address",
+    model  = Address,
+    fields = (
+        Field("firstName", "first_name", "stellar shipping first name"),
+        Field("lastName", "last_name", "stellar shipping last name"),
+        # e.g. "CA", resolved through the shared geography index
+        Field("country", ("country_code", "country_name"), "stellar shipping country",
+              parse=countries_helper.resolve_country, emit_from="country_code"),
+        Field("address", "address_line_1", "stellar shipping address"),
+        Field("address2", "address_line_2", default=""),
+        Field("state", ("state_code", "state_name"), "stellar shipping state/province",
+              parse=stellar_region, parse_args=("country_code",), emit_from="state_code"),
+        Field("city", "city", "stellar shipping city"),
+        Field("zipcode", "zip_code", "stellar shipping zipcode"),
+    ),
+)
+
+STELLAR_CARD_SPEC = RecordSpec(
+    name   = "stellar card",
+    model  = Card,
+    fields = (
+        Field("cardName", "holder", "stellar card holder"),
+        # e.g "Visa" <-> "visa"
+        Field("cardType", "card_type", "stellar card type", parse=normalize_card_type, emit=stellar_card_type),
+        Field("cardNumber", "number", "stellar card number"),
+        Field("cardMonth", "exp_month", "stellar card month"),
+        Field("cardYear", "exp_year", "stellar card year"),
+        Field("cardCvv", "cvv", "stellar card cvv"),
+    ),
+)
+
+STELLAR_PROFILE_SPEC = RecordSpec(
+    name   = "stellar profile",
+    model  = Profile,
+    fields = (
+        Field("profileName", "profile_name", "stellar profile name"),
+        Field("email", "email", "stellar profile email"),
+        Field("phone", "phone_number", "stellar profile phone number"),
+        Field("shipping", "shipping_address", "stellar shipping key", nested="address"),
+        Field("billingAsShipping", "billing_same_as_ship", "stellar same ship key"),
+        Field("billing", "billing_address", "stellar billing key", nested="address",
+              same_as=("billing_same_as_ship", "shipping_address")),
+        Field("payment", "card", "stellar payment key", nested="card"),
+        Field("oneCheckoutPerProfile", "one_checkout", default=False),
+    ),
+)
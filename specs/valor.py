@@ -0,0 +1,81 @@
+"""
+Valor AIO profile format, described once for both directions.
+
+See parsers/valor_parser.py for an example export. The parser and emitter
+compile these specs into their conversion functions at import.
+"""
+
+from models.canonical import Profile, Address, Card
+from helpers.field_spec import Field, RecordSpec
+import helpers.card_utils as card_helper
+import constants.countries_map as countries_helper
+
+def valor_region(state_name: str, country_code: str) -> tuple[str, str]:
+    # Valor stores the full state/province name, e.g. "British Columbia"
+    return countries_helper.resolve_region(country_code, state_name, "name")
+
+def split_card_expiry(expiration: str) -> list[str]:
+    # Valor stores month/year: E.g 02/12
+    return expiration.split("/")
+
+VALOR_ADDRESS_SPEC = RecordSpec(
+    name   = "valor address",
+    model  = Address,
+    fields = (
+        Field("firstName", "first_name", "valor shipping first name"),
+        Field("lastName", "last_name", "valor shipping last name"),
+        Field("addressLine1", "address_line_1", "valor shipping address"),
+        Field("addressLine2", "address_line_2", "valor shipping address2"),
+        Field("city", "city", "valor shipping city"),
+        Field("countryName", emit_from="country_name", emit_only=True),
+        # the country is read from its code, resolved through the shared geography index
+        Field("countryCode", ("country_code", "country_name"), "valor shipping country",
+              parse=countries_helper.resolve_country, emit_from="country_code"),
+        Field("state", ("state_code", "state_name"), "valor shipping state/province",
+              parse=valor_region, parse_args=("country_code",), emit_from="state_name"),
+        Field("zipCode", "zip_code", "valor shipping zipcode"),
+    ),
+)
+
+VALOR_CARD_SPEC = RecordSpec(
+    name   = "valor card",
+    model  = Card,
+    fields = (
+        Field("holder", "holder", "valor card holder name"),
+        Field("number", "number", "valor card type", parse=card_helper.normalize_card_number,
+              emit=card_helper.formatted_card_number, emit_from=("number", "card_type")),
+        Field("expiration", ("exp_month", "exp_year"), "valor card expiry",
+              parse=split_card_expiry, emit=card_helper.formatted_card_expiry_date),
+        Field("cvv", "cvv", "valor card cvv"),
+        Field("googlePayToken", value="", emit_only=True),
+        Field("type", "card_type", "valor card type", parse=card_helper.normalize_card_type),
+    ),
+)
+
+VALOR_PROFILE_SPEC = RecordSpec(
+    name        = "valor profile",
+    model       = Profile,
+    emit_params = ("profile_id",),
+    fields      = (
+        Field("name", "profile_name", "valor profile name"),
+        Field("email", "email", "valor profile email"),
+        Field("phoneNumber", "phone_number", "valor profile phone number"),
+
+        Field("personalCustomsCode", value="", emit_only=True),
+        Field("pinCode", value="", emit_only=True),
+        Field("idNumber", value="", emit_only=True),
+        Field("birthday", value="", emit_only=True),
+
+        Field("billingSameAsShipping", "billing_same_as_ship", "valor billingSameAsShipping key"),
+        Field("oneCheckout", "one_checkout", "valor profile onecheckout"),
+        Field("quickTask", value=False, emit_only=True),
+
+        Field("card", "card", "valor card key", nested="card"),
+        Field("shipping", "shipping_address", "valor shipping key", nested="address"),
+        Field("billing", "billing_address", "valor billing key", nested="address",
+              same_as=("billing_same_as_ship", "shipping_address")),
+
+        Field("id", emit_from="profile_id", emit_only=True),
+        Field("totalSpent", value="0", emit_only=True),
+    ),
+)
@@ -0,0 +1,57 @@
+"""
+Direct Cybersole -> Stellar / Valor transcoders.
+
+Each transcoder turns one raw Cybersole profile straight into the target
+bot's profile dict, without building canonical Profile/Address/Card objects
+in between. They are compiled from the same specs as the Cybersole parser and
+the target emitters (see helpers.field_spec.compile_transcoder), so they run
+the same validations and give the same output as the canonical route.
+"""
+
+import uuid
+
+from helpers.field_spec import compile_transcoder
+from specs.cybersole import CYBERSOLE_ADDRESS_SPEC, CYBERSOLE_CARD_SPEC, CYBERSOLE_PROFILE_SPEC
+from specs.stellar import STELLAR_ADDRESS_SPEC, STELLAR_CARD_SPEC, STELLAR_PROFILE_SPEC
+from specs.valor import VALOR_ADDRESS_SPEC, VALOR_CARD_SPEC, VALOR_PROFILE_SPEC
+
+# Cybersole -> Stellar
+
+cybersole_address_to_stellar = compile_transcoder(
+    CYBERSOLE_ADDRESS_SPEC, STELLAR_ADDRESS_SPEC, "cybersole_address_to_stellar", __name__
+)
+
+# cybersole_card_to_stellar(raw, holder)
+cybersole_card_to_stellar = compile_transcoder(
+    CYBERSOLE_CARD_SPEC, STELLAR_CARD_SPEC, "cybersole_card_to_stellar", __name__
+)
+
+cybersole_profile_to_stellar = compile_transcoder(
+    CYBERSOLE_PROFILE_SPEC, STELLAR_PROFILE_SPEC, "cybersole_profile_to_stellar", __name__,
+    nested = {"address": cybersole_address_to_stellar, "card": cybersole_card_to_stellar},
+    doc    = "Transcode a raw Cybersole profile into a Stellar profile.",
+)
+
+# Cybersole -> Valor
+
+cybersole_address_to_valor = compile_transcoder(
+    CYBERSOLE_ADDRESS_SPEC, VALOR_ADDRESS_SPEC, "cybersole_address_to_valor", __name__
+)
+
+# cybersole_card_to_valor(raw, holder)
+cybersole_card_to_valor = compile_transcoder(
+    CYBERSOLE_CARD_SPEC, VALOR_CARD_SPEC, "cybersole_card_to_valor", __name__
+)
+
+# _cybersole_profile_to_valor(raw, profile_id)
+_cybersole_profile_to_valor = compile_transcoder(
+    CYBERSOLE_PROFILE_SPEC, VALOR_PROFILE_SPEC, "_cybersole_profile_to_valor", __name__,
+    nested = {"address": cybersole_address_to_valor, "card": cybersole_card_to_valor},
+)
+
+def cybersole_profile_to_valor(raw_profile: dict) -> dict:
+    """
+    Transcode a raw Cybersole profile under a freshly minted Valor profile id.
+    """
+
+    return _cybersole_profile_to_valor(raw_profile, str(uuid.uuid4()))
@@ -0,0 +1,53 @@
+"""
+Direct Stellar -> Valor / Cybersole transcoders.
+
+Each transcoder turns one raw Stellar profile straight into the target bot's
+profile dict, without building canonical Profile/Address/Card objects in
+between. They are compiled from the same specs as the Stellar parser and the
+target emitters (see helpers.field_spec.compile_transcoder), so they run the
+same validations and give the same output as the canonical route.
+"""
+
+import uuid
+
+from helpers.field_spec import compile_transcoder
+from specs.stellar import STELLAR_ADDRESS_SPEC, STELLAR_CARD_SPEC, STELLAR_PROFILE_SPEC
+from specs.valor import VALOR_ADDRESS_SPEC, VALOR_CARD_SPEC, VALOR_PROFILE_SPEC
+from specs.cybersole import CYBERSOLE_ADDRESS_SPEC, CYBERSOLE_CARD_SPEC, CYBERSOLE_PROFILE_SPEC
+
+# Stellar -> Valor
+
+stellar_address_to_valor = compile_transcoder(
+    STELLAR_ADDRESS_SPEC, VALOR_ADDRESS_SPEC, "stellar_address_to_valor", __name__
+)
+
+stellar_card_to_valor = compile_transcoder(STELLAR_CARD_SPEC, VALOR_CARD_SPEC, "stellar_card_to_valor", __name__)
+
+# _stellar_profile_to_valor(raw, profile_id)
+_stellar_profile_to_valor = compile_transcoder(
+    STELLAR_PROFILE_SPEC, VALOR_PROFILE_SPEC, "_stellar_profile_to_valor", __name__,
+    nested = {"address": stellar_address_to_valor, "card": stellar_card_to_valor},
+)
+
+def stellar_profile_to_valor(raw_profile: dict) -> dict:
+    """
+    Transcode a raw Stellar profile under a freshly minted Valor profile id.
+    """
+
+    return _stellar_profile_to_valor(raw_profile, str(uuid.uuid4()))
+
+# Stellar -> Cybersole
+
+stellar_address_to_cybersole = compile_transcoder(
+    STELLAR_ADDRESS_SPEC, CYBERSOLE_ADDRESS_SPEC, "stellar_address_to_cybersole", __name__
+)
+
+stellar_card_to_cybersole = compile_transcoder(
+    STELLAR_CARD_SPEC, CYBERSOLE_CARD_SPEC, "stellar_card_to_cybersole", __name__
+)
+
+stellar_profile_to_cybersole = compile_transcoder(
+    STELLAR_PROFILE_SPEC, CYBERSOLE_PROFILE_SPEC, "stellar_profile_to_cybersole", __name__,
+    nested = {"address": stellar_address_to_cybersole, "card": stellar_card_to_cybersole},
+    doc    = "Transcode a raw Stellar profile into a Cybersole profile.",
+)
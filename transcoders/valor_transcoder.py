@@ -0,0 +1,44 @@
+"""
+Direct Valor -> Stellar / Cybersole transcoders.
+
+Each transcoder turns one raw Valor profile straight into the target bot's
+profile dict, without building canonical Profile/Address/Card objects in
+between. They are compiled from the same specs as the Valor parser and the
+target emitters (see helpers.field_spec.compile_transcoder), so they run the
+same validations and give the same output as the canonical route.
+"""
+
+from helpers.field_spec import compile_transcoder
+from specs.valor import VALOR_ADDRESS_SPEC, VALOR_CARD_SPEC, VALOR_PROFILE_SPEC
+from specs.stellar import STELLAR_ADDRESS_SPEC, STELLAR_CARD_SPEC, STELLAR_PROFILE_SPEC
+from specs.cybersole import CYBERSOLE_ADDRESS_SPEC, CYBERSOLE_CARD_SPEC, CYBERSOLE_PROFILE_SPEC
+
+# Valor -> Stellar
+
+valor_address_to_stellar = compile_transcoder(
+    VALOR_ADDRESS_SPEC, STELLAR_ADDRESS_SPEC, "valor_address_to_stellar", __name__
+)
+
+valor_card_to_stellar = compile_transcoder(VALOR_CARD_SPEC, STELLAR_CARD_SPEC, "valor_card_to_stellar", __name__)
+
+valor_profile_to_stellar = compile_transcoder(
+    VALOR_PROFILE_SPEC, STELLAR_PROFILE_SPEC, "valor_profile_to_stellar", __name__,
+    nested = {"address": valor_address_to_stellar, "card": valor_card_to_stellar},
+    doc    = "Transcode a raw Valor profile into a Stellar profile.",
+)
+
+# Valor -> Cybersole
+
+valor_address_to_cybersole = compile_transcoder(
+    VALOR_ADDRESS_SPEC, CYBERSOLE_ADDRESS_SPEC, "valor_address_to_cybersole", __name__
+)
+
+valor_card_to_cybersole = compile_transcoder(
+    VALOR_CARD_SPEC, CYBERSOLE_CARD_SPEC, "valor_card_to_cybersole", __name__
+)
+
+valor_profile_to_cybersole = compile_transcoder(
+    VALOR_PROFILE_SPEC, CYBERSOLE_PROFILE_SPEC, "valor_profile_to_cybersole", __name__,
+    nested = {"address": valor_address_to_cybersole, "card": valor_card_to_cybersole},
+    doc    = "Transcode a raw Valor profile into a Cybersole profile.",
+)